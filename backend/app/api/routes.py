@@ -267,7 +267,7 @@ async def get_session_details(session_id: str):
     # 2. Check Persisted/Archived Sessions (storage)
     try:
         storage = get_storage_service()
-        session_details = await run_in_threadpool(storage.get_session_details, session_id)
+        session_details = await storage.get_session_details_async(session_id)
         
         if session_details:
             return session_details
@@ -437,9 +437,7 @@ async def cancel_session(session_id: str):
     # Check persistent storage
     from app.services.storage_service import get_storage_service
     storage = get_storage_service()
-    history = storage.get_history()
-    # Find active session in history
-    persistent_session = next((s for s in history if s["id"] == session_id), None)
+    persistent_session = storage.get_session_entry(session_id)
     if persistent_session and persistent_session.get("status") in ["processing", "uploading"]:
          storage.add_session(session_id, {
              **persistent_session,
@@ -639,7 +637,7 @@ async def list_sessions_minimal():
 async def get_session_minimal(session_id: str):
     """Get full session details for History details view (minimal endpoint)."""
     storage = get_storage_service()
-    details = await run_in_threadpool(storage.get_session_details, session_id)
+    details = await storage.get_session_details_async(session_id)
     if not details:
         raise HTTPException(status_code=404, detail="Session not found")
     return details
@@ -1,7 +1,9 @@
 """Application configuration using Pydantic Settings"""
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import lru_cache
 from pathlib import Path
+from typing import Tuple
 from dotenv import load_dotenv
 import os
 
@@ -34,6 +36,7 @@ class Settings(BaseSettings):
     upload_dir: str = "./uploads"
     frame_interval: int = 5  # Extract 1 frame every N seconds
     max_video_length: int = 900  # 15 minutes in seconds
+    max_concurrent_segments: int = 4  # Segments processed at once in segmented mode
     
     # Redis Configuration
     redis_url: str = "redis://localhost:6379/0"
@@ -56,10 +59,25 @@ class Settings(BaseSettings):
     hebrish_stt_enabled: bool = False  # Enable Hebrew-optimized STT
     hebrish_model: str = "ivrit-ai/faster-whisper-v2-d4"  # Hebrew Whisper model
     
+    # Load and warm the enabled STT models in the background at startup
+    stt_warmup_enabled: bool = True
+    
+    # Transcript Cache (skip re-transcribing identical audio)
+    transcript_cache_enabled: bool = True
+    transcript_cache_dir: str = "data/transcript_cache"
+    transcript_cache_max_entries: int = 500  # Least recently used entries evicted beyond this
+    
     # Gemini Model Configuration
     doc_model_pro_name: str = "gemini-2.5-flash-lite"  # High-quality model for documentation
     doc_model_flash_name: str = "gemini-2.5-flash-lite"  # Fast model for analysis
     
+    # Gemini Client Concurrency
+    # gRPC multiplexes concurrent calls over one HTTP/2 channel, so parallelism
+    # is bounded by these knobs rather than by a connection pool
+    gemini_transport: str = "grpc"  # "grpc" or "rest"
+    gemini_max_concurrency: int = 8  # Max in-flight Gemini calls/uploads per request
+    gemini_rate_limit_rpm: int = 60  # Client-side request budget per minute
+    
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
@@ -72,6 +90,23 @@ class Settings(BaseSettings):
         path = Path(self.upload_dir)
         path.mkdir(parents=True, exist_ok=True)
         return path
+    
+    def get_upload_roots(self) -> Tuple[Path, Path]:
+        """
+        Upload directory and its resolved form, for hot paths.
+        
+        Cached per upload_dir value, so pointing settings at another directory
+        (as tests do) needs no reset.
+        """
+        return _upload_roots(self.upload_dir)
+
+
+@lru_cache(maxsize=8)
+def _upload_roots(upload_dir: str) -> Tuple[Path, Path]:
+    """Create the upload directory once and resolve it"""
+    path = Path(upload_dir)
+    path.mkdir(parents=True, exist_ok=True)
+    return path, path.resolve()
 
 
 # Singleton instance
@@ -4,6 +4,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import logging
+import threading
 
 from app.api.routes import router
 from app.core.config import settings
@@ -62,6 +63,19 @@ async def health_check():
     return {"status": "ok"}
 
 
+def _warm_up_stt() -> None:
+    """Load the enabled STT models and run one warmup pass on each"""
+    try:
+        if settings.fast_stt_enabled:
+            from app.services.stt_fast_service import get_fast_stt_service
+            get_fast_stt_service().warmup()
+        if settings.hebrish_stt_enabled:
+            from app.services.stt_hebrish_service import get_hebrish_stt_service
+            get_hebrish_stt_service().warmup()
+    except Exception as e:
+        logger.warning(f"STT warmup failed: {e}")
+
+
 @app.on_event("startup")
 async def startup_event():
     """Application startup tasks"""
@@ -71,6 +85,11 @@ async def startup_event():
     # Create upload directory
     settings.get_upload_path()
     
+    # Model loading takes seconds; do it off the event loop so startup isn't
+    # blocked and the first transcription request doesn't pay for it
+    if settings.stt_warmup_enabled:
+        threading.Thread(target=_warm_up_stt, name="stt-warmup", daemon=True).start()
+    
     logger.info("MediaLens AI started successfully")
 
 
@@ -78,6 +97,23 @@ async def startup_event():
 async def shutdown_event():
     """Application shutdown tasks"""
     logger.info("Shutting down MediaLens AI...")
+    
+    # Let in-flight Acontext uploads finish instead of cancelling them with the loop
+    from app.services.video_pipeline import wait_for_artifact_uploads
+    await wait_for_artifact_uploads(timeout=10.0)
+    
+    # Stop the session writer/reaper threads and write out pending updates
+    from app.services.session_manager import get_session_manager
+    get_session_manager().close()
+    
+    # Let the background writer finish queued agent/doc turns before the
+    # turn log handles are closed underneath it
+    from app.services import ai_generator
+    ai_generator.drain(timeout=10.0)
+    
+    # Turn logs are written through per-session buffers
+    from app.services.turn_log_service import get_turn_log_service
+    get_turn_log_service().close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,124 @@
+"""
+Shared faster-whisper model registry.
+
+Loading a CTranslate2 Whisper model takes seconds and hundreds of MB of
+RAM (or VRAM on CUDA). Services asking for the same model, device and
+compute type get one shared instance instead of each loading a copy.
+"""
+
+import os
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# CTranslate2 workers let concurrent transcribe() calls run in parallel; the
+# cores are split between them so parallel calls don't oversubscribe the CPU
+WHISPER_NUM_WORKERS = 2
+WHISPER_CPU_THREADS = max(1, (os.cpu_count() or 1) // WHISPER_NUM_WORKERS)
+
+# Warmup input: 1 s of silence at Whisper's 16 kHz sample rate
+_WARMUP_SAMPLES = 16000
+
+# (model_name, device, compute_type) -> WhisperModel
+_MODELS: Dict[Tuple[str, str, str], Any] = {}
+_models_lock = threading.Lock()
+
+# (model_name, device, compute_type) -> slots bounding concurrent
+# transcriptions on that model, shared by every service using it. Thread
+# semaphores, not anyio ones: an anyio.Semaphore binds to the first event
+# loop that waits on it, and callers run on several loops (server, warmup
+# thread, asyncio.run in sync wrappers).
+_TRANSCRIBE_SLOTS: Dict[Tuple[str, Optional[str], Optional[str]], threading.BoundedSemaphore] = {}
+
+
+def get_or_load_model(model_name: str, device: str, compute_type: str) -> Any:
+    """
+    Get the shared WhisperModel for these settings, loading it on first use.
+
+    Args:
+        model_name: Model size or Hugging Face repo id
+        device: "cpu" or "cuda"
+        compute_type: CTranslate2 compute type (e.g. "int8", "int8_float16")
+
+    Returns:
+        faster_whisper.WhisperModel
+
+    Raises:
+        ImportError: If faster-whisper is not installed
+        Exception: Whatever the model load raises (nothing is cached then)
+    """
+    key = (model_name, device, compute_type)
+    model = _MODELS.get(key)
+    if model is None:
+        with _models_lock:
+            # Double-check after acquiring lock
+            model = _MODELS.get(key)
+            if model is None:
+                from faster_whisper import WhisperModel
+
+                model = WhisperModel(
+                    model_name,
+                    device=device,
+                    compute_type=compute_type,
+                    cpu_threads=WHISPER_CPU_THREADS,
+                    num_workers=WHISPER_NUM_WORKERS
+                )
+                _MODELS[key] = model
+                logger.info(f"Loaded Whisper model {model_name} ({device}, {compute_type})")
+    return model
+
+
+def warm_up_model(model: Any, **transcribe_options: Any) -> None:
+    """
+    Run one short silent transcription so the first real request doesn't
+    pay for kernel and allocator initialization.
+
+    Args:
+        model: Loaded WhisperModel
+        **transcribe_options: Extra transcribe() arguments (e.g. language)
+
+    Raises:
+        Exception: Whatever the model raises (callers log it)
+    """
+    import numpy as np
+
+    segments, _ = model.transcribe(
+        np.zeros(_WARMUP_SAMPLES, dtype=np.float32),
+        beam_size=1,
+        **transcribe_options
+    )
+    # Segments are generated lazily; consume them so decoding actually runs
+    list(segments)
+
+
+def get_transcribe_slots(model_name: str, device: Optional[str], compute_type: Optional[str]) -> threading.BoundedSemaphore:
+    """
+    Get the semaphore bounding concurrent transcriptions on a shared model.
+
+    Holds WHISPER_NUM_WORKERS slots (the model's parallelism), however many
+    service instances share the model. Acquire it in the worker thread that
+    runs the transcription.
+
+    Args:
+        model_name: Model size or Hugging Face repo id
+        device: "cpu" or "cuda"
+        compute_type: CTranslate2 compute type
+
+    Returns:
+        threading.BoundedSemaphore for the model
+    """
+    key = (model_name, device, compute_type)
+    slots = _TRANSCRIBE_SLOTS.get(key)
+    if slots is None:
+        with _models_lock:
+            slots = _TRANSCRIBE_SLOTS.setdefault(key, threading.BoundedSemaphore(WHISPER_NUM_WORKERS))
+    return slots
+
+
+def clear_models() -> None:
+    """Drop all shared models (for testing)"""
+    with _models_lock:
+        _MODELS.clear()
+        _TRANSCRIBE_SLOTS.clear()
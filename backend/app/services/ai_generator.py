@@ -1,14 +1,46 @@
 """AI documentation generation service using Google Gemini"""
 
 import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+from pydantic import BaseModel, ConfigDict, ValidationError
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Tuple, TYPE_CHECKING
 import logging
 import json
+import os
+import queue
+import random
 import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# orjson parses ~3-5x faster than stdlib json; fall back if it isn't installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+except ImportError:
+    _json_loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
 
 from app.core.config import settings
 from app.core.observability import trace_pipeline, record_event, EventType
+from app.services.video_processor import prepare_frame_for_upload, UPLOAD_THUMBNAIL_MAX_DIM
+from app.services.turn_log_service import get_turn_log_service, SessionTurnFast, TurnType
+
+# Fast STT is optional (faster-whisper may not be installed); resolve it once
+try:
+    from app.services.stt_fast_service import get_fast_stt_service
+    _HAS_STT = True
+except ImportError:
+    get_fast_stt_service = None
+    _HAS_STT = False
+
+if TYPE_CHECKING:
+    from app.services.stt_fast_service import SttResult
+    from app.services.prompt_loader import PromptConfig
 
 logger = logging.getLogger(__name__)
 
@@ -18,13 +50,248 @@ class AIGenerationError(Exception):
     pass
 
 
+# Transient Gemini errors (429 / 5xx) worth retrying with backoff
+_RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.InternalServerError,
+    google_exceptions.DeadlineExceeded,
+)
+_MAX_ATTEMPTS = 5
+_RETRY_INITIAL_DELAY = 1.0
+_RETRY_MAX_DELAY = 30.0
+
+
+def _call_with_retry(func: Callable, *args, rate_limiter: Optional["_RateLimiter"] = None, **kwargs):
+    """
+    Call a Gemini SDK function, retrying rate-limit/server errors with
+    exponential backoff and full jitter.
+    
+    When a rate_limiter is given, every attempt (retries included) takes a
+    token first, so retries after a 429 are throttled too.
+    """
+    for attempt in range(1, _MAX_ATTEMPTS + 1):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        try:
+            return func(*args, **kwargs)
+        except _RETRYABLE_ERRORS as e:
+            if attempt == _MAX_ATTEMPTS:
+                raise
+            delay = random.uniform(0, min(_RETRY_MAX_DELAY, _RETRY_INITIAL_DELAY * 2 ** (attempt - 1)))
+            logger.warning(
+                "Gemini call failed (%s), retry %d/%d in %.1fs",
+                type(e).__name__, attempt, _MAX_ATTEMPTS - 1, delay
+            )
+            time.sleep(delay)
+
+
+class RelevantSegment(BaseModel):
+    """A time range flagged as relevant by Gemini"""
+    model_config = ConfigDict(extra="allow")
+    
+    start: float
+    end: float
+    key_timestamps: List[float] = []
+
+
+class RelevanceResponse(BaseModel):
+    """Typed view of the relevance analysis JSON"""
+    relevant_segments: List[RelevantSegment] = []
+
+
+# Structured-output schema for multimodal relevance analysis. Only the fields
+# the pipeline reads are requested, keeping output tokens (and latency) down.
+_RELEVANCE_RESPONSE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "relevant_segments": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "start": {"type": "number"},
+                    "end": {"type": "number"},
+                    "key_timestamps": {"type": "array", "items": {"type": "number"}}
+                },
+                "required": ["start", "end", "key_timestamps"]
+            }
+        }
+    },
+    "required": ["relevant_segments"]
+}
+
+
+# Relevance prompts are built once at import and filled with str.format per call
+_MULTIMODAL_PROMPT = """
+        Analyze this video demonstration. 
+        1. Identify segments where TECHNICAL content related to "{keywords}" is discussed or shown.
+        2. Within those segments, identify the EXACT timestamps for high-quality screenshots.
+        3. Visual Quality Control: NEVER select a frame that shows a blank/white screen, a loading spinner, or a blurred transition.
+        4. If a key moment happens during a loading state, look forward/backward by 2-3 seconds to find the fully rendered UI.
+        
+        Return STRICTLY JSON:
+        {{"relevant_segments": [{{"start": float, "end": float, "key_timestamps": [float]}}]}}
+        """
+
+_TEXT_PROMPT = """
+You are analyzing a video transcript to find relevant technical segments.
+The video contains discussion about: {keywords}
+
+TRANSCRIPT (with timestamps):
+{transcript}
+
+Identify the time ranges where TECHNICAL content related to "{keywords}" is discussed.
+For each relevant segment, suggest key_timestamps for screenshot extraction.
+
+Return STRICTLY JSON:
+{{
+  "relevant_segments": [
+    {{
+      "start": float,
+      "end": float,
+      "reason": "string",
+      "key_timestamps": [float, float]
+    }}
+  ],
+  "technical_percentage": float
+}}
+"""
+
+
+# [Frame X] references emitted by the model, replaced with image Markdown
+_FRAME_RE = re.compile(r'\[Frame (\d+)\]')
+
+# Polling schedule while Gemini processes an uploaded video
+_POLL_INITIAL_DELAY = 0.25
+_POLL_BACKOFF_FACTOR = 1.6
+_POLL_MAX_DELAY = 4.0
+_POLL_TIMEOUT_SECONDS = 300
+
+# Handle cache for the rare upload_file fallback (frames of unknown type, too
+# large to inline or past the inline budget), so it is kept small. Gemini
+# deletes uploaded files after 48h, so handles are reused for slightly less.
+_UPLOAD_CACHE_MAXSIZE = 64
+_UPLOAD_CACHE_TTL_SECONDS = 47 * 3600
+
+# Fence tags the model uses when it wraps a whole doc in a code block
+_MARKDOWN_FENCE_TAGS = frozenset({"markdown", "md"})
+
+# Frames are sent inline with generate_content (no upload_file round-trip)
+# while their combined size stays under this; Gemini caps a request at 20 MB
+_INLINE_REQUEST_MAX_BYTES = 15 * 1024 * 1024
+
+# Inline frame MIME types by extension; anything else goes through upload_file
+_INLINE_FRAME_MIME_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+}
+
+# Turn-log writes are handed to a background thread so disk I/O stays off
+# the generation path. If the bounded queue backs up, producers wait up to
+# _LOG_PUT_TIMEOUT for room and then write the turn themselves.
+_LOG_QUEUE: "queue.Queue[SessionTurnFast]" = queue.Queue(maxsize=1024)
+_LOG_PUT_TIMEOUT = 5.0
+_log_worker_started = False
+_log_worker_lock = threading.Lock()
+
+
+def _write_turn(turn: SessionTurnFast) -> None:
+    """Append one turn to the turn log, logging (not raising) on failure"""
+    try:
+        get_turn_log_service().append_turn(turn)
+    except Exception as e:
+        logger.warning("Failed to write %s turn: %s", turn.type, e)
+
+
+def _log_worker() -> None:
+    """Drain queued turns into the turn log"""
+    while True:
+        turn = _LOG_QUEUE.get()
+        try:
+            _write_turn(turn)
+        finally:
+            _LOG_QUEUE.task_done()
+
+
+def _enqueue_turn(turn: SessionTurnFast) -> None:
+    """Queue a turn for the background writer, starting it on first use"""
+    global _log_worker_started
+    if not _log_worker_started:
+        with _log_worker_lock:
+            if not _log_worker_started:
+                threading.Thread(target=_log_worker, name="turn-log-writer", daemon=True).start()
+                _log_worker_started = True
+    try:
+        _LOG_QUEUE.put(turn, timeout=_LOG_PUT_TIMEOUT)
+    except queue.Full:
+        logger.warning("Turn log queue full, writing %s turn for session %s inline", turn.type, turn.session_id)
+        _write_turn(turn)
+
+
+def drain(timeout: float = 10.0) -> bool:
+    """
+    Wait for queued turns to be written, like _LOG_QUEUE.join() with a deadline.
+    
+    Args:
+        timeout: Maximum seconds to wait
+    
+    Returns:
+        True if the queue emptied, False if the deadline passed first
+    """
+    deadline = time.monotonic() + timeout
+    with _LOG_QUEUE.all_tasks_done:
+        while _LOG_QUEUE.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning("Turn log queue not drained, %d turns pending", _LOG_QUEUE.unfinished_tasks)
+                return False
+            _LOG_QUEUE.all_tasks_done.wait(remaining)
+    return True
+
+
+class _RateLimiter:
+    """
+    Thread-safe token bucket allowing bursts of up to `rpm` calls, refilled
+    continuously at `rpm` per minute. A non-positive rpm disables limiting.
+    """
+    
+    def __init__(self, rpm: int):
+        self._capacity = float(rpm)
+        self._tokens = float(rpm)
+        self._rate = rpm / 60.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Block until a request slot is available"""
+        if self._rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            # Reserve a token even if that drives the bucket negative; callers queue in order
+            self._tokens -= 1
+            wait = -self._tokens / self._rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
 class DocumentationGenerator:
     """Service for generating documentation using Google Gemini"""
     
     def __init__(self):
         """Initialize the Gemini API clients"""
         try:
-            genai.configure(api_key=settings.gemini_api_key)
+            # gRPC is the SDK default; the setting only lets deployments pick "rest"
+            genai.configure(
+                api_key=settings.gemini_api_key,
+                transport=settings.gemini_transport
+            )
             
             # Use configurable model names
             pro_model = getattr(settings, 'doc_model_pro_name', 'gemini-2.5-flash-lite')
@@ -33,9 +300,46 @@ class DocumentationGenerator:
             self.model_pro = genai.GenerativeModel(pro_model)
             self.model_flash = genai.GenerativeModel(flash_model)
             
+            # Generation configs are immutable - build them once per client
+            self._cfg_analyze_video = genai.GenerationConfig(
+                temperature=0.1,
+                top_p=0.95,
+                max_output_tokens=2048,
+                response_mime_type="application/json",
+                response_schema=_RELEVANCE_RESPONSE_SCHEMA
+            )
+            self._cfg_analyze_text = genai.GenerationConfig(
+                temperature=0.1,
+                top_p=0.95,
+                max_output_tokens=2048,
+                response_mime_type="application/json"
+            )
+            self._cfg_doc_pro = genai.GenerationConfig(
+                temperature=0.4,  # Lower temperature for more focused output
+                top_p=0.95,
+                top_k=40,
+                max_output_tokens=8192,
+            )
+            self._cfg_segment = genai.GenerationConfig(
+                temperature=0.3,
+                top_p=0.95,
+                max_output_tokens=4096,
+            )
+            
+            # Client-side request budget so parallel calls don't trip 429s
+            self._rate_limiter = _RateLimiter(settings.gemini_rate_limit_rpm)
+            self._max_concurrency = settings.gemini_max_concurrency
+            
+            # Fast STT availability is fixed for the process - check it once
+            self.fast_stt_enabled = settings.fast_stt_enabled and _HAS_STT
+            
+            # (path, mtime_ns, size) -> (file handle, uploaded_at), LRU ordered
+            self._upload_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+            self._upload_cache_lock = threading.Lock()
+            
             logger.info(f"Gemini API initialized: Pro={pro_model}, Flash={flash_model}")
         except Exception as e:
-            raise AIGenerationError(f"Failed to initialize Gemini API: {str(e)}")
+            raise AIGenerationError(f"Failed to initialize Gemini API: {e}") from e
     
     
     def _analyze_multimodal_fast(self, video_file, context_keywords: List[str] = None):
@@ -44,35 +348,12 @@ class DocumentationGenerator:
         Uses multimodal understanding to find technical segments and quality frames.
         """
         keywords_str = ", ".join(context_keywords) if context_keywords else "general technical content"
-        prompt = f"""
-        Analyze this video demonstration. 
-        1. Identify segments where TECHNICAL content related to "{keywords_str}" is discussed or shown.
-        2. Within those segments, identify the EXACT timestamps for high-quality screenshots.
-        3. Visual Quality Control: NEVER select a frame that shows a blank/white screen, a loading spinner, or a blurred transition.
-        4. If a key moment happens during a loading state, look forward/backward by 2-3 seconds to find the fully rendered UI.
-        
-        Return STRICTLY JSON:
-        {{
-          "relevant_segments": [
-            {{
-              "start": float,
-              "end": float,
-              "reason": "string",
-              "key_timestamps": [float, float]
-            }}
-          ],
-          "technical_percentage": float
-        }}
-        """
+        prompt = _MULTIMODAL_PROMPT.format(keywords=keywords_str)
         
-        response = self.model_flash.generate_content(
+        response = self._generate_content(
+            self.model_flash,
             [video_file, prompt],
-            generation_config=genai.GenerationConfig(
-                temperature=0.1,
-                top_p=0.95,
-                max_output_tokens=2048,
-                response_mime_type="application/json"
-            )
+            generation_config=self._cfg_analyze_video
         )
         return response
 
@@ -91,9 +372,8 @@ class DocumentationGenerator:
         """
         try:
             # Try Fast STT path if audio is available and STT is enabled
-            if audio_path and settings.fast_stt_enabled:
+            if audio_path and self.fast_stt_enabled:
                 try:
-                    from app.services.stt_fast_service import get_fast_stt_service
                     stt_service = get_fast_stt_service()
                     
                     if stt_service.is_available:
@@ -112,23 +392,28 @@ class DocumentationGenerator:
                                 stt_result, 
                                 context_keywords
                             )
-                except ImportError:
-                    logger.warning("FastSttService not available, using video analysis")
                 except Exception as e:
-                    logger.warning(f"Fast STT failed, falling back to video analysis: {e}")
+                    logger.warning("Fast STT failed, falling back to video analysis: %s", e)
             
             # Fall back to multimodal video analysis
             logger.info(f"Performing multimodal analysis on: {video_path}")
             
             # Upload video file (Gemini handles video files directly)
             logger.info("Uploading video proxy to Gemini Flash...")
-            video_file = genai.upload_file(video_path)
+            video_file = _call_with_retry(genai.upload_file, video_path, rate_limiter=self._rate_limiter)
             
             # Wait for file to be processed if needed (Gemini backend async)
-            # For small proxies it's usually fast, but let's be safe
-            import time
+            # Poll with exponential backoff: small proxies are ready within a
+            # few hundred ms, long ones don't need a request every second
+            delay = _POLL_INITIAL_DELAY
+            deadline = time.monotonic() + _POLL_TIMEOUT_SECONDS
             while video_file.state.name == "PROCESSING":
-                time.sleep(1)
+                if time.monotonic() > deadline:
+                    raise AIGenerationError(
+                        f"Timed out after {_POLL_TIMEOUT_SECONDS}s waiting for video file processing: {video_file.name}"
+                    )
+                time.sleep(delay)
+                delay = min(delay * _POLL_BACKOFF_FACTOR, _POLL_MAX_DELAY)
                 video_file = genai.get_file(video_file.name)
             
             if video_file.state.name == "FAILED":
@@ -141,21 +426,22 @@ class DocumentationGenerator:
             if not response.text:
                 raise AIGenerationError("Gemini Flash returned empty response")
             
-            # Parse JSON response
+            # Parse and validate the fixed-schema response in one pass
             try:
-                result = json.loads(response.text)
-                segments = result.get("relevant_segments", [])
+                result = RelevanceResponse.model_validate_json(response.text)
+                # exclude_unset keeps "key_timestamps missing" distinguishable for the pipeline
+                segments = [seg.model_dump(exclude_unset=True) for seg in result.relevant_segments]
                 logger.info(f"Found {len(segments)} relevant segments via multimodal analysis")
                 
                 return segments
             
-            except json.JSONDecodeError as e:
-                logger.error(f"Failed to parse JSON response: {response.text}")
-                raise AIGenerationError(f"Invalid JSON from video analysis: {str(e)}")
+            except ValidationError as e:
+                logger.error("Failed to parse JSON response: %s", response.text)
+                raise AIGenerationError(f"Invalid JSON from video analysis: {e}") from e
         
         except Exception as e:
-            logger.error(f"Video analysis failed: {str(e)}")
-            raise AIGenerationError(f"Failed to analyze video proxy: {str(e)}")
+            logger.error("Video analysis failed: %s", e)
+            raise AIGenerationError(f"Failed to analyze video proxy: {e}") from e
     
     def _analyze_text_relevance(
         self,
@@ -167,48 +453,20 @@ class DocumentationGenerator:
         Analyze STT transcript text to identify relevant segments.
         Uses Gemini Flash for text-based relevance scoring - much faster than video.
         """
-        from app.services.stt_fast_service import SttResult
-        
         # Get condensed summary for Gemini
         summary_text = stt_result.get_text_summary(max_tokens=500)
         keywords_str = ", ".join(context_keywords) if context_keywords else "general technical content"
         
-        prompt = f"""
-You are analyzing a video transcript to find relevant technical segments.
-The video contains discussion about: {keywords_str}
-
-TRANSCRIPT (with timestamps):
-{summary_text}
-
-Identify the time ranges where TECHNICAL content related to "{keywords_str}" is discussed.
-For each relevant segment, suggest key_timestamps for screenshot extraction.
-
-Return STRICTLY JSON:
-{{
-  "relevant_segments": [
-    {{
-      "start": float,
-      "end": float,
-      "reason": "string",
-      "key_timestamps": [float, float]
-    }}
-  ],
-  "technical_percentage": float
-}}
-"""
+        prompt = _TEXT_PROMPT.format(keywords=keywords_str, transcript=summary_text)
         
-        response = self.model_flash.generate_content(
+        response = self._generate_content(
+            self.model_flash,
             prompt,
-            generation_config=genai.GenerationConfig(
-                temperature=0.1,
-                top_p=0.95,
-                max_output_tokens=2048,
-                response_mime_type="application/json"
-            )
+            generation_config=self._cfg_analyze_text
         )
         
         try:
-            result = json.loads(response.text)
+            result = _json_loads(response.text)
             segments = result.get("relevant_segments", [])
             logger.info(f"Found {len(segments)} relevant segments via text analysis (Fast STT)")
             
@@ -217,9 +475,9 @@ Return STRICTLY JSON:
                 self._log_agent_notes(session_id, segments, keywords_str)
             
             return segments
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse text analysis response: {response.text}")
-            raise AIGenerationError(f"Invalid JSON from text analysis: {str(e)}")
+        except _JSONDecodeError as e:
+            logger.error("Failed to parse text analysis response: %s", response.text)
+            raise AIGenerationError(f"Invalid JSON from text analysis: {e}") from e
     
     @trace_pipeline
     def generate_documentation(
@@ -272,14 +530,7 @@ Return STRICTLY JSON:
             user_prompt += " and create documentation according to your instructions.\n"
             
             # Upload frames
-            uploaded_files = []
-            for i, frame_path in enumerate(frame_paths):
-                try:
-                    file = genai.upload_file(frame_path)
-                    uploaded_files.append(file)
-                    logger.debug(f"Uploaded frame {i + 1}/{len(frame_paths)}")
-                except Exception as e:
-                    logger.warning(f"Failed to upload frame {frame_path}: {str(e)}")
+            uploaded_files = self._prepare_frame_parts(frame_paths)
             
             if not uploaded_files:
                 raise AIGenerationError("Failed to upload any frames to Gemini")
@@ -290,49 +541,21 @@ Return STRICTLY JSON:
             
             # Generate content with Pro model
             logger.info("Sending generation request to Gemini Pro...")
-            response = self.model_pro.generate_content(
+            response = self._generate_content(
+                self.model_pro,
                 prompt_parts,
-                generation_config=genai.GenerationConfig(
-                    temperature=0.4,  # Lower temperature for more focused output
-                    top_p=0.95,
-                    top_k=40,
-                    max_output_tokens=8192,
-                )
+                generation_config=self._cfg_doc_pro
             )
             
             # Extract text from response
             if not response.text:
                 raise AIGenerationError("Gemini returned empty response")
             
-            documentation = response.text.strip()
+            documentation = self.strip_markdown_fences(response.text)
             
             # --- Post-Processing: Embed Images ---
             # Replace [Frame X] with actual image Markdown
-            
-            def _get_web_url(local_path: str) -> str:
-                try:
-                    rel_path = Path(local_path).relative_to(settings.get_upload_path().resolve())
-                    return f"/uploads/{rel_path.as_posix()}"
-                except ValueError:
-                    # Try non-resolved path too
-                    try:
-                        rel_path = Path(local_path).relative_to(settings.get_upload_path())
-                        return f"/uploads/{rel_path.as_posix()}"
-                    except ValueError:
-                        return f"/uploads/{Path(local_path).name}"
-
-            def replace_match(match):
-                try:
-                    idx = int(match.group(1)) - 1 # 1-based index to 0-based
-                    if 0 <= idx < len(frame_paths):
-                        url = _get_web_url(frame_paths[idx])
-                        return f"![Frame {idx+1}]({url})"
-                except Exception:
-                    pass
-                return match.group(0)
-
-            # Replace [Frame X] patterns
-            documentation = re.sub(r'\[Frame (\d+)\]', replace_match, documentation)
+            documentation = self._embed_frame_images(documentation, frame_paths)
             
             logger.info(f"Successfully generated {len(documentation)} characters of documentation")
             
@@ -348,8 +571,8 @@ Return STRICTLY JSON:
             return documentation
         
         except Exception as e:
-            logger.error(f"Documentation generation failed: {str(e)}")
-            raise AIGenerationError(f"Failed to generate documentation: {str(e)}")
+            logger.error("Documentation generation failed: %s", e)
+            raise AIGenerationError(f"Failed to generate documentation: {e}") from e
     
     def generate_segment_doc(
         self,
@@ -394,14 +617,11 @@ Return STRICTLY JSON:
             user_prompt += "Please analyze the frames and document what's shown in this segment.\n"
             user_prompt += "Focus on the key actions, UI elements, and any important details visible.\n"
             
-            # Upload frames
-            uploaded_files = []
-            for i, frame_path in enumerate(frame_paths):
-                try:
-                    file = genai.upload_file(frame_path)
-                    uploaded_files.append(file)
-                except Exception as e:
-                    logger.warning(f"Failed to upload frame {frame_path}: {str(e)}")
+            # Upload frames (near-duplicate context frames go up as thumbnails)
+            uploaded_files = self._prepare_frame_parts(
+                frame_paths,
+                thumbnail_dim=UPLOAD_THUMBNAIL_MAX_DIM
+            )
             
             if not uploaded_files:
                 # Return placeholder if no frames uploaded
@@ -412,51 +632,212 @@ Return STRICTLY JSON:
             prompt_parts.extend(uploaded_files)
             
             # Generate with Flash model for speed (segments are smaller)
-            response = self.model_flash.generate_content(
+            response = self._generate_content(
+                self.model_flash,
                 prompt_parts,
-                generation_config=genai.GenerationConfig(
-                    temperature=0.3,
-                    top_p=0.95,
-                    max_output_tokens=4096,
-                )
+                generation_config=self._cfg_segment
             )
             
             if not response.text:
                 return f"## Segment {seg_index + 1}\n\n*No content generated.*\n\n"
             
-            segment_doc = response.text.strip()
+            segment_doc = self.strip_markdown_fences(response.text)
             
             # Post-process: Replace [Frame X] with actual images
-            def _get_web_url(local_path: str) -> str:
-                try:
-                    rel_path = Path(local_path).relative_to(settings.get_upload_path().resolve())
-                    return f"/uploads/{rel_path.as_posix()}"
-                except ValueError:
-                    try:
-                        rel_path = Path(local_path).relative_to(settings.get_upload_path())
-                        return f"/uploads/{rel_path.as_posix()}"
-                    except ValueError:
-                        return f"/uploads/{Path(local_path).name}"
-
-            def replace_match(match):
-                try:
-                    idx = int(match.group(1)) - 1
-                    if 0 <= idx < len(frame_paths):
-                        url = _get_web_url(frame_paths[idx])
-                        return f"![Frame {idx+1}]({url})"
-                except Exception:
-                    pass
-                return match.group(0)
-
-            segment_doc = re.sub(r'\[Frame (\d+)\]', replace_match, segment_doc)
+            segment_doc = self._embed_frame_images(segment_doc, frame_paths)
             
             logger.info(f"Generated {len(segment_doc)} characters for segment {seg_index}")
             
             return segment_doc
         
         except Exception as e:
-            logger.error(f"Segment doc generation failed: {str(e)}")
-            raise AIGenerationError(f"Failed to generate segment documentation: {str(e)}")
+            logger.error("Segment doc generation failed: %s", e)
+            raise AIGenerationError(f"Failed to generate segment documentation: {e}") from e
+    
+    def _upload_frame(self, upload_path: str):
+        """
+        Upload an already prepared frame (see prepare_frame_for_upload) with retries.
+        
+        This is the rare fallback for frames that cannot go inline (unknown
+        image type, too large, or past the inline budget in
+        _prepare_frame_parts). Its small handle cache, keyed by
+        (path, mtime_ns, size), only saves re-uploads of such frames across
+        retries or overlapping segments.
+        """
+        try:
+            stat = os.stat(upload_path)
+            cache_key = (upload_path, stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            cache_key = None
+        
+        if cache_key:
+            with self._upload_cache_lock:
+                cached = self._upload_cache.get(cache_key)
+                if cached:
+                    handle, uploaded_at = cached
+                    expired = time.monotonic() - uploaded_at > _UPLOAD_CACHE_TTL_SECONDS
+                    if expired or handle.state.name == "FAILED":
+                        del self._upload_cache[cache_key]
+                    else:
+                        self._upload_cache.move_to_end(cache_key)
+                        return handle
+        
+        handle = _call_with_retry(genai.upload_file, upload_path, rate_limiter=self._rate_limiter)
+        
+        if cache_key:
+            with self._upload_cache_lock:
+                self._upload_cache[cache_key] = (handle, time.monotonic())
+                self._upload_cache.move_to_end(cache_key)
+                if len(self._upload_cache) > _UPLOAD_CACHE_MAXSIZE:
+                    self._upload_cache.popitem(last=False)
+        
+        return handle
+    
+    def _frame_part(self, frame_path: str, max_dim: Optional[int] = None) -> Tuple[str, Any]:
+        """
+        Build the prompt part for a frame: inline image bytes when the frame
+        fits in a request and has a known image type, otherwise an uploaded
+        file handle.
+        
+        Returns:
+            (prepared upload path, prompt part)
+        """
+        upload_path = prepare_frame_for_upload(frame_path, max_dim=max_dim)
+        mime_type = _INLINE_FRAME_MIME_TYPES.get(os.path.splitext(upload_path)[1].lower())
+        try:
+            if mime_type and os.path.getsize(upload_path) <= _INLINE_REQUEST_MAX_BYTES:
+                with open(upload_path, "rb") as f:
+                    return upload_path, {"mime_type": mime_type, "data": f.read()}
+        except OSError:
+            pass
+        
+        return upload_path, self._upload_frame(upload_path)
+    
+    def _prepare_frame_parts(
+        self,
+        frame_paths: List[str],
+        thumbnail_dim: Optional[int] = None
+    ) -> List[Any]:
+        """
+        Prepare frame prompt parts concurrently on a bounded thread pool.
+        
+        Frames are sent inline with the generate_content request, so the common
+        case needs no upload_file round-trips at all. Frames beyond the inline
+        request budget fall back to upload_file. Failures are logged and skipped.
+        
+        Args:
+            frame_paths: Frame image paths in document order
+            thumbnail_dim: If set, every frame except the first, middle and last
+                is sent as a thumbnail with this longest side
+        
+        Returns:
+            Inline image parts / uploaded file handles, in frame_paths order
+        """
+        if not frame_paths:
+            return []
+        
+        results: List[Any] = [None] * len(frame_paths)
+        upload_paths: List[Optional[str]] = [None] * len(frame_paths)
+        max_workers = max(1, min(self._max_concurrency, len(frame_paths)))
+        # Anchor frames (first, middle, last) keep full resolution
+        full_res = {0, len(frame_paths) // 2, len(frame_paths) - 1} if thumbnail_dim else None
+        max_dims = [
+            None if full_res is None or i in full_res else thumbnail_dim
+            for i in range(len(frame_paths))
+        ]
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._frame_part, frame_path, max_dims[i]): i
+                for i, frame_path in enumerate(frame_paths)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    upload_paths[i], results[i] = future.result()
+                    logger.debug(f"Prepared frame {i + 1}/{len(frame_paths)}")
+                except Exception as e:
+                    logger.warning("Failed to prepare frame %s: %s", frame_paths[i], e)
+        
+        # Keep the inline payload within the request limit, in document order
+        inline_bytes = 0
+        for i, part in enumerate(results):
+            if not isinstance(part, dict):
+                continue
+            inline_bytes += len(part["data"])
+            if inline_bytes > _INLINE_REQUEST_MAX_BYTES:
+                try:
+                    results[i] = self._upload_frame(upload_paths[i])
+                except Exception as e:
+                    logger.warning("Failed to upload frame %s: %s", frame_paths[i], e)
+                    results[i] = None
+        
+        return [f for f in results if f is not None]
+    
+    def _generate_content(self, model, contents, **kwargs):
+        """Rate-limited generate_content with retries on transient errors"""
+        return _call_with_retry(model.generate_content, contents, rate_limiter=self._rate_limiter, **kwargs)
+    
+    @staticmethod
+    def strip_markdown_fences(text: str) -> str:
+        """
+        Unwrap a response the model returned as one ```markdown / ```md block.
+        
+        Works on the raw string with find/slice rather than splitting into lines.
+        Anything else, including a doc that is a single code block in another
+        language, is only stripped of whitespace.
+        """
+        s = text.strip()
+        # Common case: no wrapping fence (startswith is a C-level prefix check)
+        if not (s.startswith("```") and s.endswith("```")):
+            return s
+        nl = s.find("\n")
+        end = len(s) - 3
+        if nl < 0 or nl > end:
+            return s
+        if s[3:nl].strip().lower() not in _MARKDOWN_FENCE_TAGS:
+            return s
+        if s.find("```", nl, end) >= 0:
+            # Several code blocks, not a single wrapping fence
+            return s
+        return s[nl + 1:end].strip()
+    
+    @staticmethod
+    def _get_web_url(local_path: str, upload_root_resolved: Path, upload_root: Path) -> str:
+        """Map a local frame path to its /uploads web URL (roots are resolved by the caller)."""
+        path = Path(local_path)
+        # Try the resolved root first, then the non-resolved one
+        for root in (upload_root_resolved, upload_root):
+            try:
+                return f"/uploads/{path.relative_to(root).as_posix()}"
+            except ValueError:
+                continue
+        return f"/uploads/{path.name}"
+    
+    @staticmethod
+    def _replace_frame(match: "re.Match", frame_urls: List[str]) -> str:
+        """Turn a [Frame X] reference into image Markdown, leaving unknown frames as-is."""
+        # _FRAME_RE only captures digits, so int() cannot fail; the lookup is a list index
+        idx = int(match.group(1)) - 1  # 1-based index to 0-based
+        if 0 <= idx < len(frame_urls):
+            return f"![Frame {idx+1}]({frame_urls[idx]})"
+        return match.group(0)
+    
+    def _embed_frame_images(self, markdown: str, frame_paths: List[str]) -> str:
+        """Replace [Frame X] references with image links to the uploaded frames."""
+        if not frame_paths or "[Frame " not in markdown:
+            return markdown
+        
+        # Resolve each frame URL once, not once per [Frame X] reference;
+        # the roots themselves are resolved once per process
+        upload_root, upload_root_resolved = settings.get_upload_roots()
+        frame_urls = [
+            self._get_web_url(p, upload_root_resolved, upload_root)
+            for p in frame_paths
+        ]
+        replace = self._replace_frame
+        # Default-arg binding keeps the table a fast local inside the callback
+        return _FRAME_RE.sub(lambda m, tbl=frame_urls: replace(m, tbl), markdown)
     
     def merge_segments(
         self,
@@ -479,10 +860,12 @@ Return STRICTLY JSON:
         # Sort by index
         sorted_docs = sorted(segment_docs, key=lambda x: x.get("index", 0))
         
-        # Build merged document
-        merged = f"# {project_name} Documentation\n\n"
-        merged += f"*Generated from {len(sorted_docs)} video segments*\n\n"
-        merged += "---\n\n"
+        # Build merged document (collect parts, join once)
+        parts = [
+            f"# {project_name} Documentation\n\n",
+            f"*Generated from {len(sorted_docs)} video segments*\n\n",
+            "---\n\n",
+        ]
         
         for seg in sorted_docs:
             seg_index = seg.get("index", 0)
@@ -491,31 +874,29 @@ Return STRICTLY JSON:
             doc = seg.get("doc", "")
             
             # Add segment header
-            merged += f"## Part {seg_index + 1} ({seg_start:.0f}s - {seg_end:.0f}s)\n\n"
+            parts.append(f"## Part {seg_index + 1} ({seg_start:.0f}s - {seg_end:.0f}s)\n\n")
             
             # Add segment content (strip duplicate headers if any)
+            # Remove a leading # header since we add our own - index math, no split/join
             content = doc.strip()
-            # Remove any leading # headers since we add our own
-            lines = content.split("\n")
-            if lines and lines[0].startswith("#"):
-                lines = lines[1:]
-            content = "\n".join(lines).strip()
+            if content.startswith("#"):
+                nl = content.find("\n")
+                content = content[nl + 1:].lstrip() if nl >= 0 else ""
             
-            merged += content + "\n\n"
-            merged += "---\n\n"
+            parts.append(content)
+            parts.append("\n\n---\n\n")
+        
+        merged = "".join(parts)
         
         logger.info(f"Merged {len(sorted_docs)} segments into {len(merged)} character document")
         
         return merged
     
     def _log_agent_notes(self, session_id: str, segments: List[Dict], keywords: str) -> None:
-        """Log AGENT_NOTE turns for relevant segments identified during analysis."""
+        """Queue AGENT_NOTE turns for relevant segments identified during analysis."""
         try:
-            from app.services.turn_log_service import get_turn_log_service, SessionTurn, TurnType
-            
-            turn_log = get_turn_log_service()
             for i, seg in enumerate(segments):
-                turn = SessionTurn(
+                turn = SessionTurnFast(
                     session_id=session_id,
                     type=TurnType.AGENT_NOTE,
                     segment_id=f"rel_{i}",
@@ -527,19 +908,16 @@ Return STRICTLY JSON:
                         "key_timestamps": seg.get("key_timestamps", [])
                     }
                 )
-                turn_log.append_turn(turn)
+                _enqueue_turn(turn)
             
-            logger.info(f"Logged {len(segments)} AGENT_NOTE turns for session {session_id}")
+            logger.info(f"Queued {len(segments)} AGENT_NOTE turns for session {session_id}")
         except Exception as e:
-            logger.warning(f"Failed to log agent notes: {e}")
+            logger.warning("Failed to log agent notes: %s", e)
     
     def _log_doc_section(self, session_id: str, section_markdown: str, heading: str, segment_ids: List[str] = None) -> None:
-        """Log a DOC_SECTION turn for generated documentation."""
+        """Queue a DOC_SECTION turn for generated documentation."""
         try:
-            from app.services.turn_log_service import get_turn_log_service, SessionTurn, TurnType
-            
-            turn_log = get_turn_log_service()
-            turn = SessionTurn(
+            turn = SessionTurnFast(
                 session_id=session_id,
                 type=TurnType.DOC_SECTION,
                 markdown=section_markdown[:2000],  # Truncate to avoid huge logs
@@ -549,20 +927,24 @@ Return STRICTLY JSON:
                     "char_count": len(section_markdown)
                 }
             )
-            turn_log.append_turn(turn)
+            _enqueue_turn(turn)
             
-            logger.debug(f"Logged DOC_SECTION turn: {heading}")
+            logger.debug(f"Queued DOC_SECTION turn: {heading}")
         except Exception as e:
-            logger.warning(f"Failed to log doc section: {e}")
+            logger.warning("Failed to log doc section: %s", e)
 
 
-# Singleton instance
+# Singleton instance with thread-safe initialization
 _generator: Optional[DocumentationGenerator] = None
+_generator_lock = threading.Lock()
 
 
 def get_generator() -> DocumentationGenerator:
-    """Get or create the documentation generator singleton"""
+    """Get or create the documentation generator singleton (thread-safe)"""
     global _generator
     if _generator is None:
-        _generator = DocumentationGenerator()
+        with _generator_lock:
+            # Double-check after acquiring lock
+            if _generator is None:
+                _generator = DocumentationGenerator()
     return _generator
@@ -1,16 +1,48 @@
 """Calendar service for managing meeting contexts and draft sessions"""
 
+from bisect import insort
+from collections import Counter, defaultdict
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-from pydantic import BaseModel
+from itertools import count
+from typing import Iterator, List, Dict, Optional, Set, Tuple, ValuesView
+from pydantic import BaseModel, ConfigDict, PrivateAttr
+import asyncio
 import uuid
 import logging
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
 
+# Trigger word -> (rank, mode), built once and shared by all watchers.
+# When keywords hit several modes, the lowest rank wins (bug > feature > docs).
+_TRIGGER_TO_MODE: Dict[str, Tuple[int, str]] = {
+    **{w: (0, "bug_report") for w in ("bug", "issue", "error", "triage", "fix")},
+    **{w: (1, "feature_kickoff") for w in ("feature", "kickoff", "design", "spec", "prd")},
+    **{w: (2, "general_doc") for w in ("api", "documentation", "docs")},
+}
+_NO_MODE = (3, "general_doc")  # Default
+
+# Scheduler sleeps until the next trigger, bounded to this range (seconds)
+_SCHEDULER_MIN_SLEEP = 1.0
+_SCHEDULER_MAX_SLEEP = 60.0
+
+# A session whose notification failed is not retried for this long (seconds)
+_NOTIFY_RETRY_DELAY = 60.0
+
+# Notification windows as (from, to) offsets in seconds
+_REMINDER_WINDOW = (-15 * 60, -5 * 60)  # relative to event start
+_NUDGE_WINDOW = (3 * 60, 30 * 60)       # relative to event end
+
+# Sessions in these states never get notifications
+_TERMINAL_STATUSES = frozenset({"completed", "failed"})
+
+
 class CalendarEvent(BaseModel):
-    """Model for calendar events"""
+    """Model for calendar events (immutable; use model_copy to change times)"""
+    model_config = ConfigDict(frozen=True)
+    
     id: str
     title: str
     start_time: datetime
@@ -20,6 +52,27 @@ class CalendarEvent(BaseModel):
     description: Optional[str] = None
 
 
+# Mock upcoming events as (hours until start, hours until end, event).
+# Built once with model_construct (trusted data, no validation); each call
+# only copies in fresh start/end times.
+_MOCK_EVENTS: List[Tuple[int, int, CalendarEvent]] = [
+    (2, 3, CalendarEvent.model_construct(
+        id="evt_1",
+        title="Design Review: User Profile",
+        attendees=["alice@company.com", "bob@company.com"],
+        context_keywords=["profile", "settings", "ui"],
+        description="Review new user profile designs"
+    )),
+    (5, 6, CalendarEvent.model_construct(
+        id="evt_2",
+        title="Bug Bash: Login Errors",
+        attendees=["qa@company.com", "dev@company.com"],
+        context_keywords=["auth", "login", "500 error"],
+        description="Investigate login 500 errors"
+    )),
+]
+
+
 class DraftSession(BaseModel):
     """Model for draft documentation sessions"""
     session_id: str
@@ -31,9 +84,111 @@ class DraftSession(BaseModel):
     created_at: datetime
     suggested_mode: Optional[str] = None
     metadata: Dict = {}
+    # Typed event times (metadata keeps the ISO strings for the frontend)
+    event_start: Optional[datetime] = None
+    event_end: Optional[datetime] = None
     # Notification tracking
     reminder_sent: bool = False
     nudge_sent: bool = False
+    # Earliest POSIX time a pending notification can fire (None = not computed)
+    _next_trigger_ts: Optional[float] = PrivateAttr(default=None)
+
+
+class _DraftSessionStore:
+    """
+    session_id -> DraftSession mapping that also keeps listing indexes.
+    
+    Sessions are kept ordered newest-first and grouped by status, so listing
+    needs no full copy + sort. Status changes must go through `set_status`.
+    Event IDs are counted so sync can skip already-drafted events in O(1).
+    
+    Wraps a plain dict rather than subclassing it, so every mutation goes
+    through the methods below and the indexes cannot go stale.
+    """
+    
+    def __init__(self):
+        self._sessions: Dict[str, DraftSession] = {}
+        self._seq = count()
+        # session_id -> sort key (-created_ts, insertion seq); ascending = newest first
+        self._keys: Dict[str, Tuple[float, int]] = {}
+        self._order: List[Tuple[float, int, str]] = []
+        self._by_status: Dict[str, Set[str]] = defaultdict(set)
+        self._event_ids: Counter = Counter()
+    
+    def __len__(self) -> int:
+        return len(self._sessions)
+    
+    def __contains__(self, session_id: object) -> bool:
+        return session_id in self._sessions
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._sessions)
+    
+    def __getitem__(self, session_id: str) -> DraftSession:
+        return self._sessions[session_id]
+    
+    def get(self, session_id: str, default: Optional[DraftSession] = None) -> Optional[DraftSession]:
+        return self._sessions.get(session_id, default)
+    
+    def values(self) -> ValuesView[DraftSession]:
+        return self._sessions.values()
+    
+    def __setitem__(self, session_id: str, session: DraftSession):
+        if session_id in self._sessions:
+            self._unindex(session_id)
+        self._sessions[session_id] = session
+        key = (-session.created_at.timestamp(), next(self._seq))
+        self._keys[session_id] = key
+        insort(self._order, (*key, session_id))
+        self._by_status[session.status].add(session_id)
+        self._event_ids[session.event_id] += 1
+    
+    def __delitem__(self, session_id: str):
+        self._unindex(session_id)
+        del self._sessions[session_id]
+    
+    def pop(self, session_id: str, *default):
+        if session_id in self._sessions:
+            self._unindex(session_id)
+        return self._sessions.pop(session_id, *default)
+    
+    def clear(self):
+        self._sessions.clear()
+        self._keys.clear()
+        self._order.clear()
+        self._by_status.clear()
+        self._event_ids.clear()
+    
+    def _unindex(self, session_id: str):
+        key = self._keys.pop(session_id)
+        self._order.remove((*key, session_id))
+        session = self._sessions[session_id]
+        self._by_status[session.status].discard(session_id)
+        self._event_ids[session.event_id] -= 1
+        if not self._event_ids[session.event_id]:
+            del self._event_ids[session.event_id]
+    
+    def has_event(self, event_id: str) -> bool:
+        """Whether any stored session was created for this calendar event"""
+        return event_id in self._event_ids
+    
+    def set_status(self, session: DraftSession, status: str):
+        """Change a stored session's status, keeping the status index in sync"""
+        self._by_status[session.status].discard(session.session_id)
+        session.status = status
+        self._by_status[status].add(session.session_id)
+    
+    def newest_first(self, status: Optional[str] = None) -> List[DraftSession]:
+        """Sessions ordered by creation time (newest first), optionally by status"""
+        if status is None:
+            return [self[session_id] for *_, session_id in self._order]
+        
+        ids = self._by_status.get(status, ())
+        ordered = sorted((*self._keys[session_id], session_id) for session_id in ids)
+        return [
+            self[session_id] for *_, session_id in ordered
+            if self[session_id].status == status
+        ]
 
 
 class CalendarWatcher:
@@ -47,7 +202,11 @@ class CalendarWatcher:
     def __init__(self):
         """Initialize the calendar watcher with mock data"""
         """Initialize the calendar watcher with mock data"""
-        self.draft_sessions: Dict[str, DraftSession] = {}
+        self.draft_sessions: _DraftSessionStore = _DraftSessionStore()
+        
+        # Set (on the scheduler's loop) to re-plan the next wakeup early
+        self._wakeup: Optional[asyncio.Event] = None
+        self._scheduler_loop: Optional[asyncio.AbstractEventLoop] = None
         
         # Determine fixed mock events for consistent testing (mtg_1, mtg_2, mtg_3)
         now = datetime.now()
@@ -62,6 +221,8 @@ class CalendarWatcher:
             status="completed", # Already done
             created_at=now - timedelta(days=1),
             suggested_mode="feature_kickoff",
+            event_start=now - timedelta(days=1),
+            event_end=now - timedelta(days=1, hours=-1),
             metadata={"description": "Review new user profile designs", "event_start": (now - timedelta(days=1)).isoformat(), "event_end": (now - timedelta(days=1, hours=-1)).isoformat()}
         )
 
@@ -75,6 +236,8 @@ class CalendarWatcher:
             status="ready_for_upload",
             created_at=now,
             suggested_mode="bug_report",
+            event_start=now + timedelta(hours=2),
+            event_end=now + timedelta(hours=3),
             metadata={"description": "Investigate login 500 errors", "event_start": (now + timedelta(hours=2)).isoformat(), "event_end": (now + timedelta(hours=3)).isoformat()}
         )
         
@@ -88,6 +251,8 @@ class CalendarWatcher:
             status="ready_for_upload",
             created_at=now,
             suggested_mode="general_doc",
+            event_start=now + timedelta(hours=4),
+            event_end=now + timedelta(hours=5),
             metadata={"description": "Discussing database sharding strategy", "event_start": (now + timedelta(hours=4)).isoformat(), "event_end": (now + timedelta(hours=5)).isoformat()}
         )
 
@@ -106,32 +271,14 @@ class CalendarWatcher:
         # Mock data for MVP
         now = datetime.now()
         
-        mock_events = [
-            CalendarEvent(
-                id="evt_1",
-                title="Design Review: User Profile",
-                start_time=now + timedelta(hours=2),
-                end_time=now + timedelta(hours=3),
-                attendees=["alice@company.com", "bob@company.com"],
-                context_keywords=["profile", "settings", "ui"],
-                description="Review new user profile designs"
-            ),
-            CalendarEvent(
-                id="evt_2",
-                title="Bug Bash: Login Errors",
-                start_time=now + timedelta(hours=5),
-                end_time=now + timedelta(hours=6),
-                attendees=["qa@company.com", "dev@company.com"],
-                context_keywords=["auth", "login", "500 error"],
-                description="Investigate login 500 errors"
-            )
-        ]
-        
-        # Filter events within the time window
-        cutoff_time = now + timedelta(hours=hours_ahead)
+        # Filter on the offsets so only events in the window are materialized
         upcoming = [
-            event for event in mock_events
-            if now <= event.start_time <= cutoff_time
+            event.model_copy(update={
+                "start_time": now + timedelta(hours=start_h),
+                "end_time": now + timedelta(hours=end_h),
+            })
+            for start_h, end_h, event in _MOCK_EVENTS
+            if 0 <= start_h <= hours_ahead
         ]
         
         logger.info(f"Found {len(upcoming)} upcoming meetings in next {hours_ahead} hours")
@@ -153,7 +300,7 @@ class CalendarWatcher:
         
         # Create draft session
         session = DraftSession(
-            session_id=str(uuid.uuid4()),
+            session_id=uuid.uuid4().hex,
             event_id=event.id,
             title=event.title,
             attendees=event.attendees,
@@ -161,6 +308,8 @@ class CalendarWatcher:
             status="waiting_for_upload",
             created_at=datetime.now(),
             suggested_mode=suggested_mode,
+            event_start=event.start_time,
+            event_end=event.end_time,
             metadata={
                 "event_start": event.start_time.isoformat(),
                 "event_end": event.end_time.isoformat(),
@@ -170,6 +319,7 @@ class CalendarWatcher:
         
         # Store in memory (MVP - use database in production)
         self.draft_sessions[session.session_id] = session
+        self._wake_scheduler()
         
         logger.info(f"Created draft session {session.session_id} for event {event.id}")
         
@@ -185,22 +335,17 @@ class CalendarWatcher:
         Returns:
             Suggested mode ID
         """
-        keywords_lower = [k.lower() for k in keywords]
-        
-        # Bug-related keywords
-        if any(word in keywords_lower for word in ["bug", "issue", "error", "triage", "fix"]):
-            return "bug_report"
+        best = _NO_MODE
         
-        # Feature-related keywords
-        if any(word in keywords_lower for word in ["feature", "kickoff", "design", "spec", "prd"]):
-            return "feature_kickoff"
+        # Whole keywords only: "500 error" is not the trigger "error"
+        for keyword in keywords:
+            hit = _TRIGGER_TO_MODE.get(keyword.lower(), _NO_MODE)
+            if hit < best:
+                if hit[0] == 0:
+                    return hit[1]
+                best = hit
         
-        # API/Documentation keywords
-        if any(word in keywords_lower for word in ["api", "documentation", "docs"]):
-            return "general_doc"
-        
-        # Default
-        return "general_doc"
+        return best[1]
     
     def get_draft_sessions(self, status: Optional[str] = None) -> List[DraftSession]:
         """
@@ -212,15 +357,8 @@ class CalendarWatcher:
         Returns:
             List of draft sessions
         """
-        sessions = list(self.draft_sessions.values())
-        
-        if status:
-            sessions = [s for s in sessions if s.status == status]
-        
-        # Sort by creation time (newest first)
-        sessions.sort(key=lambda x: x.created_at, reverse=True)
-        
-        return sessions
+        # Pre-ordered by creation time (newest first); no copy + sort of every session
+        return self.draft_sessions.newest_first(status or None)
     
     def get_session(self, session_id: str) -> Optional[DraftSession]:
         """
@@ -245,9 +383,15 @@ class CalendarWatcher:
         """
         session = self.draft_sessions.get(session_id)
         if session:
-            session.status = status
+            self.draft_sessions.set_status(session, status)
             if metadata:
                 session.metadata.update(metadata)
+                if "event_start" in metadata or "event_end" in metadata:
+                    # Re-derive typed times from the updated ISO strings
+                    session.event_start = session.event_end = None
+            # Status/event times may have changed which notifications are pending
+            session._next_trigger_ts = None
+            self._wake_scheduler()
             logger.info(f"Updated session {session_id} status to {status}")
     
     def sync_calendar(self):
@@ -259,13 +403,11 @@ class CalendarWatcher:
         upcoming_events = self.check_upcoming_meetings()
         
         # Create draft sessions for events that don't have one yet
-        existing_event_ids = {s.event_id for s in self.draft_sessions.values()}
-        
-        new_sessions = []
-        for event in upcoming_events:
-            if event.id not in existing_event_ids:
-                session = self.create_draft_session(event)
-                new_sessions.append(session)
+        new_sessions = [
+            self.create_draft_session(event)
+            for event in upcoming_events
+            if not self.draft_sessions.has_event(event.id)
+        ]
         
         logger.info(f"Synced calendar: created {len(new_sessions)} new draft sessions")
         
@@ -279,73 +421,164 @@ class CalendarWatcher:
         Pre-meeting: Trigger reminder 10 mins before start
         Post-meeting: Trigger upload nudge 5 mins after end
         """
-        from app.services.notification_service import get_notification_service
-        from datetime import datetime, timedelta
+        from app.services.notification_service import get_notification_service, Notification
         
         notifier = get_notification_service()
-        now = datetime.now()
+        now_ts = datetime.now().timestamp()
+        
+        # (session, notification) pairs collected this tick, flushed in one batch
+        pending = []
         
         for session in self.draft_sessions.values():
             # Skip completed/failed sessions
-            if session.status in ["completed", "failed"]:
+            if session.status in _TERMINAL_STATUSES:
                 continue
             
-            # Parse event times from metadata
-            event_start_str = session.metadata.get("event_start")
-            event_end_str = session.metadata.get("event_end")
-            
-            if not event_start_str or not event_end_str:
+            # Cheap prefilter: nothing can fire before the cached next trigger time
+            next_ts = session._next_trigger_ts
+            if next_ts is not None and next_ts > now_ts:
                 continue
             
-            try:
-                event_start = datetime.fromisoformat(event_start_str)
-                event_end = datetime.fromisoformat(event_end_str)
-            except ValueError:
+            bounds = self._event_bounds_ts(session)
+            if bounds is None:
+                session._next_trigger_ts = float("inf")
                 continue
+            start_ts, end_ts = bounds
             
             # Get first attendee email for notification
             email = session.attendees[0] if session.attendees else "user@example.com"
             
             # Pre-Meeting Reminder: 10 minutes before start
-            reminder_window_start = event_start - timedelta(minutes=15)
-            reminder_window_end = event_start - timedelta(minutes=5)
-            
-            if reminder_window_start <= now <= reminder_window_end and not session.reminder_sent:
-                notifier.send_reminder(email, session.title)
-                session.reminder_sent = True
-                logger.info(f"Triggered pre-meeting reminder for session {session.session_id}")
+            if (start_ts + _REMINDER_WINDOW[0] <= now_ts <= start_ts + _REMINDER_WINDOW[1]
+                    and not session.reminder_sent):
+                pending.append((session, Notification(
+                    kind="reminder", email=email, meeting_title=session.title
+                )))
             
             # Post-Meeting Nudge: 5 minutes after end (for sessions still waiting)
-            nudge_window_start = event_end + timedelta(minutes=3)
-            nudge_window_end = event_end + timedelta(minutes=30)
+            if (end_ts + _NUDGE_WINDOW[0] <= now_ts <= end_ts + _NUDGE_WINDOW[1]
+                    and session.status == "waiting_for_upload" and not session.nudge_sent):
+                pending.append((session, Notification(
+                    kind="upload_nudge", email=email, meeting_title=session.title,
+                    session_id=session.session_id
+                )))
             
-            if nudge_window_start <= now <= nudge_window_end and session.status == "waiting_for_upload" and not session.nudge_sent:
-                notifier.send_upload_nudge(email, session.title, session.session_id)
+            session._next_trigger_ts = self._compute_next_trigger_ts(session, start_ts, end_ts, now_ts)
+        
+        if not pending:
+            return
+        
+        # Back off first, so a send that fails or raises is retried a minute
+        # later rather than on every scheduler wakeup
+        retry_ts = now_ts + _NOTIFY_RETRY_DELAY
+        for session, _ in pending:
+            session._next_trigger_ts = retry_ts
+        
+        results = notifier.send_batch([notification for _, notification in pending])
+        
+        # Only mark notifications the provider accepted; failures keep the backoff
+        failed = {session.session_id for (session, _), sent in zip(pending, results) if not sent}
+        for (session, notification), sent in zip(pending, results):
+            if not sent:
+                continue
+            if notification.kind == "reminder":
+                session.reminder_sent = True
+                logger.info(f"Triggered pre-meeting reminder for session {session.session_id}")
+            else:
                 session.nudge_sent = True
                 logger.info(f"Triggered post-meeting nudge for session {session.session_id}")
+            
+            # Sent flags changed which windows are still pending
+            if session.session_id not in failed:
+                session._next_trigger_ts = None
+    
+    def peek_next_trigger_ts(self) -> float:
+        """
+        Earliest POSIX time any session may need a notification check.
+        
+        Sessions not yet evaluated count as due now; with nothing pending the
+        result is five minutes out.
+        """
+        now_ts = time.time()
+        next_ts = float("inf")
+        for session in self.draft_sessions.values():
+            if session.status in _TERMINAL_STATUSES:
+                continue
+            ts = session._next_trigger_ts
+            if ts is None:
+                return now_ts
+            if ts < next_ts:
+                next_ts = ts
+        return next_ts if next_ts != float("inf") else now_ts + 300
+    
+    def _wake_scheduler(self) -> None:
+        """Ask a running scheduler to re-plan its sleep (safe from any thread)"""
+        loop = self._scheduler_loop
+        if loop is not None and self._wakeup is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wakeup.set)
+    
+    @staticmethod
+    def _event_bounds_ts(session: DraftSession) -> Optional[Tuple[float, float]]:
+        """Return the session's event start/end as POSIX timestamps"""
+        if session.event_start is None or session.event_end is None:
+            # Sessions built from metadata only: parse the ISO strings once
+            event_start_str = session.metadata.get("event_start")
+            event_end_str = session.metadata.get("event_end")
+            
+            if not event_start_str or not event_end_str:
+                return None
+            
+            try:
+                session.event_start = datetime.fromisoformat(event_start_str)
+                session.event_end = datetime.fromisoformat(event_end_str)
+            except ValueError:
+                return None
+        
+        return session.event_start.timestamp(), session.event_end.timestamp()
+    
+    @staticmethod
+    def _compute_next_trigger_ts(session: DraftSession, start_ts: float, end_ts: float, now_ts: float) -> float:
+        """
+        Earliest time a still-pending notification window opens.
+        
+        Windows that already closed are ignored; inf means nothing is left to send.
+        """
+        candidates = []
+        if not session.reminder_sent and start_ts + _REMINDER_WINDOW[1] >= now_ts:
+            candidates.append(start_ts + _REMINDER_WINDOW[0])
+        if (not session.nudge_sent and session.status == "waiting_for_upload"
+                and end_ts + _NUDGE_WINDOW[1] >= now_ts):
+            candidates.append(end_ts + _NUDGE_WINDOW[0])
+        return min(candidates, default=float("inf"))
 
 
 # Singleton instance
 _calendar_watcher: Optional[CalendarWatcher] = None
+_calendar_watcher_lock = threading.Lock()
 _scheduler_running: bool = False
 
 
 def get_calendar_watcher() -> CalendarWatcher:
-    """Get or create the CalendarWatcher singleton"""
+    """Get or create the CalendarWatcher singleton (thread-safe)"""
     global _calendar_watcher
     if _calendar_watcher is None:
-        _calendar_watcher = CalendarWatcher()
-        # Auto-sync on initialization
-        _calendar_watcher.sync_calendar()
+        with _calendar_watcher_lock:
+            # Double-check so concurrent first calls sync the calendar only once
+            if _calendar_watcher is None:
+                watcher = CalendarWatcher()
+                # Auto-sync on initialization
+                watcher.sync_calendar()
+                _calendar_watcher = watcher
     return _calendar_watcher
 
 
 async def start_notification_scheduler():
     """
     Start the background notification scheduler.
-    Runs every 60 seconds to check for notification triggers.
+    
+    Sleeps until the earliest upcoming trigger (at most 60 seconds), and wakes
+    early when sessions are created or updated.
     """
-    import asyncio
     global _scheduler_running
     
     if _scheduler_running:
@@ -353,21 +586,40 @@ async def start_notification_scheduler():
         return
     
     _scheduler_running = True
-    logger.info("Starting notification scheduler (60s interval)")
+    logger.info("Starting notification scheduler (event-driven, max 60s sleep)")
+    
+    loop = asyncio.get_running_loop()
     
     while _scheduler_running:
+        delay = _SCHEDULER_MAX_SLEEP
+        calendar = None
         try:
             calendar = get_calendar_watcher()
+            if calendar._scheduler_loop is not loop:
+                calendar._wakeup = asyncio.Event()
+                calendar._scheduler_loop = loop
             calendar.check_notification_triggers()
+            delay = calendar.peek_next_trigger_ts() - time.time()
         except Exception as e:
             logger.error(f"Scheduler error: {str(e)}")
         
-        await asyncio.sleep(60)  # Check every minute
+        delay = max(_SCHEDULER_MIN_SLEEP, min(_SCHEDULER_MAX_SLEEP, delay))
+        if calendar is None or calendar._wakeup is None:
+            await asyncio.sleep(delay)
+            continue
+        
+        try:
+            await asyncio.wait_for(calendar._wakeup.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        calendar._wakeup.clear()
 
 
 def stop_notification_scheduler():
     """Stop the background notification scheduler"""
     global _scheduler_running
     _scheduler_running = False
+    if _calendar_watcher is not None:
+        _calendar_watcher._wake_scheduler()
     logger.info("Notification scheduler stopped")
 
@@ -1,12 +1,29 @@
 from pathlib import Path
 from typing import List, Dict, Optional
+import asyncio
 import logging
-import uuid
-import subprocess
+import os
+import secrets
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
+# Output format -> crop filter (None = keep the source frame)
+# iw/ih = input width/height; e.g. 1920x1080 -> 608x1080 (centered) for vertical
+_FORMAT_FILTERS: Dict[str, Optional[str]] = {
+    "vertical": "crop=ih*(9/16):ih:(iw-ow)/2:0",  # 9:16, assuming 16:9 input
+    "square": "crop=ih:ih:(iw-ow)/2:0",           # 1:1
+    "horizontal": None,                           # 16:9 as-is
+}
+
+# Cropping forces a re-encode; otherwise remux (cuts snap to keyframes)
+_REENCODE_ARGS = ('-c:v', 'libx264', '-threads', '0', '-c:a', 'aac')
+_REMUX_ARGS = ('-c', 'copy', '-avoid_negative_ts', 'make_zero')
+
+# x264 preset for re-encodes: much faster than the default "medium", without
+# the size/quality loss of "ultrafast" at the same CRF
+DEFAULT_X264_PRESET = "veryfast"
+
 class ClipRequest(BaseModel):
     video_path: str
     start_time: float
@@ -16,9 +33,39 @@ class ClipRequest(BaseModel):
 class ClipGenerator:
     """Generate short video clips from full episodes."""
     
-    def __init__(self, output_dir: Optional[str] = None):
+    def __init__(self, output_dir: Optional[str] = None, x264_preset: str = DEFAULT_X264_PRESET):
+        self.x264_preset = x264_preset
         self.output_dir = Path(output_dir) if output_dir else Path("uploads/clips")
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        # Cap concurrent encodes so parallel clips don't thrash the CPU
+        self._encode_semaphore = asyncio.Semaphore(max(1, (os.cpu_count() or 2) // 2))
+
+    @staticmethod
+    def _build_command(
+        episode_path: str,
+        start_time: float,
+        duration: float,
+        output_format: str,
+        output_path: Path,
+        preset: str = DEFAULT_X264_PRESET
+    ) -> List[str]:
+        """Build the ffmpeg command; only cropped formats are re-encoded."""
+        if output_format not in _FORMAT_FILTERS:
+            raise ValueError(f"Unknown clip format: {output_format}")
+        crop = _FORMAT_FILTERS[output_format]
+
+        # -ss before -i for faster seeking; map just the first video/audio stream
+        command = [
+            'ffmpeg',
+            '-ss', str(start_time),
+            '-i', str(episode_path),
+            '-t', str(duration),
+            '-map', '0:v:0',
+            '-map', '0:a:0?',
+        ]
+        command.extend(('-vf', crop, '-preset', preset, *_REENCODE_ARGS) if crop else _REMUX_ARGS)
+        command.extend(['-y', str(output_path)])  # Overwrite
+        return command
 
     async def create_clip(
         self,
@@ -27,68 +74,57 @@ class ClipGenerator:
         end_time: float,    # Seconds
         output_format: str = "vertical"  # vertical/square/horizontal
     ) -> str:
-        """Extract clip and optimize for social media."""
-        try:
-            episode_path_obj = Path(episode_path)
-            if not episode_path_obj.exists():
-                raise FileNotFoundError(f"Video file not found: {episode_path}")
-
-            clip_id = str(uuid.uuid4())[:8]
-            output_filename = f"clip_{clip_id}_{output_format}.mp4"
-            output_path = self.output_dir / output_filename
-            
-            duration = end_time - start_time
-            if duration <= 0:
-                raise ValueError("End time must be greater than start time")
+        """
+        Extract clip and optimize for social media.
+        
+        Failures are raised, not logged; callers report them with clip context.
+        """
+        episode_path_obj = Path(episode_path)
+        if not episode_path_obj.exists():
+            raise FileNotFoundError(f"Video file not found: {episode_path}")
 
-            # Basic ffmpeg command construction
-            # -ss before -i for faster seeking
-            command = [
-                'ffmpeg',
-                '-ss', str(start_time),
-                '-i', str(episode_path),
-                '-t', str(duration),
-                '-c:v', 'libx264',
-                '-c:a', 'aac',
-                '-strict', 'experimental',
-                '-y' # Overwrite
-            ]
+        clip_id = secrets.token_hex(4)
+        output_filename = f"clip_{clip_id}_{output_format}.mp4"
+        output_path = self.output_dir / output_filename
+        
+        duration = end_time - start_time
+        if duration <= 0:
+            raise ValueError("End time must be greater than start time")
 
-            # Apply filters based on output format
-            filters = []
-            
-            if output_format == "vertical":
-                # Crop to 9:16 (assuming 16:9 input)
-                # iw=input width, ih=input height
-                # For 1920x1080 -> crop to 608x1080 (centered)
-                filters.append("crop=ih*(9/16):ih:(iw-ow)/2:0")
-            elif output_format == "square":
-                 # Crop to 1:1
-                 filters.append("crop=ih:ih:(iw-ow)/2:0")
-            
-            if filters:
-                 command.extend(['-vf', ",".join(filters)])
+        command = self._build_command(
+            episode_path, start_time, duration, output_format, output_path, preset=self.x264_preset
+        )
 
-            command.append(str(output_path))
-            
-            logger.info(f"Generating clip: {command}")
-            
-            # Execute ffmpeg
-            # Using run in threadpool usually recommended for blocking IO, strictly speaking subprocess is blocking
-            # but for MVP synchronous subprocess run is okay or use asyncio.create_subprocess_exec
-            proc = subprocess.run(
-                command, 
-                capture_output=True, 
-                text=True,
-                check=True
+        logger.info(f"Generating clip: {command}")
+        
+        # Execute ffmpeg without blocking the event loop
+        async with self._encode_semaphore:
+            proc = await asyncio.create_subprocess_exec(
+                *command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
             )
-            
-            logger.info(f"Clip generated at {output_path}")
-            return str(output_path)
+            try:
+                _, stderr = await proc.communicate()
+            except asyncio.CancelledError:
+                # Don't leave ffmpeg running detached or a half-written clip behind
+                proc.kill()
+                await proc.wait()
+                output_path.unlink(missing_ok=True)
+                raise
+        
+        if proc.returncode != 0:
+            raise RuntimeError(f"Failed to generate clip: {stderr.decode(errors='replace')}")
+        
+        logger.info(f"Clip generated at {output_path}")
+        return str(output_path)
 
-        except subprocess.CalledProcessError as e:
-            logger.error(f"FFmpeg failed: {e.stderr}")
-            raise RuntimeError(f"Failed to generate clip: {e.stderr}")
-        except Exception as e:
-            logger.error(f"Error generating clip: {e}")
-            raise
+    def create_clip_sync(
+        self,
+        episode_path: str,
+        start_time: float,
+        end_time: float,
+        output_format: str = "vertical"
+    ) -> str:
+        """Blocking wrapper around create_clip for scripts/CLI (no running loop)."""
+        return asyncio.run(self.create_clip(episode_path, start_time, end_time, output_format))
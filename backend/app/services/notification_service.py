@@ -1,11 +1,20 @@
 """Notification service for sending email reminders and nudges"""
 
 import logging
-from typing import Optional
+from typing import List, Optional
+from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
 
+class Notification(BaseModel):
+    """A queued notification for send_batch"""
+    kind: str  # "reminder" | "upload_nudge" | "completion"
+    email: str
+    meeting_title: str
+    session_id: Optional[str] = None
+
+
 class NotificationService:
     """
     Service for sending notifications to users.
@@ -67,6 +76,39 @@ class NotificationService:
         print(message)
         logger.info(f"Sent completion notification to {email} for session {session_id}")
         return True
+    
+    def send_batch(self, notifications: List[Notification]) -> List[bool]:
+        """
+        Send several notifications, reporting success per notification.
+        
+        A failure (unknown kind or sender error) only affects its own entry.
+        
+        Args:
+            notifications: Notifications to send
+        
+        Returns:
+            Per-notification success flags, in input order
+        """
+        results: List[bool] = []
+        senders = {
+            "reminder": lambda n: self.send_reminder(n.email, n.meeting_title),
+            "upload_nudge": lambda n: self.send_upload_nudge(n.email, n.meeting_title, n.session_id),
+            "completion": lambda n: self.send_completion_notification(n.email, n.meeting_title, n.session_id),
+        }
+        
+        for notification in notifications:
+            sender = senders.get(notification.kind)
+            if sender is None:
+                logger.warning(f"Unknown notification kind: {notification.kind}")
+                results.append(False)
+                continue
+            try:
+                results.append(sender(notification))
+            except Exception as e:
+                logger.error(f"Failed to send {notification.kind} to {notification.email}: {e}")
+                results.append(False)
+        
+        return results
 
 
 # Singleton instance
@@ -1,14 +1,33 @@
 """Dynamic prompt loading service for DevLens AI"""
 
 import yaml
+import os
+import re
+import threading
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Optional
 from string import Template
 from pydantic import BaseModel, Field
 import logging
 
+# libyaml-backed loader when available (same semantics as safe_load, much faster)
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 logger = logging.getLogger(__name__)
 
+# Only {word} placeholders are converted, so JSON examples like {} survive
+_PLACEHOLDER_RE = re.compile(r'\{(\w+)\}')
+
+
+@lru_cache(maxsize=1024)
+def _compile_template(s: str) -> Template:
+    """Convert {var} placeholders to $var and build the Template once per string"""
+    return Template(_PLACEHOLDER_RE.sub(r'$\1', s))
+
 
 class PromptConfig(BaseModel):
     """Configuration model for AI prompts"""
@@ -44,10 +63,25 @@ class PromptLoader:
         else:
             self.prompts_dir = Path(prompts_dir)
         
-        # Cache for loaded prompts
+        # Cache for loaded prompts, invalidated per file by mtime
         self._cache: Dict[str, PromptConfig] = {}
+        self._file_mtimes: Dict[str, int] = {}
+        
+        # Mode listing, rescanned only when the directory mtime changes
+        self._dir_mtime: Optional[int] = None
+        self._mode_names: list[str] = []
         
         logger.info(f"PromptLoader initialized with directory: {self.prompts_dir}")
+        
+        self._warmup()
+    
+    def _warmup(self):
+        """Load every prompt once so later lookups are cache hits."""
+        for mode in self.list_available_modes():
+            try:
+                self.load_prompt(mode)
+            except PromptLoadError as e:
+                logger.warning(f"Skipping prompt mode {mode} during warmup: {str(e)}")
     
     def load_prompt(self, mode: str, context: Optional[Dict[str, str]] = None) -> PromptConfig:
         """
@@ -63,16 +97,23 @@ class PromptLoader:
         Raises:
             PromptLoadError: If the prompt file doesn't exist or is invalid
         """
-        # Check cache first (without context interpolation)
+        # Construct file path
+        prompt_file = self.prompts_dir / f"{mode}.yaml"
+        
+        try:
+            mtime = os.stat(prompt_file).st_mtime_ns
+        except OSError:
+            mtime = None
+        
+        # Check cache first (without context interpolation); stale if the file changed
         cache_key = mode
-        if cache_key in self._cache and context is None:
+        if context is None and cache_key in self._cache and self._file_mtimes.get(cache_key) == mtime:
             logger.debug(f"Returning cached prompt for mode: {mode}")
             return self._cache[cache_key]
         
-        # Construct file path
-        prompt_file = self.prompts_dir / f"{mode}.yaml"
-        
-        if not prompt_file.exists():
+        if mtime is None:
+            self._cache.pop(cache_key, None)
+            self._file_mtimes.pop(cache_key, None)
             available_modes = self.list_available_modes()
             raise PromptLoadError(
                 f"Prompt mode '{mode}' not found. "
@@ -80,9 +121,8 @@ class PromptLoader:
             )
         
         try:
-            # Load YAML file
-            with open(prompt_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            # Load YAML file (bytes: the loader detects the encoding itself)
+            data = yaml.load(prompt_file.read_bytes(), Loader=_YamlLoader)
             
             # Apply context interpolation if provided
             if context:
@@ -94,6 +134,7 @@ class PromptLoader:
             # Cache the result (only if no context)
             if context is None:
                 self._cache[cache_key] = prompt_config
+                self._file_mtimes[cache_key] = mtime
             
             logger.info(f"Loaded prompt mode: {mode} - {prompt_config.name}")
             
@@ -119,17 +160,8 @@ class PromptLoader:
             Data dictionary with interpolated values
         """
         def interpolate_string(s: str) -> str:
-            """Interpolate a single string using safe_substitute to avoid crashes."""
-            # Convert {var} syntax to $var for Template
-            # This handles cases where prompts contain {} for JSON examples
-            import re
-            # Only convert {word} patterns, not arbitrary {}
-            template_str = re.sub(r'\{(\w+)\}', r'$\1', s)
-            try:
-                return Template(template_str).safe_substitute(**context)
-            except Exception as e:
-                logger.warning(f"Template substitution failed: {e}")
-                return s
+            """Interpolate a single string (safe_substitute leaves unknown keys as-is)."""
+            return _compile_template(s).safe_substitute(context)
         
         # Interpolate system_instruction
         if 'system_instruction' in data and isinstance(data['system_instruction'], str):
@@ -155,15 +187,22 @@ class PromptLoader:
         Returns:
             List of mode names (without .yaml extension)
         """
-        if not self.prompts_dir.exists():
+        try:
+            dir_mtime = os.stat(self.prompts_dir).st_mtime_ns
+        except OSError:
             logger.warning(f"Prompts directory does not exist: {self.prompts_dir}")
             return []
         
-        modes = []
-        for file in self.prompts_dir.glob("*.yaml"):
-            modes.append(file.stem)
+        if dir_mtime != self._dir_mtime:
+            # scandir's DirEntry caches the file type, so no Path objects or extra stats
+            with os.scandir(self.prompts_dir) as entries:
+                self._mode_names = sorted(
+                    entry.name[:-5] for entry in entries
+                    if entry.name.endswith(".yaml") and entry.is_file()
+                )
+            self._dir_mtime = dir_mtime
         
-        return sorted(modes)
+        return list(self._mode_names)
     
     def get_modes_metadata(self) -> list[Dict[str, str]]:
         """
@@ -190,16 +229,22 @@ class PromptLoader:
     def clear_cache(self):
         """Clear the prompt cache. Useful for development/testing."""
         self._cache.clear()
+        self._file_mtimes.clear()
+        self._dir_mtime = None
         logger.info("Prompt cache cleared")
 
 
 # Singleton instance
 _loader: Optional[PromptLoader] = None
+_loader_lock = threading.Lock()
 
 
 def get_prompt_loader() -> PromptLoader:
-    """Get or create the PromptLoader singleton"""
+    """Get or create the PromptLoader singleton (thread-safe)"""
     global _loader
     if _loader is None:
-        _loader = PromptLoader()
+        with _loader_lock:
+            # Double-check after acquiring lock
+            if _loader is None:
+                _loader = PromptLoader()
     return _loader
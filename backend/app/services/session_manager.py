@@ -6,12 +6,16 @@ throughout the video processing lifecycle (draft → processing → completed/fa
 """
 
 import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from enum import Enum
-from pydantic import BaseModel
 
 from app.services.storage_service import get_storage_service
+from app.services.turn_log_service import get_turn_log_service
 from app.core.observability import record_event, EventType, get_timeline_path
 
 logger = logging.getLogger(__name__)
@@ -28,9 +32,12 @@ class SessionStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
-class SessionState(BaseModel):
-    """Internal state model for a session"""
+@dataclass(slots=True)
+class SessionState:
+    """Internal state model for a session (plain slots; mutated on every progress tick)"""
     session_id: str
+    created_at: datetime
+    last_updated: datetime
     status: SessionStatus = SessionStatus.DRAFT
     progress: int = 0
     stage: str = ""
@@ -39,14 +46,35 @@ class SessionState(BaseModel):
     mode_name: Optional[str] = None
     error: Optional[str] = None
     result_path: Optional[str] = None
-    created_at: datetime
-    last_updated: datetime
-    metadata: Dict = {}
+    # time.monotonic() twin of last_updated, used for cheap staleness checks
+    last_updated_monotonic: float = field(default_factory=time.monotonic)
+    # Bumped on every state change; keys the cached status dict
+    version: int = 0
+    metadata: Dict = field(default_factory=dict)
+
 
+# Sessions in these states never change again (and can't become zombies)
+TERMINAL_STATUSES = frozenset({SessionStatus.COMPLETED, SessionStatus.FAILED, SessionStatus.CANCELLED})
 
 # Zombie timeout: sessions stuck for >10 minutes are considered stale
 STALE_TIMEOUT_SECONDS = 600
 
+# Zombies are reaped by a background scan this often (seconds)
+ZOMBIE_REAP_INTERVAL_SECONDS = 30
+
+# Non-terminal persists are coalesced per session and written this often (seconds)
+PERSIST_INTERVAL_SECONDS = 0.1
+
+# Large metadata written to disk on completion instead of staying resident
+OFFLOADED_METADATA_KEYS = ("documentation",)
+
+# Status fields copied into the persisted history entry
+_PERSISTED_STATUS_KEYS = ("title", "status", "mode", "mode_name", "progress", "last_updated")
+
+# In-memory sessions kept before least recently used terminal ones are dropped
+# (they stay readable from storage)
+MAX_CACHED_SESSIONS = 256
+
 
 class SessionManager:
     """
@@ -66,8 +94,29 @@ class SessionManager:
     
     def __init__(self):
         """Initialize SessionManager with in-memory cache"""
-        self._sessions: Dict[str, SessionState] = {}
+        # Least recently used first; only terminal sessions are evicted
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
         self._storage = get_storage_service()
+        # session_id -> (state version, status dict) for terminal sessions
+        self._status_cache: Dict[str, Tuple[int, Dict]] = {}
+        
+        # Write-behind persistence: session_id -> latest persisted-metadata snapshot
+        # (copies, not live states, so the writer never reads a half-updated session)
+        self._dirty: Dict[str, Dict] = {}
+        self._dirty_lock = threading.Lock()
+        # Serializes flushes so an older snapshot never lands after a newer one
+        self._flush_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        
+        # Zombie detection runs on a background thread (not on every status
+        # poll), started with the first in-memory session
+        self._reaper: Optional[threading.Thread] = None
+        self._reaper_lock = threading.Lock()
+        
+        # Set by close() to stop the writer and reaper loops
+        self._stop = threading.Event()
+        
         logger.info("SessionManager initialized")
     
     def create_session(
@@ -103,6 +152,9 @@ class SessionManager:
         )
         
         self._sessions[session_id] = state
+        self._sessions.move_to_end(session_id)
+        self._evict_if_needed()
+        self._ensure_reaper()
         logger.info(f"Created session {session_id} with status {status.value}")
         
         return self._to_dict(state)
@@ -118,10 +170,10 @@ class SessionManager:
         state.status = SessionStatus.PROCESSING
         state.progress = 0
         state.stage = "initializing"
-        state.last_updated = datetime.now()
+        self._touch(state)
         
-        # Persist to disk
-        self._persist(state)
+        # Persist to disk (coalesced with other updates)
+        self._schedule_persist(state)
         
         # Record timeline event
         record_event(session_id, EventType.STATUS_CHANGED, {
@@ -143,7 +195,7 @@ class SessionManager:
         state = self._get_or_create(session_id)
         state.progress = max(0, min(100, progress))
         state.stage = stage
-        state.last_updated = datetime.now()
+        self._touch(state)
         
         logger.debug(f"Session {session_id}: {stage} @ {progress}%")
     
@@ -161,13 +213,19 @@ class SessionManager:
         state.progress = 100
         state.stage = "completed"
         state.result_path = result_path
-        state.last_updated = datetime.now()
+        self._touch(state)
         
         if documentation:
             state.metadata["documentation"] = documentation
         
-        # Persist to disk
-        self._persist(state, documentation=documentation)
+        # Persist to disk now; terminal states must not wait for the writer
+        self._schedule_persist(state)
+        self.flush()
+        
+        # The documentation is on disk now (get_session_details reads it back)
+        for key in OFFLOADED_METADATA_KEYS:
+            state.metadata.pop(key, None)
+        self._close_turn_log(session_id)
         
         # Record timeline event
         record_event(session_id, EventType.SESSION_COMPLETED, {
@@ -188,10 +246,12 @@ class SessionManager:
         state.status = SessionStatus.FAILED
         state.error = error_message
         state.stage = "failed"
-        state.last_updated = datetime.now()
+        self._touch(state)
         
-        # Persist to disk
-        self._persist(state)
+        # Persist to disk now; terminal states must not wait for the writer
+        self._schedule_persist(state)
+        self.flush()
+        self._close_turn_log(session_id)
         
         # Record timeline event
         record_event(session_id, EventType.SESSION_FAILED, {
@@ -214,14 +274,16 @@ class SessionManager:
         if not state:
             return False
         
-        if state.status in [SessionStatus.COMPLETED, SessionStatus.FAILED, SessionStatus.CANCELLED]:
+        if state.status in TERMINAL_STATUSES:
             return False
         
         state.status = SessionStatus.CANCELLED
         state.stage = "cancelled"
-        state.last_updated = datetime.now()
+        self._touch(state)
         
-        self._persist(state)
+        self._schedule_persist(state)
+        self.flush()
+        self._close_turn_log(session_id)
         
         logger.info(f"Session {session_id} cancelled")
         return True
@@ -240,21 +302,19 @@ class SessionManager:
         state = self._sessions.get(session_id)
         
         if state:
-            # Check for zombie session
-            if self._is_zombie(state):
-                self._mark_zombie(state)
+            self._sessions.move_to_end(session_id)
+            # Terminal sessions are polled until the UI notices; reuse their dict
+            # (callers get a shallow copy so they can't alter later responses)
+            if state.status in TERMINAL_STATUSES:
+                cached = self._status_cache.get(session_id)
+                if cached and cached[0] == state.version:
+                    return dict(cached[1])
             
-            return {
-                "status": state.status.value,
-                "progress": state.progress,
-                "stage": state.stage,
-                "title": state.title,
-                "mode": state.mode,
-                "mode_name": state.mode_name,
-                "error": state.error,
-                "created_at": state.created_at.isoformat(),
-                "last_updated": state.last_updated.isoformat()
-            }
+            status = self._status_dict(state)
+            if state.status in TERMINAL_STATUSES:
+                self._status_cache[session_id] = (state.version, status)
+                return dict(status)
+            return status
         
         # Try to load from persistent storage
         persisted = self._storage.get_session_result(session_id)
@@ -271,6 +331,21 @@ class SessionManager:
                 "last_updated": None
             }
         
+        # No documentation on disk (failed/cancelled, or evicted mid-way): use the history entry
+        entry = self._storage.get_session_entry(session_id)
+        if entry:
+            return {
+                "status": entry.get("status", "completed"),
+                "progress": 100 if entry.get("status") == "completed" else 0,
+                "stage": "loaded_from_disk",
+                "title": entry.get("title", "Untitled"),
+                "mode": entry.get("mode"),
+                "mode_name": entry.get("mode_name"),
+                "error": None,
+                "created_at": entry.get("timestamp"),
+                "last_updated": entry.get("timestamp")
+            }
+        
         return None
     
     def get_active_session(self) -> Optional[Dict]:
@@ -281,13 +356,13 @@ class SessionManager:
         Returns:
             Active session info dict or None
         """
-        now = datetime.now()
-        
         # Check in-memory sessions
-        for session_id, state in self._sessions.items():
+        now = time.monotonic()
+        # Snapshot: pipeline threads reorder the LRU while we scan
+        for session_id, state in list(self._sessions.items()):
             if state.status in [SessionStatus.PROCESSING, SessionStatus.DOWNLOADING]:
-                # Check for zombie
-                if self._is_zombie(state):
+                # Fallback for zombies the reaper hasn't reached yet
+                if self._is_zombie(state, now):
                     self._mark_zombie(state)
                     continue
                 
@@ -301,24 +376,25 @@ class SessionManager:
         
         # Check persistent storage for active sessions
         try:
+            now_ts = time.time()
             history = self._storage.get_history()
             for session in history:
                 if session.get("status") in ["processing", "uploading", "downloading"]:
-                    # Check staleness
-                    ts_str = session.get("timestamp")
-                    if ts_str:
+                    # Check staleness (legacy entries only have the ISO timestamp)
+                    session_ts = session.get("timestamp_epoch")
+                    if session_ts is None and session.get("timestamp"):
                         try:
-                            session_ts = datetime.fromisoformat(ts_str)
-                            if (now - session_ts).total_seconds() > STALE_TIMEOUT_SECONDS:
-                                # Mark as failed in storage
-                                self._storage.add_session(session.get("id"), {
-                                    **session,
-                                    "status": "failed",
-                                    "error": "Session timed out (Zombie)"
-                                })
-                                continue
+                            session_ts = datetime.fromisoformat(session["timestamp"]).timestamp()
                         except ValueError:
                             pass
+                    if session_ts is not None and now_ts - session_ts > STALE_TIMEOUT_SECONDS:
+                        # Mark as failed in storage
+                        self._storage.add_session(session.get("id"), {
+                            **session,
+                            "status": "failed",
+                            "error": "Session timed out (Zombie)"
+                        })
+                        continue
                     
                     return {
                         "session_id": session.get("id"),
@@ -342,7 +418,10 @@ class SessionManager:
         Returns:
             SessionState or None
         """
-        return self._sessions.get(session_id)
+        state = self._sessions.get(session_id)
+        if state:
+            self._sessions.move_to_end(session_id)
+        return state
     
     def update_metadata(self, session_id: str, metadata: Dict) -> None:
         """
@@ -362,60 +441,176 @@ class SessionManager:
         if "title" in metadata:
             state.title = metadata["title"]
         
-        state.last_updated = datetime.now()
+        self._touch(state)
+    
+    def flush(self) -> None:
+        """Write all pending session updates to storage in one batch"""
+        with self._flush_lock:
+            with self._dirty_lock:
+                dirty, self._dirty = self._dirty, {}
+            if dirty:
+                self._storage.add_sessions_batch(list(dirty.items()))
+    
+    def close(self) -> None:
+        """Stop the background writer and reaper, then write any pending updates"""
+        self._stop.set()
+        # Wake the writer so it sees the stop flag instead of waiting for work
+        self._flush_requested.set()
+        for thread in (self._writer, self._reaper):
+            if thread is not None:
+                thread.join(timeout=5.0)
+        self.flush()
+    
+    def reap_zombies(self) -> int:
+        """
+        Mark every stale in-memory session as failed.
+        
+        Returns:
+            Number of sessions reaped
+        """
+        now = time.monotonic()
+        zombies = [state for state in list(self._sessions.values()) if self._is_zombie(state, now)]
+        for state in zombies:
+            self._mark_zombie(state, flush=False)
+        if zombies:
+            self.flush()
+        return len(zombies)
     
     # --- Private helpers ---
     
+    def _touch(self, state: SessionState) -> None:
+        """Stamp a state change with both wall-clock and monotonic time"""
+        state.last_updated = datetime.now()
+        state.last_updated_monotonic = time.monotonic()
+        state.version += 1
+    
     def _get_or_create(self, session_id: str) -> SessionState:
         """Get existing session or create a minimal one"""
-        if session_id not in self._sessions:
+        state = self._sessions.get(session_id)
+        if state is None:
             now = datetime.now()
-            self._sessions[session_id] = SessionState(
+            state = self._sessions[session_id] = SessionState(
                 session_id=session_id,
                 created_at=now,
                 last_updated=now
             )
-        return self._sessions[session_id]
+            self._evict_if_needed()
+            self._ensure_reaper()
+        else:
+            self._sessions.move_to_end(session_id)
+        return state
     
-    def _persist(self, state: SessionState, documentation: Optional[str] = None) -> None:
-        """Persist session to disk via StorageService"""
-        metadata = {
-            "title": state.title,
-            "topic": state.mode_name or "General",
-            "status": state.status.value,
-            "mode": state.mode,
-            "mode_name": state.mode_name,
-            "progress": state.progress,
-            "last_updated": state.last_updated.isoformat()
-        }
+    def _evict_if_needed(self) -> None:
+        """Drop least recently used terminal sessions beyond MAX_CACHED_SESSIONS"""
+        excess = len(self._sessions) - MAX_CACHED_SESSIONS
+        if excess <= 0:
+            return
+        
+        evictable = []
+        for session_id, state in list(self._sessions.items()):
+            if state.status in TERMINAL_STATUSES:
+                evictable.append(session_id)
+                if len(evictable) == excess:
+                    break
+        
+        # Pending writes hold their own reference, so eviction never loses an update
+        for session_id in evictable:
+            self._sessions.pop(session_id, None)
+            self._status_cache.pop(session_id, None)
+    
+    def _schedule_persist(self, state: SessionState) -> None:
+        """
+        Snapshot a session for persistence; the writer thread stores the latest
+        snapshot within PERSIST_INTERVAL_SECONDS.
         
-        if documentation:
-            metadata["documentation"] = documentation
-        elif "documentation" in state.metadata:
-            metadata["documentation"] = state.metadata["documentation"]
+        Called right after each change, so the snapshot is taken on the thread
+        that made it rather than read later while other threads update the state.
+        """
+        with self._dirty_lock:
+            self._dirty[state.session_id] = self._persist_metadata(state)
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._flush_loop, name="session-persist-writer", daemon=True
+                )
+                self._writer.start()
+        self._flush_requested.set()
+    
+    def _ensure_reaper(self) -> None:
+        """Start the zombie reaper thread on first use"""
+        if self._reaper is not None or self._stop.is_set():
+            return
+        with self._reaper_lock:
+            if self._reaper is None:
+                self._reaper = threading.Thread(
+                    target=self._zombie_reaper_loop, name="session-zombie-reaper", daemon=True
+                )
+                self._reaper.start()
+    
+    def _flush_loop(self) -> None:
+        """Background writer: wait for dirty sessions, let bursts coalesce, flush"""
+        while not self._stop.is_set():
+            self._flush_requested.wait()
+            # Returns early on close(); close() does the final flush itself
+            if self._stop.wait(PERSIST_INTERVAL_SECONDS):
+                return
+            self._flush_requested.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Failed to persist sessions: {e}")
+    
+    def _zombie_reaper_loop(self) -> None:
+        """Background reaper: scan for zombies every ZOMBIE_REAP_INTERVAL_SECONDS"""
+        while not self._stop.wait(ZOMBIE_REAP_INTERVAL_SECONDS):
+            try:
+                self.reap_zombies()
+            except Exception as e:
+                logger.error(f"Failed to reap zombie sessions: {e}")
+    
+    def _persist_metadata(self, state: SessionState) -> Dict:
+        """Build the StorageService metadata for a session's current state"""
+        status = self._status_dict(state)
+        metadata = {key: status[key] for key in _PERSISTED_STATUS_KEYS}
+        metadata["topic"] = state.mode_name or "General"
         
-        self._storage.add_session(state.session_id, metadata)
+        for key in OFFLOADED_METADATA_KEYS:
+            if key in state.metadata:
+                metadata[key] = state.metadata[key]
+        
+        return metadata
     
-    def _is_zombie(self, state: SessionState) -> bool:
-        """Check if a session is a zombie (stale/stuck)"""
+    def _is_zombie(self, state: SessionState, now: float) -> bool:
+        """Check if a session is a zombie (stale/stuck) as of `now` (time.monotonic())"""
         if state.status not in [SessionStatus.PROCESSING, SessionStatus.DOWNLOADING]:
             return False
         
-        elapsed = (datetime.now() - state.last_updated).total_seconds()
-        return elapsed > STALE_TIMEOUT_SECONDS
+        return now - state.last_updated_monotonic > STALE_TIMEOUT_SECONDS
     
-    def _mark_zombie(self, state: SessionState) -> None:
-        """Mark a zombie session as failed"""
+    def _mark_zombie(self, state: SessionState, flush: bool = True) -> None:
+        """Mark a zombie session as failed (flush=False leaves the write to the caller)"""
         logger.warning(f"Zombie session detected: {state.session_id}")
         state.status = SessionStatus.FAILED
         state.error = "Session timed out (Zombie)"
         state.stage = "zombie_cleanup"
-        self._persist(state)
+        # Not _touch: last_updated keeps the time the session actually stalled
+        state.version += 1
+        self._schedule_persist(state)
+        if flush:
+            self.flush()
+        self._close_turn_log(state.session_id)
     
-    def _to_dict(self, state: SessionState) -> Dict:
-        """Convert SessionState to dict"""
+    @staticmethod
+    def _close_turn_log(session_id: str) -> None:
+        """Flush a finished session's buffered turn log to disk and release its handle"""
+        try:
+            get_turn_log_service().close_session(session_id)
+        except Exception as e:
+            logger.warning(f"Failed to close turn log for {session_id}: {e}")
+    
+    @staticmethod
+    def _status_dict(state: SessionState) -> Dict:
+        """Public status fields of a session (shared by get_status, _to_dict and persistence)"""
         return {
-            "session_id": state.session_id,
             "status": state.status.value,
             "progress": state.progress,
             "stage": state.stage,
@@ -423,19 +618,39 @@ class SessionManager:
             "mode": state.mode,
             "mode_name": state.mode_name,
             "error": state.error,
-            "result_path": state.result_path,
             "created_at": state.created_at.isoformat(),
             "last_updated": state.last_updated.isoformat()
         }
+    
+    def _to_dict(self, state: SessionState) -> Dict:
+        """Convert SessionState to dict"""
+        return {
+            "session_id": state.session_id,
+            **self._status_dict(state),
+            "result_path": state.result_path,
+        }
 
 
 # Singleton lazy initialization
 _session_manager: Optional[SessionManager] = None
+_session_manager_lock = threading.Lock()
 
 
 def get_session_manager() -> SessionManager:
-    """Get or create the SessionManager singleton"""
+    """Get or create the SessionManager singleton (thread-safe)"""
     global _session_manager
     if _session_manager is None:
-        _session_manager = SessionManager()
+        with _session_manager_lock:
+            # Double-check so concurrent first calls start only one set of threads
+            if _session_manager is None:
+                _session_manager = SessionManager()
     return _session_manager
+
+
+def reset_session_manager() -> None:
+    """Stop and drop the singleton (for testing)"""
+    global _session_manager
+    with _session_manager_lock:
+        if _session_manager is not None:
+            _session_manager.close()
+            _session_manager = None
@@ -1,42 +1,206 @@
+import asyncio
 import json
 import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from app.core.config import settings
 
+# orjson (de)serializes ~5x faster than stdlib json; fall back if it isn't installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+
+def _json_line(entry: Dict) -> bytes:
+    return _json_dumps(entry) + b"\n"
+
+# flock serializes history rewrites across processes (e.g. API + worker)
+try:
+    import fcntl
+except ImportError:
+    # Windows: no flock; the history log is then only safe within one process
+    fcntl = None
+
 logger = logging.getLogger(__name__)
 
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    """Write data to a temp file, fsync once, then publish it with os.replace"""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# Compact the history log once it holds this many lines per live session
+_COMPACT_RATIO = 4
+# ...but never bother for tiny logs
+_COMPACT_MIN_LINES = 100
+
+# Frame listings (full or sampled) kept in memory (LRU)
+_FRAMES_CACHE_SIZE = 128
+
+# Frame filenames, optionally prefixed (e.g. seg00_):
+#   frame_0000_t1.0s.jpg  explicit timestamp
+#   frame_0012.jpg        legacy, assume 5s interval
+_FRAME_RE = re.compile(r"(?:\w+_)?frame_(\d+)(?:_t(\d+(?:\.\d+)?)s)?\.jpg")
+
 class StorageService:
-    """Service for persistent storage of session indices and documentation"""
+    """
+    Service for persistent storage of session indices and documentation.
+    
+    History is an append-only JSONL log (one entry per line, last write wins)
+    mirrored by an in-memory index, so updates cost one appended line instead
+    of a full-file rewrite. The log is compacted once stale lines pile up.
+    """
     
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
-        self.history_file = self.data_dir / "history.json"
+        self.history_file = self.data_dir / "history.jsonl"
+        # Pre-JSONL index, read once to migrate
+        self._legacy_history_file = self.data_dir / "history.json"
+        
+        self._lock = threading.Lock()
+        # Sidecar for flock: shared for appends, exclusive for load/compaction
+        self._lock_path = self.data_dir / "history.jsonl.lock"
+        # session_id -> entry, most recent first
+        self._index: "OrderedDict[str, Dict]" = OrderedDict()
+        self._log_lines = 0
+        # Replay position in the log file (inode changes when a process compacts)
+        self._log_inode: Optional[int] = None
+        self._log_offset = 0
+        self._load_index()
+        
+        # (session_id, sample size) -> (frames dir mtime_ns, frames), least recently used first
+        self._frames_cache: "OrderedDict[Tuple[str, Optional[int]], Tuple[int, List[Dict]]]" = OrderedDict()
+        self._frames_lock = threading.Lock()
+
+    @property
+    def _upload_path(self) -> Path:
+        """Upload root (created once per configured directory, not on every lookup)"""
+        return settings.get_upload_roots()[0]
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        """Hold the cross-process history lock (no-op where flock is unavailable)"""
+        if fcntl is None:
+            yield
+            return
+        # Opened per use so no StorageService instance holds a descriptor open
+        with open(self._lock_path, 'ab') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _replay_log(self) -> None:
+        """
+        Apply log lines past the last replay position to the index.
+        
+        Must hold the exclusive file lock, so no append is in flight and a
+        partial trailing line can only be left over from a crash.
+        """
+        try:
+            inode = self.history_file.stat().st_ino
+        except FileNotFoundError:
+            return
+        if inode != self._log_inode:
+            # First load, or another process compacted: replay the new file from the start
+            self._log_inode, self._log_offset = inode, 0
+        
+        with open(self.history_file, 'rb') as f:
+            f.seek(self._log_offset)
+            for line in f:
+                self._log_offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = _json_loads(line)
+                except ValueError:
+                    # Torn line from a crash mid-append; later lines still apply
+                    logger.warning(f"Skipping corrupt history line in {self.history_file}")
+                    continue
+                self._log_lines += 1
+                self._index[entry["id"]] = entry
+                self._index.move_to_end(entry["id"], last=False)
+
+    def _load_index(self) -> None:
+        """Replay the history log (or migrate the legacy JSON) into the index"""
+        if self.history_file.exists():
+            try:
+                with self._file_lock(exclusive=True):
+                    self._replay_log()
+                    # Terminate a crash-torn tail so the next append starts a fresh line
+                    with open(self.history_file, 'rb+') as f:
+                        if f.seek(0, os.SEEK_END):
+                            f.seek(-1, os.SEEK_END)
+                            if f.read(1) != b"\n":
+                                f.write(b"\n")
+                                self._log_offset += 1
+            except Exception as e:
+                logger.error(f"Failed to load history: {e}")
+            return
         
-        # Initialize history file if it doesn't exist
-        if not self.history_file.exists():
-            self._save_history({"sessions": []})
+        if self._legacy_history_file.exists():
+            try:
+                with open(self._legacy_history_file, 'rb') as f:
+                    sessions = _json_loads(f.read()).get("sessions", [])
+                # Legacy list is already most-recent-first
+                for entry in sessions:
+                    self._index.setdefault(entry["id"], entry)
+                logger.info(f"Migrating {len(self._index)} sessions from {self._legacy_history_file}")
+            except Exception as e:
+                logger.error(f"Failed to load legacy history: {e}")
+        
+        self._compact()
 
     def _load_history(self) -> Dict:
-        """Load history from JSON file"""
+        """Return history in the legacy {"sessions": [...]} shape (most recent first)"""
+        with self._lock:
+            return {"sessions": list(self._index.values())}
+
+    def _append_entries(self, entries: List[Dict]) -> None:
+        """Append entries to the history log in one write, compacting when it grows stale"""
         try:
-            if not self.history_file.exists():
-                return {"sessions": []}
-            with open(self.history_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            # One O_APPEND write per batch: concurrent appenders never interleave lines
+            with self._file_lock(exclusive=False), open(self.history_file, 'ab') as f:
+                f.write(b"".join(map(_json_line, entries)))
+            self._log_lines += len(entries)
         except Exception as e:
-            logger.error(f"Failed to load history: {e}")
-            return {"sessions": []}
+            logger.error(f"Failed to save history: {e}")
+            return
+        
+        if self._log_lines > max(_COMPACT_MIN_LINES, _COMPACT_RATIO * len(self._index)):
+            self._compact()
 
-    def _save_history(self, history: Dict) -> None:
-        """Save history to JSON file"""
+    def _compact(self) -> None:
+        """Rewrite the log with one line per live session (oldest first)"""
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(history, f, indent=2, ensure_ascii=False)
+            with self._file_lock(exclusive=True):
+                # Pick up other processes' appends first so the rewrite doesn't drop them
+                self._replay_log()
+                _atomic_write(self.history_file, b"".join(map(_json_line, reversed(self._index.values()))))
+                stat = self.history_file.stat()
+                self._log_inode, self._log_offset = stat.st_ino, stat.st_size
+            self._log_lines = len(self._index)
         except Exception as e:
-            logger.error(f"Failed to save history: {e}")
+            logger.error(f"Failed to compact history: {e}")
 
     def add_session(self, session_id: str, metadata: Dict) -> None:
         """
@@ -46,50 +210,75 @@ class StorageService:
             session_id: Unique session identifier
             metadata: dict containing title, topic, status, mode, etc.
         """
-        history = self._load_history()
-        
-        # Check if session already exists (update if so)
-        existing = next((s for s in history["sessions"] if s["id"] == session_id), None)
-        
-        entry = {
-            "id": session_id,
-            "timestamp": datetime.now().isoformat(),
-            "title": metadata.get("title", f"Session {session_id[:8]}"),
-            "topic": metadata.get("topic", "General"),
-            "status": metadata.get("status", "completed"),
-            "mode": metadata.get("mode", "general_doc"),
-            "mode_name": metadata.get("mode_name", "General Documentation")
-        }
+        self.add_sessions_batch([(session_id, metadata)])
+
+    def add_sessions_batch(self, sessions: List[Tuple[str, Dict]]) -> None:
+        """
+        Add or update several sessions with a single history write.
         
-        if existing:
-            history["sessions"].remove(existing)
+        Args:
+            sessions: (session_id, metadata) pairs, applied in order
+        """
+        if not sessions:
+            return
         
-        # Add to top of list (recent first)
-        history["sessions"].insert(0, entry)
+        # One clock read for the batch; strftime formats in C without
+        # allocating a datetime (second precision, epoch keeps the rest)
+        timestamp_epoch = time.time()
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(timestamp_epoch))
+        entries = [
+            {
+                "id": session_id,
+                "timestamp": timestamp,
+                "timestamp_epoch": timestamp_epoch,
+                "title": metadata.get("title", f"Session {session_id[:8]}"),
+                "topic": metadata.get("topic", "General"),
+                "status": metadata.get("status", "completed"),
+                "mode": metadata.get("mode", "general_doc"),
+                "mode_name": metadata.get("mode_name", "General Documentation"),
+                # Lets get_session_result skip the disk for sessions without docs
+                "has_doc": "documentation" in metadata
+            }
+            for session_id, metadata in sessions
+        ]
         
-        # Save history index
-        self._save_history(history)
+        with self._lock:
+            for entry in entries:
+                # Docs are written once; later status-only updates keep the flag
+                previous = self._index.get(entry["id"])
+                if previous and previous.get("has_doc"):
+                    entry["has_doc"] = True
+                # Replace any existing entry and move it to the top (recent first)
+                self._index[entry["id"]] = entry
+                self._index.move_to_end(entry["id"], last=False)
+            self._append_entries(entries)
         
-        # Also save the documentation content to the session directory for persistence
-        if "documentation" in metadata:
-            try:
-                upload_path = settings.get_upload_path()
-                task_dir = upload_path / session_id
-                task_dir.mkdir(parents=True, exist_ok=True)
-                
-                doc_file = task_dir / "documentation.md"
-                with open(doc_file, 'w', encoding='utf-8') as f:
-                    f.write(metadata["documentation"])
-                logger.debug(f"Saved documentation to {doc_file}")
-            except Exception as e:
-                logger.error(f"Failed to save documentation artifact: {e}")
-                
-        logger.info(f"Session {session_id} added to persistent history")
+        for session_id, metadata in sessions:
+            # Also save heavy content to the session directory for persistence
+            if "documentation" in metadata:
+                self._save_artifact(session_id, "documentation.md", metadata["documentation"].encode("utf-8"))
+            logger.info(f"Session {session_id} added to persistent history")
+
+    def _save_artifact(self, session_id: str, filename: str, data: bytes) -> None:
+        """Write a session artifact (e.g. documentation) next to its uploads"""
+        try:
+            task_dir = self._upload_path / session_id
+            task_dir.mkdir(parents=True, exist_ok=True)
+            
+            artifact = task_dir / filename
+            _atomic_write(artifact, data)
+            logger.debug(f"Saved {filename} to {artifact}")
+        except Exception as e:
+            logger.error(f"Failed to save {filename} artifact: {e}")
 
     def get_history(self) -> List[Dict]:
         """Get the full session history"""
-        history = self._load_history()
-        return history.get("sessions", [])
+        with self._lock:
+            return list(self._index.values())
+
+    def get_session_entry(self, session_id: str) -> Optional[Dict]:
+        """Get a single history entry by session ID (None if unknown)"""
+        return self._index.get(session_id)
 
     def get_session_result(self, session_id: str) -> Optional[Dict]:
         """
@@ -97,90 +286,121 @@ class StorageService:
         Returns the data structure expected by task_results.
         """
         # 1. Check history metadata for existence
-        history = self._load_history()
-        session_meta = next((s for s in history["sessions"] if s["id"] == session_id), None)
+        session_meta = self._index.get(session_id)
         
         if not session_meta:
             return None
             
-        # 2. Try to find the documentation artifact on disk
+        # Known to have no documentation; legacy entries lack the flag and are checked on disk
+        if session_meta.get("has_doc") is False:
+            return None
+            
+        # 2. Try to find the documentation artifact on disk (open directly; no exists() stat)
         try:
-            upload_path = settings.get_upload_path()
-            doc_file = upload_path / session_id / "documentation.md"
+            with open(self._upload_path / session_id / "documentation.md", 'r', encoding='utf-8') as f:
+                documentation = f.read()
             
-            if doc_file.exists():
-                with open(doc_file, 'r', encoding='utf-8') as f:
-                    documentation = f.read()
-                
-                return {
-                    "status": session_meta["status"],
-                    "documentation": documentation,
-                    "project_name": session_meta["title"],
-                    "mode": session_meta["mode"],
-                    "mode_name": session_meta["mode_name"]
-                }
+            return {
+                "status": session_meta["status"],
+                "documentation": documentation,
+                "project_name": session_meta["title"],
+                "mode": session_meta["mode"],
+                "mode_name": session_meta["mode_name"]
+            }
+        except FileNotFoundError:
+            pass
         except Exception as e:
             logger.error(f"Error loading session result {session_id} from disk: {e}")
             
         return None
 
-    def list_session_frames(self, session_id: str) -> List[Dict]:
+    def list_session_frames(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+        select_evenly: bool = False
+    ) -> List[Dict]:
         """
-        List all extracted frames for a session with their timestamps.
+        List extracted frames for a session with their timestamps.
         Returns a list of dicts: { timestamp_sec, thumbnail_url, label }
+        
+        Args:
+            session_id: Session whose frames to list
+            limit: With select_evenly, return at most this many frames
+            select_evenly: Sample `limit` frames spread evenly over the session,
+                parsing only the sampled filenames (frame names are zero-padded,
+                so name order is time order)
         """
+        sample = limit if select_evenly and limit else None
         try:
-            upload_path = settings.get_upload_path()
-            frames_dir = upload_path / session_id / "frames"
+            frames_dir = self._upload_path / session_id / "frames"
             
-            if not frames_dir.exists():
+            try:
+                mtime = frames_dir.stat().st_mtime_ns
+            except FileNotFoundError:
                 return []
-                
-            frames = []
-            for img_path in frames_dir.glob("*.jpg"):
-                # Parse timestamp from filename
-                # Format 1: frame_0000_t1.0s.jpg (explicit timestamp)
-                # Format 2: frame_0012.jpg (legacy, assume 5s interval)
-                name = img_path.name
-                timestamp = 0.0
-                
-                if "_t" in name and "s.jpg" in name:
-                    # Extract between 't' and 's.jpg'
-                    try:
-                        t_part = name.split("_t")[1].split("s.jpg")[0]
-                        timestamp = float(t_part)
-                    except:
-                        continue
-                elif name.startswith("frame_") and name.endswith(".jpg"):
-                    try:
-                        # Legacy: frame index * 5
-                        idx_part = name.split("frame_")[1].split(".jpg")[0]
-                        timestamp = int(idx_part) * 5.0
-                    except:
-                        continue
-                
-                frames.append({
-                    "timestamp_sec": timestamp,
-                    "thumbnail_url": f"/uploads/{session_id}/frames/{name}",
-                    "label": f"{int(timestamp//60)}:{int(timestamp%60):02d}"
-                })
-                
-            # Sort by timestamp
-            frames.sort(key=lambda x: x["timestamp_sec"])
-            return frames
+            
+            # Frames are immutable once extracted; rescan only when the directory changes
+            cache_key = (session_id, sample)
+            with self._frames_lock:
+                cached = self._frames_cache.get(cache_key)
+                if cached and cached[0] == mtime:
+                    self._frames_cache.move_to_end(cache_key)
+                    return list(cached[1])
+            
+            # DirEntry names and cached file types: no Path objects or extra stats
+            with os.scandir(frames_dir) as entries:
+                names = [
+                    entry.name for entry in entries
+                    if entry.name.endswith(".jpg") and entry.is_file()
+                ]
+            if sample:
+                names.sort()
+                if len(names) > sample:
+                    last, gaps = len(names) - 1, max(sample - 1, 1)
+                    names = [names[int(i * last / gaps)] for i in range(sample)]
+            
+            frames = [
+                frame for frame in (self._parse_frame(session_id, name) for name in names)
+                if frame is not None
+            ]
+            if not sample:
+                # Sort by timestamp
+                frames.sort(key=lambda x: x["timestamp_sec"])
+            
+            with self._frames_lock:
+                self._frames_cache[cache_key] = (mtime, frames)
+                self._frames_cache.move_to_end(cache_key)
+                if len(self._frames_cache) > _FRAMES_CACHE_SIZE:
+                    self._frames_cache.popitem(last=False)
+            return list(frames)
             
         except Exception as e:
             logger.error(f"Error listing frames for {session_id}: {e}")
             return []
 
+    @staticmethod
+    def _parse_frame(session_id: str, name: str) -> Optional[Dict]:
+        """Build a frame dict from its filename (None if it isn't a frame)"""
+        match = _FRAME_RE.fullmatch(name)
+        if not match:
+            return None
+        idx, explicit = match.groups()
+        timestamp = float(explicit) if explicit else int(idx) * 5.0
+        
+        return {
+            "timestamp_sec": timestamp,
+            "thumbnail_url": f"/uploads/{session_id}/frames/{name}",
+            "label": f"{int(timestamp//60)}:{int(timestamp%60):02d}"
+        }
+
     def list_sessions(self) -> List[Dict]:
         """
         Return a lightweight list of sessions for the History tab.
         Each item contains: id, title, status, created_at.
         """
-        history = self._load_history()
         sessions = []
-        for s in history.get("sessions", []):
+        for s in self.get_history():
             sessions.append({
                 "id": s["id"],
                 "title": s.get("title") or s.get("id"),
@@ -194,93 +414,155 @@ class StorageService:
         Build a comprehensive dictionary of session details for the UI.
         Includes metadata, documentation, video_url, and a subset of key frames.
         """
+        return self.get_session_details_batch([session_id]).get(session_id)
+
+    def get_session_details_batch(self, session_ids: List[str]) -> Dict[str, Dict]:
+        """
+        Build session details for several sessions from one history snapshot.
+        
+        Args:
+            session_ids: Sessions to describe (unknown IDs are skipped)
+        
+        Returns:
+            Dict of session_id -> details (see get_session_details)
+        """
+        # 1. Get metadata for all sessions in one pass
+        with self._lock:
+            metas = {sid: self._index[sid] for sid in session_ids if sid in self._index}
+        if not metas:
+            return {}
+        
         try:
-            # 1. Get metadata
-            history = self._load_history()
-            session_meta = next((s for s in history["sessions"] if s["id"] == session_id), None)
-            
-            if not session_meta:
-                return None
-            
-            # 2. Get documentation
-            doc_markdown = ""
-            upload_path = settings.get_upload_path()
-            # Try both "documentation.md" (our current) and "doc.md" (user's suggested)
-            doc_file = upload_path / session_id / "documentation.md"
-            if not doc_file.exists():
-                doc_file = upload_path / session_id / "doc.md"
-                
-            if doc_file.exists():
-                with open(doc_file, 'r', encoding='utf-8') as f:
-                    doc_markdown = f.read()
-            
-            # 3. Get frames (limit to 12 key moments)
-            all_frames = self.list_session_frames(session_id)
-            num_frames = len(all_frames)
-            
-            if num_frames > 12:
-                # Select 12 evenly spaced frames
-                indices = [int(i * (num_frames - 1) / 11) for i in range(12)]
-                key_frames = [all_frames[i] for i in indices]
-            else:
-                key_frames = all_frames
-                
-            # 4. Load segments (transcription timeline) if available
-            segments = []
-            segments_file = upload_path / session_id / "segments.json"
-            if segments_file.exists():
-                try:
-                    with open(segments_file, 'r', encoding='utf-8') as f:
-                        raw_segments = json.load(f)
-                        # Normalize to expected format
-                        for seg in raw_segments:
-                            segments.append({
-                                "start_sec": seg.get("start", seg.get("start_sec", 0)),
-                                "end_sec": seg.get("end", seg.get("end_sec", 0)),
-                                "text": seg.get("text", "")
-                            })
-                except Exception as e:
-                    logger.warning(f"Failed to load segments for {session_id}: {e}")
-                
-            # 5. Derive final status from actual state
-            # If we have documentation, the session completed successfully regardless of stored status
-            stored_status = session_meta.get("status", "UNKNOWN")
-            if doc_markdown and len(doc_markdown) > 0:
-                final_status = "completed"
-            elif stored_status == "failed":
-                final_status = "failed"
-            elif stored_status in ["processing", "transcribing", "uploading", "downloading"]:
-                final_status = "processing"
-            else:
-                final_status = stored_status
-                
-            return {
-                "id": session_id,
-                "title": session_meta.get("title") or session_id,
-                "status": final_status,
-                "created_at": session_meta.get("timestamp"),
-                "mode": session_meta.get("mode"),
-                "mode_name": session_meta.get("mode_name"),
-                "doc_markdown": doc_markdown,
-                "result": doc_markdown,  # Alias for frontend compatibility
-                "video_url": f"/api/v1/stream/{session_id}",
-                "key_frames": key_frames,
-                "segments": segments,
-                "pipeline_stages": {
-                    "stt": "completed" if final_status == "completed" else "pending",
-                    "analysis": "completed" if final_status == "completed" else "pending",
-                    "generation": "completed" if final_status == "completed" else "pending"
-                }
-            }
+            upload_path = self._upload_path
+        except Exception as e:
+            logger.error(f"Error resolving upload path for session details: {e}")
+            return {}
+        
+        details = {}
+        for session_id, session_meta in metas.items():
+            try:
+                details[session_id] = self._build_session_details(session_id, session_meta, upload_path)
+            except Exception as e:
+                logger.error(f"Error building session details for {session_id}: {e}")
+        return details
+
+    async def get_session_details_async(self, session_id: str) -> Optional[Dict]:
+        """
+        Async get_session_details for request handlers.
+        
+        The documentation read, segments read and frame scan are independent,
+        so they run concurrently in worker threads instead of back to back.
+        """
+        session_meta = self._index.get(session_id)
+        if not session_meta:
+            return None
+        
+        try:
+            upload_path = self._upload_path
+            doc_markdown, key_frames, segments = await asyncio.gather(
+                asyncio.to_thread(self._read_documentation, session_id, upload_path),
+                asyncio.to_thread(self.list_session_frames, session_id, 12, True),
+                asyncio.to_thread(self._read_segments, session_id, upload_path),
+            )
+            return self._assemble_session_details(session_id, session_meta, doc_markdown, key_frames, segments)
         except Exception as e:
             logger.error(f"Error building session details for {session_id}: {e}")
             return None
+
+    def _build_session_details(self, session_id: str, session_meta: Dict, upload_path: Path) -> Dict:
+        """Per-session file I/O for get_session_details_batch"""
+        return self._assemble_session_details(
+            session_id,
+            session_meta,
+            self._read_documentation(session_id, upload_path),
+            # 12 evenly spaced key moments
+            self.list_session_frames(session_id, limit=12, select_evenly=True),
+            self._read_segments(session_id, upload_path),
+        )
+
+    @staticmethod
+    def _read_documentation(session_id: str, upload_path: Path) -> str:
+        """Load a session's documentation markdown ("" if there is none)"""
+        # Try both "documentation.md" (our current) and "doc.md" (user's suggested)
+        for name in ("documentation.md", "doc.md"):
+            try:
+                with open(upload_path / session_id / name, 'r', encoding='utf-8') as f:
+                    return f.read()
+            except FileNotFoundError:
+                continue
+        return ""
+
+    @staticmethod
+    def _read_segments(session_id: str, upload_path: Path) -> List[Dict]:
+        """Load the transcription timeline, normalized to start_sec/end_sec/text"""
+        try:
+            with open(upload_path / session_id / "segments.json", 'rb') as f:
+                raw_segments = _json_loads(f.read())
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.warning(f"Failed to load segments for {session_id}: {e}")
+            return []
+        
+        return [
+            {
+                "start_sec": seg.get("start", seg.get("start_sec", 0)),
+                "end_sec": seg.get("end", seg.get("end_sec", 0)),
+                "text": seg.get("text", "")
+            }
+            for seg in raw_segments
+        ]
+
+    @staticmethod
+    def _assemble_session_details(
+        session_id: str,
+        session_meta: Dict,
+        doc_markdown: str,
+        key_frames: List[Dict],
+        segments: List[Dict],
+    ) -> Dict:
+        """Build the details payload from the loaded pieces"""
+        # Derive final status from actual state
+        # If we have documentation, the session completed successfully regardless of stored status
+        stored_status = session_meta.get("status", "UNKNOWN")
+        if doc_markdown and len(doc_markdown) > 0:
+            final_status = "completed"
+        elif stored_status == "failed":
+            final_status = "failed"
+        elif stored_status in ["processing", "transcribing", "uploading", "downloading"]:
+            final_status = "processing"
+        else:
+            final_status = stored_status
             
+        return {
+            "id": session_id,
+            "title": session_meta.get("title") or session_id,
+            "status": final_status,
+            "created_at": session_meta.get("timestamp"),
+            "mode": session_meta.get("mode"),
+            "mode_name": session_meta.get("mode_name"),
+            "doc_markdown": doc_markdown,
+            "result": doc_markdown,  # Alias for frontend compatibility
+            "video_url": f"/api/v1/stream/{session_id}",
+            "key_frames": key_frames,
+            "segments": segments,
+            "pipeline_stages": {
+                "stt": "completed" if final_status == "completed" else "pending",
+                "analysis": "completed" if final_status == "completed" else "pending",
+                "generation": "completed" if final_status == "completed" else "pending"
+            }
+        }
+
 # Singleton lazy initialization
 _storage_service = None
+_storage_service_lock = threading.Lock()
 
 def get_storage_service() -> StorageService:
+    """Get or create the StorageService singleton (thread-safe)"""
     global _storage_service
     if _storage_service is None:
-        _storage_service = StorageService()
+        with _storage_service_lock:
+            # Double-check after acquiring lock
+            if _storage_service is None:
+                _storage_service = StorageService()
     return _storage_service
@@ -5,14 +5,28 @@ Provides ~10x faster STT than cloud APIs with CPU-only inference.
 Includes metrics and automatic fallback to Gemini when model unavailable.
 """
 
+import io
 import time
 import logging
+import threading
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import List, Dict, Optional, Any
 from pathlib import Path
 
+from app.services._whisper_registry import clear_models, get_or_load_model, warm_up_model
+from app.services.transcript_cache import get_cache_entry
+
 logger = logging.getLogger(__name__)
 
+# Decode settings for transcribe_video(); also part of the transcript cache
+# key, so tuning them invalidates cached transcripts
+_TRANSCRIBE_OPTIONS: Dict[str, Any] = dict(
+    beam_size=5,
+    vad_filter=True,  # Voice Activity Detection
+    vad_parameters=dict(min_silence_duration_ms=500)
+)
+
 
 @dataclass
 class SttResult:
@@ -25,9 +39,9 @@ class SttResult:
     def segment_count(self) -> int:
         return len(self.segments)
     
-    @property
+    @cached_property
     def total_duration(self) -> float:
-        """Total duration covered by segments"""
+        """Total duration covered by segments (computed once; segments are final)"""
         if not self.segments:
             return 0.0
         return max(s.get("end", 0) for s in self.segments)
@@ -37,24 +51,26 @@ class SttResult:
         Condense segments into a summary for relevance analysis.
         Uses simple concatenation with timestamps.
         """
-        lines = []
+        buf = io.StringIO()
+        write = buf.write
         char_count = 0
         max_chars = max_tokens * 4  # Rough token-to-char estimate
         
         for seg in self.segments:
-            start = seg.get("start", 0)
             text = seg.get("text", "").strip()
             if not text:
                 continue
             
-            line = f"[{start:.1f}s] {text}"
-            if char_count + len(line) > max_chars:
-                lines.append("...")
+            line = f"[{seg.get('start', 0):.1f}s] {text}\n"
+            # The newline isn't counted toward the budget
+            char_count += len(line) - 1
+            if char_count > max_chars:
+                write("...\n")
                 break
-            lines.append(line)
-            char_count += len(line)
+            write(line)
         
-        return "\n".join(lines)
+        # Drop the trailing newline
+        return buf.getvalue()[:-1]
 
 
 class FastSttService:
@@ -93,14 +109,8 @@ class FastSttService:
     def _load_model(self) -> None:
         """Attempt to load the faster-whisper model"""
         try:
-            from faster_whisper import WhisperModel
-            
             logger.info(f"Loading faster-whisper model: {self.model_size}...")
-            self.model = WhisperModel(
-                self.model_size,
-                device="cpu",
-                compute_type="int8"
-            )
+            self.model = get_or_load_model(self.model_size, "cpu", "int8")
             logger.info("✅ Fast STT ready")
         except ImportError:
             self._model_load_error = "faster-whisper not installed"
@@ -114,6 +124,25 @@ class FastSttService:
         """Check if the STT model is loaded and ready"""
         return self.model is not None
     
+    def warmup(self) -> bool:
+        """
+        Run one short silent transcription so the first real request
+        doesn't pay for kernel and allocator initialization.
+        
+        Returns:
+            True if the model ran, False if it is unavailable or warmup failed
+        """
+        if not self.model:
+            return False
+        
+        try:
+            warm_up_model(self.model)
+            logger.info("Fast STT warmed up")
+            return True
+        except Exception as e:
+            logger.warning(f"Fast STT warmup failed: {e}")
+            return False
+    
     def _get_hebrish_stt(self):
         """Lazy-load Hebrish STT service when needed"""
         if self._hebrish_stt is None:
@@ -194,25 +223,35 @@ class FastSttService:
             return self._gemini_fallback(audio_path)
         
         start_time = time.time()
+        model_used = f"faster_whisper_{self.model_size}"
+        
+        cache, cache_key = get_cache_entry(audio_path, model=model_used, options=_TRANSCRIBE_OPTIONS)
+        if cache_key:
+            cached_segments = cache.get(cache_key)
+            if cached_segments is not None:
+                logger.info(f"STT cache hit: {len(cached_segments)} segments")
+                if session_id:
+                    self._log_segment_turns(session_id, cached_segments)
+                return SttResult(
+                    segments=cached_segments,
+                    processing_time_ms=(time.time() - start_time) * 1000,
+                    model_used=model_used
+                )
         
         try:
             # Run faster-whisper transcription
-            segments_iter, info = self.model.transcribe(
-                audio_path, 
-                beam_size=5,
-                vad_filter=True,  # Voice Activity Detection
-                vad_parameters=dict(min_silence_duration_ms=500)
-            )
+            segments_iter, info = self.model.transcribe(audio_path, **_TRANSCRIBE_OPTIONS)
             
-            # Convert to list of dicts
-            segments_list = []
-            for seg in segments_iter:
-                segments_list.append({
+            # Convert to list of dicts (faster-whisper always sets avg_logprob)
+            segments_list = [
+                {
                     "start": seg.start,
                     "end": seg.end,
                     "text": seg.text.strip(),
-                    "confidence": getattr(seg, 'avg_logprob', 0.0)
-                })
+                    "confidence": seg.avg_logprob
+                }
+                for seg in segments_iter
+            ]
             
             processing_time = (time.time() - start_time) * 1000
             
@@ -221,6 +260,9 @@ class FastSttService:
                 f"(audio duration: {info.duration:.1f}s)"
             )
             
+            if cache_key:
+                cache.set(cache_key, segments_list)
+            
             # Log VIDEO_SEGMENT turns if session_id provided
             if session_id:
                 self._log_segment_turns(session_id, segments_list)
@@ -228,7 +270,7 @@ class FastSttService:
             return SttResult(
                 segments=segments_list,
                 processing_time_ms=processing_time,
-                model_used=f"faster_whisper_{self.model_size}"
+                model_used=model_used
             )
         
         except Exception as e:
@@ -250,11 +292,10 @@ class FastSttService:
     def _log_segment_turns(self, session_id: str, segments: List[Dict[str, Any]]) -> None:
         """Log VIDEO_SEGMENT turns for each transcribed segment."""
         try:
-            from app.services.turn_log_service import get_turn_log_service, SessionTurn, TurnType
+            from app.services.turn_log_service import get_turn_log_service, SessionTurnFast, TurnType
             
-            turn_log = get_turn_log_service()
-            for i, seg in enumerate(segments):
-                turn = SessionTurn(
+            turns = [
+                SessionTurnFast(
                     session_id=session_id,
                     type=TurnType.VIDEO_SEGMENT,
                     segment_id=f"seg_{i}",
@@ -266,7 +307,10 @@ class FastSttService:
                         "model": self.model_size
                     }
                 )
-                turn_log.append_turn(turn)
+                for i, seg in enumerate(segments)
+            ]
+            # One open/write for the whole transcript instead of one per segment
+            get_turn_log_service().append_turns(session_id, turns)
             
             logger.info(f"Logged {len(segments)} VIDEO_SEGMENT turns for session {session_id}")
         except Exception as e:
@@ -287,22 +331,29 @@ class FastSttService:
         }
 
 
-# Singleton instance
+# Singleton instance with thread-safe initialization
+# (the startup warmup thread and first requests may race to load the model)
 _fast_stt_service: Optional[FastSttService] = None
+_fast_stt_lock = threading.Lock()
 
 
 def get_fast_stt_service(enabled: bool = True) -> FastSttService:
-    """Get or create the FastSttService singleton"""
+    """Get or create the FastSttService singleton (thread-safe)"""
     global _fast_stt_service
     if _fast_stt_service is None:
-        from app.core.config import settings
-        enabled = getattr(settings, 'fast_stt_enabled', True)
-        model_size = getattr(settings, 'fast_stt_model', 'small')
-        _fast_stt_service = FastSttService(enabled=enabled, model_size=model_size)
+        with _fast_stt_lock:
+            # Double-check after acquiring lock
+            if _fast_stt_service is None:
+                from app.core.config import settings
+                enabled = getattr(settings, 'fast_stt_enabled', True)
+                model_size = getattr(settings, 'fast_stt_model', 'small')
+                _fast_stt_service = FastSttService(enabled=enabled, model_size=model_size)
     return _fast_stt_service
 
 
 def reset_fast_stt_service() -> None:
     """Reset the singleton (for testing)"""
     global _fast_stt_service
-    _fast_stt_service = None
+    with _fast_stt_lock:
+        _fast_stt_service = None
+    clear_models()
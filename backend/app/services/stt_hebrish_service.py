@@ -5,12 +5,19 @@ Uses ivrit-ai/faster-whisper-v2-d4 model with tech vocabulary bias
 for transcribing Israeli dev meeting recordings.
 """
 
+import os
 import time
 import logging
 import threading
 from dataclasses import dataclass, field
+from functools import cached_property
 from typing import List, Dict, Optional, Any
 
+import anyio
+
+from app.services._whisper_registry import clear_models, get_or_load_model, warm_up_model, get_transcribe_slots
+from app.services.transcript_cache import get_cache_entry
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,24 +32,28 @@ class HebrishResult:
     def segment_count(self) -> int:
         return len(self.segments)
     
-    @property
+    # Segments are final once the result is built, so compute this once
+    @cached_property
     def total_duration(self) -> float:
         if not self.segments:
             return 0.0
         return max(s.get("end", 0) for s in self.segments)
 
 
+# Kaggle-extracted tech vocabulary (backend/models/tech_prompt.txt)
+_PROMPT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "models", "tech_prompt.txt")
+
+
 # Tech vocabulary for initial prompt bias
 # Try to load from Kaggle-extracted file, fallback to default
 def _load_tech_prompt() -> str:
     """Load tech vocab prompt from file or use default"""
-    from pathlib import Path
-    prompt_file = Path(__file__).parent.parent.parent / "models" / "tech_prompt.txt"
-    if prompt_file.exists():
-        try:
-            return prompt_file.read_text(encoding="utf-8").strip()
-        except Exception:
-            pass
+    try:
+        with open(_PROMPT_PATH, encoding="utf-8") as f:
+            return f.read().strip()
+    except (OSError, ValueError):
+        # Missing or unreadable (e.g. not UTF-8): use the default prompt
+        pass
     # Fallback to default prompt
     return (
         "deploy production logs API JSON React kubernetes commit PR merge "
@@ -55,6 +66,16 @@ def _load_tech_prompt() -> str:
 
 TECH_VOCAB_PROMPT = _load_tech_prompt()
 
+# Decode settings for transcribe(); also part of the transcript cache key,
+# so editing tech_prompt.txt or tuning these invalidates cached transcripts
+_TRANSCRIBE_OPTIONS: Dict[str, Any] = dict(
+    language="he",  # Hebrew primary
+    initial_prompt=TECH_VOCAB_PROMPT,  # Tech vocab bias
+    beam_size=5,
+    vad_filter=True,
+    vad_parameters=dict(min_silence_duration_ms=500)
+)
+
 
 class HebrishSTTService:
     """
@@ -79,27 +100,24 @@ class HebrishSTTService:
         self.model = None
         self._model_load_error: Optional[str] = None
         self._device = device
+        self._compute_type: Optional[str] = None
         self._load_model()
     
     def _load_model(self) -> None:
         """Load the Hebrew-optimized Whisper model"""
         try:
             import torch
-            from faster_whisper import WhisperModel
             
             # Auto-detect device
             if self._device is None:
                 self._device = "cuda" if torch.cuda.is_available() else "cpu"
             
-            # Compute type based on device
-            compute_type = "float16" if self._device == "cuda" else "int8"
+            # Compute type based on device: int8 weights halve memory traffic,
+            # with fp16 activations on GPU
+            self._compute_type = "int8_float16" if self._device == "cuda" else "int8"
             
-            logger.info(f"Loading Hebrish model on {self._device}...")
-            self.model = WhisperModel(
-                "ivrit-ai/faster-whisper-v2-d4",
-                device=self._device,
-                compute_type=compute_type
-            )
+            logger.info(f"Loading Hebrish model on {self._device} ({self._compute_type})...")
+            self.model = get_or_load_model("ivrit-ai/faster-whisper-v2-d4", self._device, self._compute_type)
             logger.info("✅ Hebrish STT ready")
             
         except ImportError as e:
@@ -114,6 +132,25 @@ class HebrishSTTService:
         """Check if the model is loaded and ready"""
         return self.model is not None
     
+    def warmup(self) -> bool:
+        """
+        Run one short silent transcription so the first real request
+        doesn't pay for kernel and allocator initialization.
+        
+        Returns:
+            True if the model ran, False if it is unavailable or warmup failed
+        """
+        if not self.model:
+            return False
+        
+        try:
+            warm_up_model(self.model, language="he")
+            logger.info("Hebrish STT warmed up")
+            return True
+        except Exception as e:
+            logger.warning(f"Hebrish STT warmup failed: {e}")
+            return False
+    
     def transcribe(self, audio_path: str) -> HebrishResult:
         """
         Transcribe audio file with Hebrew + tech vocab optimization.
@@ -134,26 +171,36 @@ class HebrishSTTService:
         
         start_time = time.time()
         
+        cache, cache_key = get_cache_entry(
+            audio_path,
+            model="ivrit-ai/faster-whisper-v2-d4",
+            language="he",
+            options=_TRANSCRIBE_OPTIONS
+        )
+        if cache_key:
+            cached_segments = cache.get(cache_key)
+            if cached_segments is not None:
+                logger.info(f"Hebrish STT cache hit: {len(cached_segments)} segments")
+                return HebrishResult(
+                    segments=cached_segments,
+                    processing_time_ms=(time.time() - start_time) * 1000,
+                    model_used="ivrit-ai/faster-whisper-v2-d4"
+                )
+        
         try:
             # Run transcription with Hebrew language and tech vocab bias
-            segments_iter, info = self.model.transcribe(
-                audio_path,
-                language="he",  # Hebrew primary
-                initial_prompt=TECH_VOCAB_PROMPT,  # Tech vocab bias
-                beam_size=5,
-                vad_filter=True,
-                vad_parameters=dict(min_silence_duration_ms=500)
-            )
+            segments_iter, info = self.model.transcribe(audio_path, **_TRANSCRIBE_OPTIONS)
             
-            # Convert to list of dicts
-            segments_list = []
-            for seg in segments_iter:
-                segments_list.append({
+            # Convert to list of dicts (faster-whisper always sets avg_logprob)
+            segments_list = [
+                {
                     "start": seg.start,
                     "end": seg.end,
                     "text": seg.text.strip(),
-                    "confidence": getattr(seg, 'avg_logprob', 0.0)
-                })
+                    "confidence": seg.avg_logprob
+                }
+                for seg in segments_iter
+            ]
             
             processing_time = (time.time() - start_time) * 1000
             
@@ -162,6 +209,9 @@ class HebrishSTTService:
                 f"in {processing_time:.0f}ms (duration: {info.duration:.1f}s)"
             )
             
+            if cache_key:
+                cache.set(cache_key, segments_list)
+            
             return HebrishResult(
                 segments=segments_list,
                 processing_time_ms=processing_time,
@@ -176,6 +226,22 @@ class HebrishSTTService:
                 model_used="error"
             )
     
+    async def transcribe_async(self, audio_path: str) -> HebrishResult:
+        """
+        Async transcribe for event-loop callers.
+        
+        Runs in a worker thread. At most WHISPER_NUM_WORKERS calls (the
+        shared model's parallelism, across all services and event loops
+        using it) transcribe at once; the rest wait in their worker thread.
+        """
+        slots = get_transcribe_slots("ivrit-ai/faster-whisper-v2-d4", self._device, self._compute_type)
+        
+        def transcribe_bounded() -> HebrishResult:
+            with slots:
+                return self.transcribe(audio_path)
+        
+        return await anyio.to_thread.run_sync(transcribe_bounded)
+    
     def get_health_status(self) -> Dict[str, Any]:
         """Get health status for monitoring"""
         return {
@@ -207,3 +273,4 @@ def reset_hebrish_stt_service() -> None:
     global _hebrish_stt_service
     with _hebrish_stt_lock:
         _hebrish_stt_service = None
+    clear_models()
@@ -8,16 +8,39 @@ Provides a higher-level view of session content:
 """
 
 import json
-import uuid
+import os
+import secrets
 import logging
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from datetime import datetime, timezone
-from typing import List, Optional, Dict, Any
+from typing import BinaryIO, Callable, List, Optional, Dict, Any, Union
 from enum import Enum
 from pydantic import BaseModel, Field
 
+# orjson is ~5x faster than stdlib json and emits datetimes as ISO 8601 natively;
+# fall back if it isn't installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    orjson = None
+    _json_loads = json.loads
+
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False, default=datetime.isoformat).encode("utf-8")
+
 logger = logging.getLogger(__name__)
 
+# Appends go through a 64KB buffer per session log, kept open across calls
+_WRITE_BUFFER_SIZE = 64 * 1024
+
+# Session logs kept open at once (least recently written closed first)
+_MAX_OPEN_LOGS = 32
+
 
 class TurnType(str, Enum):
     """Type of turn in the session log"""
@@ -29,7 +52,7 @@ class TurnType(str, Enum):
 class SessionTurn(BaseModel):
     """A single turn in the session log"""
     session_id: str
-    turn_id: str = Field(default_factory=lambda: str(uuid.uuid4())[:8])
+    turn_id: str = Field(default_factory=lambda: secrets.token_hex(4))
     type: TurnType
     segment_id: Optional[str] = None
     start: Optional[float] = None
@@ -42,21 +65,43 @@ class SessionTurn(BaseModel):
     class Config:
         use_enum_values = True
     
+    def to_json_bytes(self) -> bytes:
+        """Serialize to UTF-8 JSON (compact, timestamp as ISO 8601), without newline"""
+        return _json_dumps(self.model_dump())
+    
     def to_json_line(self) -> str:
         """Serialize to JSON line for JSONL format"""
-        data = self.model_dump()
-        # Convert datetime to ISO string
-        data["timestamp_utc"] = self.timestamp_utc.isoformat()
-        return json.dumps(data, ensure_ascii=False)
+        return self.to_json_bytes().decode("utf-8")
     
     @classmethod
-    def from_json_line(cls, line: str) -> "SessionTurn":
-        """Deserialize from JSON line"""
-        data = json.loads(line)
-        # Parse datetime
-        if isinstance(data.get("timestamp_utc"), str):
-            data["timestamp_utc"] = datetime.fromisoformat(data["timestamp_utc"])
-        return cls(**data)
+    def from_json_line(cls, line: Union[str, bytes]) -> "SessionTurn":
+        """Deserialize from JSON line (parsed and validated in one pydantic-core pass)"""
+        return cls.model_validate_json(line)
+
+
+@dataclass(slots=True, kw_only=True)
+class SessionTurnFast:
+    """
+    Write-only SessionTurn for hot logging paths.
+    
+    Skips pydantic validation; serializes to the same JSONL line, so the
+    log is still read back as SessionTurn.
+    """
+    session_id: str
+    turn_id: str = field(default_factory=lambda: secrets.token_hex(4))
+    type: TurnType
+    segment_id: Optional[str] = None
+    start: Optional[float] = None
+    end: Optional[float] = None
+    text: Optional[str] = None
+    markdown: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    timestamp_utc: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    
+    def to_json_bytes(self) -> bytes:
+        """Serialize to UTF-8 JSON (compact, timestamp as ISO 8601), without newline"""
+        # orjson serializes dataclasses natively; stdlib json needs a dict
+        return _json_dumps(self if orjson is not None else asdict(self))
 
 
 class TurnLogService:
@@ -70,28 +115,107 @@ class TurnLogService:
     def __init__(self, base_dir: str = "data/turn_logs"):
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        # Log paths are built by string concat; Path.__truediv__ is comparatively slow
+        self._log_prefix = os.path.join(str(self.base_dir), "")
+        # session_id -> open buffered append handle, least recently written first
+        self._handles: "OrderedDict[str, BinaryIO]" = OrderedDict()
+        self._lock = threading.Lock()
         logger.info(f"TurnLogService initialized: {self.base_dir}")
     
-    def _get_log_file(self, session_id: str) -> Path:
+    def _get_log_file(self, session_id: str) -> str:
         """Get path to session's turn log file"""
-        return self.base_dir / f"{session_id}.jsonl"
+        return f"{self._log_prefix}{session_id}.jsonl"
+    
+    def _write(self, session_id: str, data: bytes) -> None:
+        """Write to a session's buffered log handle, opening it on first use"""
+        with self._lock:
+            handle = self._handles.get(session_id)
+            if handle is None:
+                handle = open(self._get_log_file(session_id), "ab", buffering=_WRITE_BUFFER_SIZE)
+                self._handles[session_id] = handle
+                if len(self._handles) > _MAX_OPEN_LOGS:
+                    self._handles.popitem(last=False)[1].close()
+            else:
+                self._handles.move_to_end(session_id)
+            
+            try:
+                handle.write(data)
+            except Exception:
+                # Don't keep writing through a broken handle
+                self._handles.pop(session_id, None)
+                handle.close()
+                raise
     
-    def append_turn(self, turn: SessionTurn) -> None:
+    def _flush(self, session_id: str) -> None:
+        """Push a session's buffered turns to disk so readers see them"""
+        with self._lock:
+            handle = self._handles.get(session_id)
+            if handle is not None:
+                handle.flush()
+    
+    def close_session(self, session_id: str) -> None:
         """
-        Append a turn to the session's log file.
+        Flush and close a session's log handle (reopened if it is appended to again).
         
         Args:
-            turn: SessionTurn to append
+            session_id: Session whose log is finished
+        """
+        with self._lock:
+            handle = self._handles.pop(session_id, None)
+        if handle is not None:
+            handle.close()
+    
+    def close(self) -> None:
+        """Flush and close every open log handle"""
+        with self._lock:
+            handles, self._handles = list(self._handles.values()), OrderedDict()
+        for handle in handles:
+            handle.close()
+    
+    def append_turn(self, turn: Union[SessionTurn, SessionTurnFast]) -> None:
         """
-        log_file = self._get_log_file(turn.session_id)
+        Append a turn to the session's log file.
         
+        Args:
+            turn: SessionTurn (or SessionTurnFast) to append
+        """
         try:
-            with open(log_file, "a", encoding="utf-8") as f:
-                f.write(turn.to_json_line() + "\n")
-            logger.debug(f"Appended {turn.type} turn to {log_file.name}")
+            self._write(turn.session_id, turn.to_json_bytes() + b"\n")
+            logger.debug(f"Appended {turn.type} turn for session {turn.session_id}")
         except Exception as e:
             logger.error(f"Failed to append turn: {e}")
     
+    def append_turns(self, session_id: str, turns: List[Union[SessionTurn, SessionTurnFast]]) -> None:
+        """
+        Append several turns to a session's log with a single write.
+        
+        Args:
+            session_id: Session the turns belong to
+            turns: SessionTurns (or SessionTurnFasts) to append, in order
+        """
+        if not turns:
+            return
+        
+        try:
+            self._write(session_id, b"".join(turn.to_json_bytes() + b"\n" for turn in turns))
+            logger.debug(f"Appended {len(turns)} turns for session {session_id}")
+        except Exception as e:
+            logger.error(f"Failed to append turns: {e}")
+    
+    def list_turns_raw(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        Read all turns for a session as plain dicts, without model validation.
+        
+        For display paths; timestamps stay ISO 8601 strings.
+        
+        Args:
+            session_id: Session to read turns for
+            
+        Returns:
+            List of turn dicts
+        """
+        return self._parse_log(session_id, _json_loads)
+    
     def list_turns(self, session_id: str) -> List[SessionTurn]:
         """
         Read all turns for a session.
@@ -102,18 +226,26 @@ class TurnLogService:
         Returns:
             List of SessionTurn objects
         """
-        log_file = self._get_log_file(session_id)
+        return self._parse_log(session_id, SessionTurn.from_json_line)
+    
+    def _parse_log(self, session_id: str, parse: Callable[[bytes], Any]) -> List[Any]:
+        """Read a session's log in one read and parse each line (stops at the first bad line)"""
+        self._flush(session_id)
         
-        if not log_file.exists():
+        try:
+            with open(self._get_log_file(session_id), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.error(f"Failed to read turns: {e}")
             return []
         
         turns = []
         try:
-            with open(log_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        turns.append(SessionTurn.from_json_line(line))
+            for line in data.split(b"\n"):
+                if line.strip():
+                    turns.append(parse(line))
         except Exception as e:
             logger.error(f"Failed to read turns: {e}")
         
@@ -129,7 +261,9 @@ class TurnLogService:
         Returns:
             Absolute path to the JSONL file
         """
-        return str(self._get_log_file(session_id).resolve())
+        # The caller reads the file directly, so it must not miss buffered turns
+        self._flush(session_id)
+        return os.path.realpath(self._get_log_file(session_id))
     
     def get_api_path(self, session_id: str) -> str:
         """
@@ -146,11 +280,15 @@ class TurnLogService:
 
 # Singleton
 _turn_log_service: Optional[TurnLogService] = None
+_turn_log_lock = threading.Lock()
 
 
 def get_turn_log_service() -> TurnLogService:
-    """Get or create the TurnLogService singleton"""
+    """Get or create the TurnLogService singleton (thread-safe)"""
     global _turn_log_service
     if _turn_log_service is None:
-        _turn_log_service = TurnLogService()
+        with _turn_log_lock:
+            # Double-check after acquiring lock
+            if _turn_log_service is None:
+                _turn_log_service = TurnLogService()
     return _turn_log_service
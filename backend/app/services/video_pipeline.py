@@ -6,10 +6,11 @@ to eliminate code duplication (CR_FINDINGS 3.1).
 """
 
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Callable, Awaitable
-from typing import Optional, List, Dict, Any, Callable, Awaitable
+from typing import Optional, List, Dict, Any, Callable, Awaitable, Tuple, Set
+import asyncio
 import logging
 import time
+from operator import itemgetter
 
 from fastapi.concurrency import run_in_threadpool
 
@@ -20,7 +21,8 @@ from app.services.video_processor import (
     VideoProcessingError,
     split_into_segments,
     extract_segment_frames,
-    create_low_fps_proxy
+    create_low_fps_proxy,
+    extract_audio
 )
 from app.services.clip_generator import ClipGenerator
 import json
@@ -34,6 +36,37 @@ from app.core.observability import get_acontext_client, extract_code_blocks, rec
 logger = logging.getLogger(__name__)
 
 
+# Pulls (start, end, text) out of an STT segment dict in one C-level call
+_segment_fields = itemgetter("start", "end", "text")
+
+_JSON_FENCE_RE = re.compile(r'```json\s*(.*?)\s*```', re.DOTALL)
+
+# Background artifact uploads; the event loop only keeps weak references to
+# tasks, so hold them here until they finish
+_artifact_tasks: Set["asyncio.Task[None]"] = set()
+
+
+def _format_srt_time(seconds: float) -> str:
+    """Format seconds as an SRT timestamp (HH:MM:SS,mmm)"""
+    millis = int((seconds % 1) * 1000)
+    seconds = int(seconds)
+    minutes = seconds // 60
+    hours = minutes // 60
+    minutes %= 60
+    seconds %= 60
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{millis:03d}"
+
+
+def _build_srt(segments: List[Dict[str, Any]]) -> str:
+    """Render STT segments as SRT subtitles"""
+    srt_lines = []
+    for i, (start, end, text) in enumerate(map(_segment_fields, segments), 1):
+        srt_lines.append(f"{i}")
+        srt_lines.append(f"{_format_srt_time(start)} --> {_format_srt_time(end)}")
+        srt_lines.append(f"{text}\n")
+    return "\n".join(srt_lines)
+
+
 class PipelineError(Exception):
     """Custom exception for pipeline processing errors."""
     pass
@@ -59,6 +92,71 @@ class VideoPipelineResult:
         self.project_name = project_name
 
 
+async def _analyze_relevance_async(
+    generator,
+    video_path: Path,
+    context_keywords: Optional[List[str]],
+    progress_callback: Optional[Callable[[int, str], Awaitable[None]]] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Find relevant segments with Gemini on a 1 FPS proxy of the video.
+    
+    Returns:
+        Relevant segments, or None to fall back to regular frame sampling
+    """
+    try:
+        logger.info("Starting Dual-Stream Optimization: Creating Low-FPS Proxy...")
+        proxy_path = await run_in_threadpool(create_low_fps_proxy, str(video_path))
+        
+        if progress_callback:
+            await progress_callback(30, "Analyzing content relevance...")
+        
+        logger.info("Starting Multimodal Semantic Analysis using Gemini Flash...")
+        # Use multimodal analysis on the proxy video instead of audio-only
+        # Wrapped in run_in_threadpool to prevent blocking the event loop (CR_FINDINGS 1.1)
+        return await run_in_threadpool(
+            generator.analyze_video_relevance,
+            proxy_path,
+            context_keywords=context_keywords
+        )
+    except Exception as e:
+        logger.warning(f"Semantic analysis failed, falling back to regular sampling: {e}")
+        return None
+
+
+async def _run_stt_async(stt_service, video_path: Path) -> Tuple[str, str]:
+    """
+    Transcribe the video's audio with Hebrish STT.
+    
+    Args:
+        stt_service: HebrishSTTService, or None when STT is not requested
+        video_path: Path to the video file
+    
+    Returns:
+        (transcript_text, srt_subtitles), both empty if STT is skipped or fails
+    """
+    if stt_service is None:
+        return "", ""
+    
+    try:
+        logger.info("Starting Hebrish STT transcription...")
+        start_time = time.time()
+        
+        audio_path = await run_in_threadpool(extract_audio, str(video_path))
+        
+        if not stt_service.is_available:
+            logger.warning("Hebrish STT service requested but model unavailable")
+            return "", ""
+        
+        stt_result = await stt_service.transcribe_async(audio_path)
+        logger.info(f"STT complete. Duration: {time.time() - start_time:.2f}s")
+        return "\n".join([s["text"] for s in stt_result.segments]), _build_srt(stt_result.segments)
+    except Exception as e:
+        logger.error(f"STT processing failed: {e}")
+        # Continue pipeline without STT
+        return "", ""
+
+
 async def process_video_pipeline(
     video_path: Path,
     task_id: str,
@@ -115,93 +213,30 @@ async def process_video_pipeline(
         raise PipelineError(f"Invalid video file: {str(e)}")
     
     
-    # 2 & 3. Optimization: Create Low-FPS Proxy for Semantic Analysis
+    # 2, 3 & 3.5. Semantic analysis on a low-FPS proxy and optional Hebrish STT.
+    # They use different resources (ffmpeg + Gemini vs. local Whisper), so both
+    # branches run concurrently and each falls back on its own failure.
     if progress_callback:
         await progress_callback(10, "Analyzing video duration...")
 
     generator = get_generator()
-    relevant_segments = None
-    
-    try:
-        logger.info("Starting Dual-Stream Optimization: Creating Low-FPS Proxy...")
-        
-        if progress_callback:
-            await progress_callback(20, "Creating optimized proxy...")
-
-        # 1 FPS Proxy for analysis
-        proxy_path = await run_in_threadpool(create_low_fps_proxy, str(video_path))
-        
-        if progress_callback:
-            await progress_callback(30, "Analyzing content relevance...")
-
-        logger.info("Starting Multimodal Semantic Analysis using Gemini Flash...")
-        # Use multimodal analysis on the proxy video instead of audio-only
-        # Wrapped in run_in_threadpool to prevent blocking the event loop (CR_FINDINGS 1.1)
-        relevant_segments = await run_in_threadpool(
-            generator.analyze_video_relevance,
-            proxy_path,
-            context_keywords=context_keywords
-        )
-    except Exception as e:
-        logger.warning(f"Semantic analysis failed, falling back to regular sampling: {e}")
-        relevant_segments = None
-    
-    # 3.5 Optional: Hebrish STT Transcription
-    transcript_text = ""
-    srt_subtitles = ""
+    stt_service = None
     try:
-        from app.services.stt_hebrish_service import get_hebrish_stt_service
-        from app.services.video_processor import extract_audio
-        
-        should_run_stt = settings.hebrish_stt_enabled or mode == "subtitle_extractor"
-        
-        if should_run_stt:
-            if progress_callback:
-                await progress_callback(40, "Transcribing audio (Hebrish)...")
-                
-            logger.info("Starting Hebrish STT transcription...")
-            start_time = time.time()
-            
-            # Extract audio first
-            audio_path = await run_in_threadpool(extract_audio, str(video_path))
-            
-            # Transcribe
+        if settings.hebrish_stt_enabled or mode == "subtitle_extractor":
+            from app.services.stt_hebrish_service import get_hebrish_stt_service
             stt_service = get_hebrish_stt_service()
-            if stt_service.is_available:
-                stt_result = await run_in_threadpool(stt_service.transcribe, audio_path)
-                
-                # Format results
-                transcript_text = "\n".join([s["text"] for s in stt_result.segments])
-                
-                # Generate SRT
-                # Quick helper for SRT formatting
-                def format_srt_time(seconds):
-                    millis = int((seconds % 1) * 1000)
-                    seconds = int(seconds)
-                    minutes = seconds // 60
-                    hours = minutes // 60
-                    minutes %= 60
-                    seconds %= 60
-                    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{millis:03d}"
-
-                srt_lines = []
-                for i, seg in enumerate(stt_result.segments, 1):
-                    srt_lines.append(f"{i}")
-                    srt_lines.append(f"{format_srt_time(seg['start'])} --> {format_srt_time(seg['end'])}")
-                    srt_lines.append(f"{seg['text']}\n")
-                
-                srt_subtitles = "\n".join(srt_lines)
-                
-                logger.info(f"STT complete. Duration: {time.time() - start_time:.2f}s")
-                
-                # If mode is subtitle_extractor, we might short-circuit here or pass it to generation
-            else:
-                logger.warning("Hebrish STT service requested but model unavailable")
-                
     except Exception as e:
         logger.error(f"STT processing failed: {e}")
-        # Continue pipeline without STT
-
+    
+    if progress_callback:
+        await progress_callback(
+            20, "Creating optimized proxy and transcribing audio..." if stt_service else "Creating optimized proxy..."
+        )
+    
+    relevant_segments, (transcript_text, srt_subtitles) = await asyncio.gather(
+        _analyze_relevance_async(generator, video_path, context_keywords, progress_callback),
+        _run_stt_async(stt_service, video_path)
+    )
     
     # 4. Frame extraction (Smart Extraction from Original High-Qual Video)
     if progress_callback:
@@ -277,36 +312,45 @@ async def process_video_pipeline(
             try:
                 # Extract JSON from potential markdown blocks
                 json_str = documentation
-                json_match = re.search(r'```json\s*(.*?)\s*```', documentation, re.DOTALL)
+                json_match = _JSON_FENCE_RE.search(documentation)
                 if json_match:
                     json_str = json_match.group(1)
                 
-                clips_data = json.loads(json_str)
+                # Only a JSON array of clips is usable; skip the full parse for prose output
+                json_str = json_str.strip()
+                clips_data = json.loads(json_str) if json_str.startswith("[") else None
+                if clips_data is None:
+                    logger.warning("Clip Generator output is not a JSON array, skipping clip creation")
                 if isinstance(clips_data, list):
                     logger.info(f"Generating {len(clips_data)} viral clips...")
                     clip_gen = ClipGenerator(output_dir=str(task_dir / "clips"))
                     
+                    async def _make_clip(clip: Dict[str, Any]) -> str:
+                        # Parse timestamps (flexible handling)
+                        start = float(clip.get("start_time", clip.get("start", 0)))
+                        end = float(clip.get("end_time", clip.get("end", 0)))
+                        return await clip_gen.create_clip(
+                            str(video_path),
+                            start,
+                            end,
+                            "vertical" # Default to vertical for social
+                        )
+                    
+                    # Encodes run as concurrent subprocesses, capped by the generator's semaphore
+                    clip_results = await asyncio.gather(
+                        *(_make_clip(clip) for clip in clips_data),
+                        return_exceptions=True
+                    )
+                    
                     generated_clips_info = []
-                    for i, clip in enumerate(clips_data):
-                        try:
-                            # Parse timestamps (flexible handling)
-                            start = float(clip.get("start_time", clip.get("start", 0)))
-                            end = float(clip.get("end_time", clip.get("end", 0)))
-                            
-                            clip_path = await run_in_threadpool(
-                                clip_gen.create_clip,
-                                str(video_path),
-                                start,
-                                end,
-                                "vertical" # Default to vertical for social
-                            )
-                            
-                            generated_clips_info.append(f"- **Clip {i+1}**: {clip.get('hook', 'Viral Clip')} ([View]({Path(clip_path).name}))")
-                            clip['file_path'] = str(clip_path) # Update data with path
-                            
-                        except Exception as e:
-                            logger.error(f"Failed to generate clip {i}: {e}")
-                            generated_clips_info.append(f"- **Clip {i+1}**: Failed ({str(e)})")
+                    for i, (clip, clip_path) in enumerate(zip(clips_data, clip_results)):
+                        if isinstance(clip_path, Exception):
+                            logger.error(f"Failed to generate clip {i}: {clip_path}")
+                            generated_clips_info.append(f"- **Clip {i+1}**: Failed ({str(clip_path)})")
+                            continue
+                        
+                        generated_clips_info.append(f"- **Clip {i+1}**: {clip.get('hook', 'Viral Clip')} ([View]({Path(clip_path).name}))")
+                        clip['file_path'] = str(clip_path) # Update data with path
                     
                     # Append generation report to documentation
                     documentation += "\n\n## Generated Clips\n" + "\n".join(generated_clips_info)
@@ -323,8 +367,8 @@ async def process_video_pipeline(
     except AIGenerationError as e:
         raise PipelineError(f"AI generation failed: {str(e)}")
     
-    # 6. Store artifacts in Acontext (Flight Recorder)
-    _store_artifacts(task_id, documentation, project_name)
+    # 6. Store artifacts in Acontext (Flight Recorder), off the response path
+    _spawn_artifact_upload(task_id, documentation, project_name)
     
     # 7. Persist to history
     storage = get_storage_service()
@@ -348,10 +392,12 @@ async def process_video_pipeline(
     )
 
 
-def _store_artifacts(task_id: str, documentation: str, project_name: str) -> None:
+async def _store_artifacts(task_id: str, documentation: str, project_name: str) -> None:
     """
     Store generated documentation and code blocks as artifacts in Acontext.
     
+    Uploads run concurrently in the threadpool. Each failure is only logged.
+    
     Args:
         task_id: Unique task/session identifier
         documentation: Generated markdown documentation
@@ -362,32 +408,67 @@ def _store_artifacts(task_id: str, documentation: str, project_name: str) -> Non
         if not client.is_enabled:
             return
         
-        # Store the main documentation
-        client.add_artifact(
-            filename=f"{task_id}_docs.md",
-            content=documentation.encode('utf-8'),
-            path="/outputs/"
+        # Resolve the disk once so concurrent uploads don't each create one
+        disk_id = await run_in_threadpool(client.get_or_create_disk)
+        if not disk_id:
+            return
+        
+        code_blocks = await run_in_threadpool(extract_code_blocks, documentation)
+        uploads = [(f"{task_id}_docs.md", documentation, "/outputs/")] + [
+            (f"{task_id}_code_{i}.{block.get('lang', 'txt')}", block['code'], "/outputs/code/")
+            for i, block in enumerate(code_blocks)
+        ]
+        results = await asyncio.gather(
+            *(
+                run_in_threadpool(
+                    client.add_artifact,
+                    filename=filename,
+                    content=content.encode('utf-8'),
+                    path=path,
+                    disk_id=disk_id
+                )
+                for filename, content, path in uploads
+            ),
+            return_exceptions=True
         )
-        logger.info(f"Stored documentation artifact for {task_id}")
         
-        # Extract and store code blocks
-        code_blocks = extract_code_blocks(documentation)
-        for i, block in enumerate(code_blocks):
-            ext = block.get('lang', 'txt')
-            client.add_artifact(
-                filename=f"{task_id}_code_{i}.{ext}",
-                content=block['code'].encode('utf-8'),
-                path="/outputs/code/"
-            )
+        for (filename, _, _), result in zip(uploads, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to store artifact {filename}: {result}")
         
-        if code_blocks:
-            logger.info(f"Stored {len(code_blocks)} code block artifacts for {task_id}")
+        stored = sum(1 for result in results if result is True)
+        logger.info(f"Stored {stored}/{len(uploads)} artifacts (docs + code blocks) for {task_id}")
             
     except Exception as e:
         # Don't fail the request if artifact storage fails
         logger.warning(f"Failed to store artifacts in Acontext: {e}")
 
 
+def _spawn_artifact_upload(task_id: str, documentation: str, project_name: str) -> None:
+    """Start _store_artifacts in the background without awaiting it"""
+    task = asyncio.create_task(_store_artifacts(task_id, documentation, project_name))
+    _artifact_tasks.add(task)
+    task.add_done_callback(_artifact_tasks.discard)
+
+
+async def wait_for_artifact_uploads(timeout: float = 10.0) -> bool:
+    """
+    Wait for background artifact uploads to finish (e.g. before shutdown).
+    
+    Args:
+        timeout: Maximum seconds to wait
+    
+    Returns:
+        True if every upload finished, False if some were still running
+    """
+    if not _artifact_tasks:
+        return True
+    _, pending = await asyncio.wait(set(_artifact_tasks), timeout=timeout)
+    if pending:
+        logger.warning(f"{len(pending)} artifact uploads still running after {timeout}s")
+    return not pending
+
+
 async def process_video_pipeline_segmented(
     video_path: Path,
     task_id: str,
@@ -465,67 +546,57 @@ async def process_video_pipeline_segmented(
     if progress_callback:
         await progress_callback(10, f"Processing {len(segments)} segments...")
     
-    # 3. Process each segment
+    # 3. Process segments concurrently. They are independent, so ffmpeg
+    # extraction of one overlaps Gemini generation of another; the semaphore
+    # caps how many are in flight at once.
     generator = get_generator()
-    segment_docs = []
     frames_dir = task_dir / "frames"
+    segment_slots = asyncio.Semaphore(max(1, settings.max_concurrent_segments))
     
-    # Progress allocation: 10-85% for segment processing
+    # Progress allocation: 10-85% for segment processing, advanced as segments finish
     progress_per_segment = 75 / max(len(segments), 1)
+    completed = 0
     
-    for seg in segments:
+    async def _process_one_segment(seg: Dict[str, Any]) -> Dict[str, Any]:
+        nonlocal completed
         seg_index = seg["index"]
         seg_start = seg["start"]
         seg_end = seg["end"]
         
-        # Update progress for this segment
-        current_progress = 10 + int(progress_per_segment * seg_index)
-        if progress_callback:
-            await progress_callback(
-                current_progress,
-                f"Processing segment {seg_index + 1}/{len(segments)} ({seg_start:.0f}s - {seg_end:.0f}s)"
-            )
-        
-        # 3a. Extract frames for this segment
-        try:
-            segment_frames_dir = frames_dir / f"seg_{seg_index:02d}"
-            frame_paths = await run_in_threadpool(
-                extract_segment_frames,
-                str(video_path),
-                seg_start,
-                seg_end,
-                str(segment_frames_dir),
-                settings.frame_interval,
-                seg_index
-            )
-            logger.info(f"Segment {seg_index}: extracted {len(frame_paths)} frames")
-        except VideoProcessingError as e:
-            logger.warning(f"Segment {seg_index} frame extraction failed: {e}")
-            frame_paths = []
-        
-        # 3b. Generate documentation for this segment
-        if frame_paths:
+        async with segment_slots:
+            # 3a. Extract frames for this segment
             try:
-                segment_doc = await run_in_threadpool(
-                    generator.generate_segment_doc,
-                    seg,
-                    frame_paths,
-                    prompt_config,
-                    project_name,
-                    None  # audio_summary - future enhancement
+                segment_frames_dir = frames_dir / f"seg_{seg_index:02d}"
+                frame_paths = await run_in_threadpool(
+                    extract_segment_frames,
+                    str(video_path),
+                    seg_start,
+                    seg_end,
+                    str(segment_frames_dir),
+                    settings.frame_interval,
+                    seg_index
                 )
-            except AIGenerationError as e:
-                logger.warning(f"Segment {seg_index} doc generation failed: {e}")
-                segment_doc = f"*Segment {seg_index + 1} processing failed.*\n"
-        else:
-            segment_doc = f"*No frames extracted for segment {seg_index + 1}.*\n"
-        
-        segment_docs.append({
-            "index": seg_index,
-            "start": seg_start,
-            "end": seg_end,
-            "doc": segment_doc
-        })
+                logger.info(f"Segment {seg_index}: extracted {len(frame_paths)} frames")
+            except VideoProcessingError as e:
+                logger.warning(f"Segment {seg_index} frame extraction failed: {e}")
+                frame_paths = []
+            
+            # 3b. Generate documentation for this segment
+            if frame_paths:
+                try:
+                    segment_doc = await run_in_threadpool(
+                        generator.generate_segment_doc,
+                        seg,
+                        frame_paths,
+                        prompt_config,
+                        project_name,
+                        None  # audio_summary - future enhancement
+                    )
+                except AIGenerationError as e:
+                    logger.warning(f"Segment {seg_index} doc generation failed: {e}")
+                    segment_doc = f"*Segment {seg_index + 1} processing failed.*\n"
+            else:
+                segment_doc = f"*No frames extracted for segment {seg_index + 1}.*\n"
         
         # Record segment processed event
         record_event(task_id, EventType.SEGMENT_PROCESSED, {
@@ -533,6 +604,34 @@ async def process_video_pipeline_segmented(
             "frame_count": len(frame_paths),
             "doc_length": len(segment_doc)
         })
+        
+        # Single-threaded event loop, so the counter needs no lock
+        completed += 1
+        if progress_callback:
+            await progress_callback(
+                10 + int(progress_per_segment * completed),
+                f"Processed segment {seg_index + 1} ({completed}/{len(segments)}, {seg_start:.0f}s - {seg_end:.0f}s)"
+            )
+        
+        return {
+            "index": seg_index,
+            "start": seg_start,
+            "end": seg_end,
+            "doc": segment_doc
+        }
+    
+    # Segment failures already fall back to placeholder docs, so anything that
+    # escapes fails the pipeline; cancel the rest rather than let them keep
+    # spending Gemini quota for a session that has already failed
+    tasks = [asyncio.create_task(_process_one_segment(seg)) for seg in segments]
+    try:
+        segment_docs = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    segment_docs.sort(key=itemgetter("index"))
     
     # 4. Merge segments
     if progress_callback:
@@ -548,7 +647,7 @@ async def process_video_pipeline_segmented(
     if progress_callback:
         await progress_callback(90, "Storing artifacts...")
     
-    _store_artifacts(task_id, documentation, project_name)
+    _spawn_artifact_upload(task_id, documentation, project_name)
     
     # 6. Persist to history
     storage = get_storage_service()
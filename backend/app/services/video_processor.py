@@ -6,6 +6,7 @@ from typing import List, Optional, Dict
 import logging
 import subprocess
 import os
+import tempfile
 
 logger = logging.getLogger(__name__)
 
@@ -146,6 +147,87 @@ def extract_audio(video_path: str, output_dir: Optional[str] = None) -> str:
         raise VideoProcessingError(f"Failed to extract audio: {str(e)}")
 
 
+# Frames below this size are uploaded as-is; re-encoding them saves little
+UPLOAD_FRAME_MAX_BYTES = 200 * 1024
+UPLOAD_FRAME_WEBP_QUALITY = 80
+# Longest side for context frames sent as thumbnails
+UPLOAD_THUMBNAIL_MAX_DIM = 512
+
+
+def prepare_frame_for_upload(
+    frame_path: str,
+    max_bytes: int = UPLOAD_FRAME_MAX_BYTES,
+    quality: int = UPLOAD_FRAME_WEBP_QUALITY,
+    max_dim: Optional[int] = None
+) -> str:
+    """
+    Down-convert a frame to WebP before it is uploaded to Gemini.
+    
+    Gemini's vision tokenizer downsamples images anyway, so a q80 WebP carries
+    the same information at a fraction of the upload size. Converted files are
+    kept in an `.upload/` subfolder next to the frame and reused while they are
+    newer than the source, so reruns skip the encode.
+    
+    Args:
+        frame_path: Path to the extracted frame image
+        max_bytes: Frames at or below this size are returned unchanged
+        quality: WebP quality (0-100)
+        max_dim: If set, also downscale so the longest side is at most this
+            many pixels (always converted, regardless of max_bytes)
+    
+    Returns:
+        Path to upload - the WebP copy, or the original frame if conversion
+        was skipped or failed
+    """
+    try:
+        source = Path(frame_path)
+        source_stat = source.stat()
+        if max_dim is None and source_stat.st_size <= max_bytes:
+            return frame_path
+        
+        suffix = f"_{max_dim}" if max_dim else ""
+        converted = source.parent / ".upload" / f"{source.stem}{suffix}.webp"
+        if converted.exists() and converted.stat().st_mtime_ns >= source_stat.st_mtime_ns:
+            return str(converted)
+        
+        image = cv2.imread(str(source))
+        if image is None:
+            return frame_path
+        
+        if max_dim:
+            height, width = image.shape[:2]
+            scale = max_dim / max(height, width)
+            if scale < 1:
+                image = cv2.resize(
+                    image,
+                    (max(1, int(width * scale)), max(1, int(height * scale))),
+                    interpolation=cv2.INTER_AREA
+                )
+        
+        ok, buffer = cv2.imencode(".webp", image, [cv2.IMWRITE_WEBP_QUALITY, quality])
+        if not ok:
+            return frame_path
+        
+        converted.parent.mkdir(parents=True, exist_ok=True)
+        # Publish with os.replace so a parallel upload (which trusts any file
+        # newer than the source) never reads a half-written image
+        fd, tmp_path = tempfile.mkstemp(dir=converted.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(buffer.tobytes())
+            os.replace(tmp_path, converted)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        
+        logger.debug(f"Converted {source.name} for upload: {source_stat.st_size} -> {len(buffer)} bytes")
+        return str(converted)
+    
+    except Exception as e:
+        logger.warning(f"Frame conversion failed for {frame_path}, uploading original: {e}")
+        return frame_path
+
+
 def extract_frames_at_timestamps(
     video_path: str,
     output_dir: str,
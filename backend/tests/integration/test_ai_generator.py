@@ -76,3 +76,18 @@ class TestAIGenerator:
         assert result == "# Generated Documentation Content"
         assert mock_model.generate_content.called
 
+
+
+class TestTurnLogQueue:
+    """Test the background turn-log writer"""
+
+    @patch("app.services.ai_generator.get_turn_log_service")
+    def test_drain_waits_for_queued_turns(self, mock_get_service):
+        from app.services import ai_generator
+        from app.services.turn_log_service import SessionTurnFast, TurnType
+        
+        turn = SessionTurnFast(session_id="s1", type=TurnType.AGENT_NOTE, text="note")
+        ai_generator._enqueue_turn(turn)
+        
+        assert ai_generator.drain(timeout=5.0) is True
+        mock_get_service.return_value.append_turn.assert_called_with(turn)
@@ -145,3 +145,20 @@ class TestSessionManager:
         
         status = manager.get_status(test_id)
         assert status.get("status") == "failed"
+
+    @patch("app.services.session_manager.get_turn_log_service")
+    def test_fail_closes_turn_log(self, mock_get_turn_log):
+        """Test a failed session's buffered turn log is closed"""
+        from app.services.session_manager import get_session_manager
+        
+        manager = get_session_manager()
+        test_id = f"test_fail_log_{uuid.uuid4().hex[:8]}"
+        
+        manager.create_session(
+            session_id=test_id,
+            metadata={"title": "Fail Log Test", "mode": "general_doc"}
+        )
+        manager.start_processing(test_id)
+        manager.fail(test_id, "Test error message")
+        
+        mock_get_turn_log.return_value.close_session.assert_called_once_with(test_id)
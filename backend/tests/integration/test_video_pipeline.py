@@ -58,6 +58,45 @@ class TestVideoPipeline:
         assert result.status == "completed"
         assert result.project_name == "Test Project"
 
+    @pytest.mark.asyncio
+    @patch("app.services.stt_hebrish_service.get_hebrish_stt_service")
+    @patch("app.services.video_pipeline.extract_audio")
+    @patch("app.services.video_pipeline.get_generator")
+    @patch("app.services.video_pipeline.extract_frames")
+    @patch("app.services.video_pipeline.create_low_fps_proxy")
+    @patch("app.services.video_pipeline.get_video_duration")
+    @patch("app.services.video_pipeline.get_storage_service")
+    @patch("app.services.video_pipeline.get_acontext_client")
+    async def test_stt_survives_failed_relevance_analysis(
+        self, mock_acontext, mock_storage, mock_duration, mock_proxy, mock_extract,
+        mock_generator, mock_audio, mock_get_stt, mock_prompt_config
+    ):
+        """Test the STT branch runs alongside analysis and keeps its result when analysis fails"""
+        mock_duration.return_value = 60.0
+        mock_proxy.side_effect = RuntimeError("ffmpeg failed")
+        mock_extract.return_value = [str(Path("f1.jpg"))]
+        mock_audio.return_value = "audio.wav"
+        mock_acontext.return_value.is_enabled = False
+        
+        stt_service = mock_get_stt.return_value
+        stt_service.is_available = True
+        stt_service.transcribe_async = AsyncMock(return_value=MagicMock(
+            segments=[{"start": 0.0, "end": 1.0, "text": "שלום"}]
+        ))
+        
+        result = await process_video_pipeline(
+            video_path=Path("test.mp4"),
+            task_id="test_task",
+            prompt_config=mock_prompt_config,
+            project_name="Test Project",
+            mode="subtitle_extractor"
+        )
+        
+        assert result.documentation == "1\n00:00:00,000 --> 00:00:01,000\nשלום\n"
+        stt_service.transcribe_async.assert_awaited_once_with("audio.wav")
+        # Relevance failed, so frames fall back to regular sampling
+        assert mock_extract.call_args[0][3] is None
+
     @pytest.mark.asyncio
     @patch("app.services.video_pipeline.get_video_duration")
     async def test_process_video_pipeline_failure(
@@ -121,3 +160,147 @@ class TestVideoPipeline:
         assert mock_gen_inst.merge_segments.called
         assert mock_split.called
 
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_pipeline.get_generator")
+    @patch("app.services.video_pipeline.extract_segment_frames")
+    @patch("app.services.video_pipeline.split_into_segments")
+    @patch("app.services.video_pipeline.get_video_duration")
+    @patch("app.services.video_pipeline.get_storage_service")
+    @patch("app.services.video_pipeline.get_acontext_client")
+    async def test_segments_run_concurrently_and_merge_in_order(
+        self, mock_acontext, mock_storage, mock_duration, mock_split, mock_extract_seg, mock_generator, mock_prompt_config
+    ):
+        """Test segments overlap up to the cap and merge in index order"""
+        import threading
+        import time
+        from app.core.config import settings
+        from app.services.video_pipeline import process_video_pipeline_segmented
+        
+        mock_duration.return_value = 120.0
+        mock_split.return_value = [
+            {"index": i, "start": i * 30.0, "end": (i + 1) * 30.0} for i in range(4)
+        ]
+        mock_acontext.return_value.is_enabled = False
+        
+        lock = threading.Lock()
+        in_flight = [0]
+        peak = [0]
+        
+        def slow_extract(video, start, end, out_dir, interval, index):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            # Later segments finish first
+            time.sleep(0.05 * (4 - index))
+            with lock:
+                in_flight[0] -= 1
+            return [f"f{index}.jpg"]
+        
+        mock_extract_seg.side_effect = slow_extract
+        mock_gen_inst = mock_generator.return_value
+        mock_gen_inst.generate_segment_doc.side_effect = lambda seg, *args: f"doc {seg['index']}"
+        mock_gen_inst.merge_segments.return_value = "# Merged"
+        
+        with patch.object(settings, "max_concurrent_segments", 2):
+            await process_video_pipeline_segmented(
+                video_path=Path("test.mp4"),
+                task_id="test_task",
+                prompt_config=mock_prompt_config,
+                project_name="Test Project",
+                segment_duration_sec=30
+            )
+        
+        merged = mock_gen_inst.merge_segments.call_args[0][0]
+        assert [s["doc"] for s in merged] == ["doc 0", "doc 1", "doc 2", "doc 3"]
+        assert peak[0] == 2
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_pipeline.get_generator")
+    @patch("app.services.video_pipeline.extract_segment_frames")
+    @patch("app.services.video_pipeline.split_into_segments")
+    @patch("app.services.video_pipeline.get_video_duration")
+    async def test_unexpected_segment_error_cancels_other_segments(
+        self, mock_duration, mock_split, mock_extract_seg, mock_generator, mock_prompt_config
+    ):
+        """Test a segment failing unexpectedly stops queued segments from starting"""
+        from app.core.config import settings
+        from app.services.video_pipeline import process_video_pipeline_segmented
+        
+        mock_duration.return_value = 120.0
+        mock_split.return_value = [
+            {"index": i, "start": i * 30.0, "end": (i + 1) * 30.0} for i in range(4)
+        ]
+        mock_extract_seg.return_value = ["f.jpg"]
+        mock_gen_inst = mock_generator.return_value
+        mock_gen_inst.generate_segment_doc.side_effect = RuntimeError("boom")
+        
+        with patch.object(settings, "max_concurrent_segments", 1):
+            with pytest.raises(RuntimeError):
+                await process_video_pipeline_segmented(
+                    video_path=Path("test.mp4"),
+                    task_id="test_task",
+                    prompt_config=mock_prompt_config,
+                    project_name="Test Project",
+                    segment_duration_sec=30
+                )
+        
+        assert mock_gen_inst.generate_segment_doc.call_count == 1
+
+
+class TestSrtFormatting:
+    """Test SRT rendering of STT segments"""
+
+    def test_build_srt(self):
+        from app.services.video_pipeline import _build_srt
+
+        srt = _build_srt([
+            {"start": 0.0, "end": 2.5, "text": "שלום", "confidence": -0.2},
+            {"start": 3661.25, "end": 3662.0, "text": "deploy"},
+        ])
+
+        assert srt == (
+            "1\n00:00:00,000 --> 00:00:02,500\nשלום\n\n"
+            "2\n01:01:01,250 --> 01:01:02,000\ndeploy\n"
+        )
+
+
+class TestArtifactStorage:
+    """Test concurrent artifact uploads to Acontext"""
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_pipeline.get_acontext_client")
+    async def test_uploads_docs_and_code_blocks_to_one_disk(self, mock_acontext):
+        from app.services.video_pipeline import _store_artifacts
+
+        client = mock_acontext.return_value
+        client.is_enabled = True
+        client.get_or_create_disk.return_value = "disk-1"
+        client.add_artifact.return_value = True
+
+        doc = "# Doc\n\n```python\nprint(1)\n```\n\n```bash\nls\n```\n"
+        await _store_artifacts("t1", doc, "Project")
+
+        client.get_or_create_disk.assert_called_once()
+        uploaded = {c.kwargs["filename"]: c.kwargs for c in client.add_artifact.call_args_list}
+        assert set(uploaded) == {"t1_docs.md", "t1_code_0.python", "t1_code_1.bash"}
+        assert uploaded["t1_code_0.python"]["content"] == b"print(1)"
+        assert all(kw["disk_id"] == "disk-1" for kw in uploaded.values())
+
+    @pytest.mark.asyncio
+    @patch("app.services.video_pipeline._store_artifacts")
+    async def test_pending_uploads_are_awaited(self, mock_store):
+        import asyncio
+        from app.services.video_pipeline import _spawn_artifact_upload, wait_for_artifact_uploads
+
+        finished = []
+
+        async def slow_store(task_id, documentation, project_name):
+            await asyncio.sleep(0.01)
+            finished.append(task_id)
+
+        mock_store.side_effect = slow_store
+        _spawn_artifact_upload("t1", "# Doc", "Project")
+
+        assert await wait_for_artifact_uploads(timeout=5.0) is True
+        assert finished == ["t1"]
@@ -89,6 +89,18 @@ class TestPromptLoader:
         assert "Context: Daily Standup" in config.system_instruction
         assert "Check login flow thoroughly" in config.guidelines[0]
 
+    def test_interpolation_keeps_json_braces_and_reuses_templates(self, temp_prompts_dir):
+        from app.services.prompt_loader import PromptLoader, _compile_template
+        loader = PromptLoader(prompts_dir=temp_prompts_dir)
+        data = {"system_instruction": 'Title: {meeting_title}. Return {"ok": true} or {}. Missing: {other}'}
+        
+        hits_before = _compile_template.cache_info().hits
+        for _ in range(2):
+            result = loader._interpolate_context(dict(data), {"meeting_title": "Standup"})
+        
+        assert result["system_instruction"] == 'Title: Standup. Return {"ok": true} or {}. Missing: $other'
+        assert _compile_template.cache_info().hits == hits_before + 1
+
     def test_load_nonexistent_prompt(self, temp_prompts_dir):
         from app.services.prompt_loader import PromptLoader, PromptLoadError
         loader = PromptLoader(prompts_dir=temp_prompts_dir)
@@ -105,6 +117,37 @@ class TestPromptLoader:
         assert metadata[0]["mode"] == "bug_report"
         assert metadata[0]["name"] == "Bug Report"
 
+    def test_warm_cache_reloads_changed_files(self, temp_prompts_dir):
+        import os
+        from app.services.prompt_loader import PromptLoader
+        loader = PromptLoader(prompts_dir=temp_prompts_dir)
+        
+        # Warmed at construction
+        assert "bug_report" in loader._cache
+        cached = loader.load_prompt("bug_report")
+        assert loader.load_prompt("bug_report") is cached
+        
+        prompt_file = temp_prompts_dir / "bug_report.yaml"
+        data = yaml.safe_load(prompt_file.read_text())
+        data["name"] = "Bug Report v2"
+        prompt_file.write_text(yaml.dump(data))
+        stat = prompt_file.stat()
+        os.utime(prompt_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        
+        assert loader.load_prompt("bug_report").name == "Bug Report v2"
+
+    def test_mode_list_rescanned_on_directory_change(self, temp_prompts_dir):
+        from app.services.prompt_loader import PromptLoader
+        loader = PromptLoader(prompts_dir=temp_prompts_dir)
+        assert loader.list_available_modes() == ["bug_report"]
+        
+        with patch("app.services.prompt_loader.os.scandir", side_effect=AssertionError("rescanned")):
+            assert loader.list_available_modes() == ["bug_report"]
+        
+        (temp_prompts_dir / "feature_spec.yaml").write_text("name: Spec\n")
+        (temp_prompts_dir / "archive.yaml").mkdir()
+        assert loader.list_available_modes() == ["bug_report", "feature_spec"]
+
     def test_clear_cache(self, temp_prompts_dir):
         from app.services.prompt_loader import PromptLoader
         loader = PromptLoader(prompts_dir=temp_prompts_dir)
@@ -125,3 +125,320 @@ class TestStorageOperations:
         details = service.get_session_details("nonexistent_session_xyz123")
         
         assert details is None
+
+
+class TestHistoryLog:
+    """Test the append-only history log and its in-memory index"""
+
+    def test_updates_append_and_replay_last_write_wins(self, tmp_path):
+        """Test updates append one line each and replay keeps recent-first order"""
+        from app.services.storage_service import StorageService
+        
+        service = StorageService(str(tmp_path))
+        service.add_session("a", {"title": "A", "status": "processing"})
+        service.add_session("b", {"title": "B"})
+        service.add_session("a", {"title": "A", "status": "completed"})
+        
+        assert len(service.history_file.read_text(encoding="utf-8").splitlines()) == 3
+        
+        reloaded = StorageService(str(tmp_path))
+        history = reloaded.get_history()
+        assert [s["id"] for s in history] == ["a", "b"]
+        assert history[0]["status"] == "completed"
+
+    def test_timestamp_matches_epoch(self, tmp_path):
+        """Test the ISO timestamp is the local time of timestamp_epoch"""
+        from datetime import datetime
+        from app.services.storage_service import StorageService
+        
+        service = StorageService(str(tmp_path))
+        service.add_session("a", {"title": "A"})
+        [entry] = service.get_history()
+        
+        parsed = datetime.fromisoformat(entry["timestamp"])
+        assert parsed.timestamp() == int(entry["timestamp_epoch"])
+
+    def test_corrupt_line_is_skipped(self, tmp_path):
+        """Test a torn line does not lose the rest of the history"""
+        from app.services.storage_service import StorageService
+        
+        service = StorageService(str(tmp_path))
+        service.add_session("a", {"title": "A"})
+        with open(service.history_file, "a", encoding="utf-8") as f:
+            f.write('{"id": "b", "tit\n')
+        service.add_session("c", {"title": "C"})
+        
+        assert [s["id"] for s in StorageService(str(tmp_path)).get_history()] == ["c", "a"]
+
+    def test_legacy_history_is_migrated(self, tmp_path):
+        """Test an existing history.json seeds the log once"""
+        import json
+        from app.services.storage_service import StorageService
+        
+        legacy = {"sessions": [{"id": "new", "title": "N"}, {"id": "old", "title": "O"}]}
+        (tmp_path / "history.json").write_text(json.dumps(legacy), encoding="utf-8")
+        
+        service = StorageService(str(tmp_path))
+        assert [s["id"] for s in service.get_history()] == ["new", "old"]
+        assert service.history_file.exists()
+        
+        (tmp_path / "history.json").unlink()
+        assert [s["id"] for s in StorageService(str(tmp_path)).get_history()] == ["new", "old"]
+
+    def test_log_is_compacted(self, tmp_path):
+        """Test repeated updates to one session are compacted away"""
+        from app.services.storage_service import StorageService, _COMPACT_MIN_LINES
+        
+        service = StorageService(str(tmp_path))
+        for i in range(_COMPACT_MIN_LINES + 5):
+            service.add_session("a", {"title": f"A{i}"})
+        
+        assert len(service.history_file.read_text(encoding="utf-8").splitlines()) < _COMPACT_MIN_LINES
+        assert StorageService(str(tmp_path)).get_history()[0]["title"] == f"A{_COMPACT_MIN_LINES + 4}"
+
+    def test_compaction_keeps_other_writers_appends(self, tmp_path):
+        """Test compacting replays lines appended by another process first"""
+        from app.services.storage_service import StorageService
+        
+        first = StorageService(str(tmp_path))
+        second = StorageService(str(tmp_path))
+        first.add_session("a", {"title": "A"})
+        second.add_session("b", {"title": "B"})
+        first._compact()
+        
+        assert [s["id"] for s in first.get_history()] == ["b", "a"]
+        assert [s["id"] for s in StorageService(str(tmp_path)).get_history()] == ["b", "a"]
+
+    def test_torn_tail_is_terminated_on_load(self, tmp_path):
+        """Test a crash-torn last line does not swallow the next append"""
+        from app.services.storage_service import StorageService
+        
+        service = StorageService(str(tmp_path))
+        service.add_session("a", {"title": "A"})
+        with open(service.history_file, "ab") as f:
+            f.write(b'{"id": "b", "tit')
+        
+        StorageService(str(tmp_path)).add_session("c", {"title": "C"})
+        assert [s["id"] for s in StorageService(str(tmp_path)).get_history()] == ["c", "a"]
+
+    def test_batch_is_one_write(self, tmp_path):
+        """Test a batch applies in order and lands in the log together"""
+        from app.services.storage_service import StorageService
+        
+        service = StorageService(str(tmp_path))
+        service.add_sessions_batch([("a", {"title": "A"}), ("b", {"title": "B"})])
+        
+        assert [s["id"] for s in service.get_history()] == ["b", "a"]
+        assert [s["id"] for s in StorageService(str(tmp_path)).get_history()] == ["b", "a"]
+
+    def test_log_is_compact_utf8(self, tmp_path):
+        """Test entries are written as compact UTF-8 JSON lines"""
+        from app.services.storage_service import StorageService
+        
+        service = StorageService(str(tmp_path))
+        service.add_session("h", {"title": "סקירת עיצוב"})
+        
+        line = service.history_file.read_bytes().decode("utf-8")
+        assert "סקירת עיצוב" in line
+        assert ": " not in line and line.endswith("\n")
+        assert StorageService(str(tmp_path)).get_session_entry("h")["title"] == "סקירת עיצוב"
+
+    def test_get_session_entry(self, tmp_path):
+        """Test single-session lookups go through the index"""
+        from app.services.storage_service import StorageService
+        
+        service = StorageService(str(tmp_path))
+        service.add_session("a", {"title": "A"})
+        service.add_session("a", {"title": "A2"})
+        
+        assert service.get_session_entry("a")["title"] == "A2"
+        assert service.get_session_entry("missing") is None
+
+
+class TestAtomicWrite:
+    """Test files are published atomically"""
+
+    def test_failed_write_keeps_original(self, tmp_path):
+        """Test a crash before publish leaves the previous file intact"""
+        from unittest.mock import patch
+        from app.services.storage_service import _atomic_write
+        
+        target = tmp_path / "history.jsonl"
+        _atomic_write(target, b"old\n")
+        
+        with patch("app.services.storage_service.os.fsync", side_effect=OSError("disk full")):
+            with pytest.raises(OSError):
+                _atomic_write(target, b"new\n")
+        
+        assert target.read_bytes() == b"old\n"
+        _atomic_write(target, b"new\n")
+        assert target.read_bytes() == b"new\n"
+        assert not (tmp_path / "history.jsonl.tmp").exists()
+
+
+class TestSessionFramesCache:
+    """Test frame listings are cached per frames-directory mtime"""
+
+    def test_listing_cached_until_directory_changes(self, tmp_path, monkeypatch):
+        """Test repeat listings skip the scan and new frames invalidate the cache"""
+        import os
+        from unittest.mock import patch
+        from app.core.config import settings
+        from app.services.storage_service import StorageService
+        
+        monkeypatch.setattr(settings, "upload_dir", str(tmp_path / "uploads"))
+        frames_dir = tmp_path / "uploads" / "s1" / "frames"
+        frames_dir.mkdir(parents=True)
+        (frames_dir / "frame_0001_t5.0s.jpg").write_bytes(b"")
+        
+        service = StorageService(str(tmp_path / "data"))
+        first = service.list_session_frames("s1")
+        assert [f["timestamp_sec"] for f in first] == [5.0]
+        
+        with patch("app.services.storage_service.os.scandir", side_effect=AssertionError("rescanned")):
+            assert service.list_session_frames("s1") == first
+        
+        (frames_dir / "frame_0000_t1.0s.jpg").write_bytes(b"")
+        stat = frames_dir.stat()
+        os.utime(frames_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert [f["timestamp_sec"] for f in service.list_session_frames("s1")] == [1.0, 5.0]
+
+
+class TestSessionArtifacts:
+    """Test heavy session content is written to the session directory"""
+
+    def test_documentation_and_segments_round_trip(self, tmp_path, monkeypatch):
+        """Test documentation is saved and read back with the segments timeline"""
+        from app.core.config import settings
+        from app.services.storage_service import StorageService
+        
+        monkeypatch.setattr(settings, "upload_dir", str(tmp_path / "uploads"))
+        service = StorageService(str(tmp_path / "data"))
+        service.add_session("s1", {
+            "title": "S1",
+            "documentation": "# Doc",
+        })
+        
+        (tmp_path / "uploads" / "s1" / "segments.json").write_text(
+            '[{"start": 0.0, "end": 1.5, "text": "שלום"}]', encoding="utf-8"
+        )
+        
+        details = service.get_session_details("s1")
+        assert details["doc_markdown"] == "# Doc"
+        assert details["segments"] == [{"start_sec": 0.0, "end_sec": 1.5, "text": "שלום"}]
+        assert (tmp_path / "uploads" / "s1" / "documentation.md").read_text(encoding="utf-8") == "# Doc"
+
+    def test_even_sample_parses_only_selected_frames(self, tmp_path, monkeypatch):
+        """Test select_evenly picks first/last plus evenly spaced frames"""
+        from unittest.mock import patch
+        from app.core.config import settings
+        from app.services.storage_service import StorageService
+        
+        monkeypatch.setattr(settings, "upload_dir", str(tmp_path / "uploads"))
+        frames_dir = tmp_path / "uploads" / "s1" / "frames"
+        frames_dir.mkdir(parents=True)
+        for i in range(100):
+            (frames_dir / f"frame_{i:04d}_t{i * 2.0:.1f}s.jpg").write_bytes(b"")
+        
+        service = StorageService(str(tmp_path / "data"))
+        with patch.object(StorageService, "_parse_frame", wraps=StorageService._parse_frame) as parse:
+            frames = service.list_session_frames("s1", limit=12, select_evenly=True)
+        
+        assert parse.call_count == 12
+        timestamps = [f["timestamp_sec"] for f in frames]
+        assert timestamps[0] == 0.0 and timestamps[-1] == 198.0
+        assert timestamps == sorted(timestamps)
+        assert len(service.list_session_frames("s1")) == 100
+
+    @pytest.mark.parametrize("name,timestamp", [
+        ("frame_0000_t1.0s.jpg", 1.0),
+        ("frame_0012.jpg", 60.0),
+        ("seg01_frame_0003_t12.5s.jpg", 12.5),
+        ("thumbnail.jpg", None),
+        ("frame_x_t1.0s.jpg", None),
+    ])
+    def test_frame_filename_parsing(self, name, timestamp):
+        """Test both frame naming formats and rejection of other images"""
+        from app.services.storage_service import StorageService
+        
+        frame = StorageService._parse_frame("s1", name)
+        if timestamp is None:
+            assert frame is None
+        else:
+            assert frame["timestamp_sec"] == timestamp
+            assert frame["thumbnail_url"] == f"/uploads/s1/frames/{name}"
+
+    def test_details_batch_matches_single(self, tmp_path, monkeypatch):
+        """Test the batch path returns the same details and skips unknown IDs"""
+        from app.core.config import settings
+        from app.services.storage_service import StorageService
+        
+        monkeypatch.setattr(settings, "upload_dir", str(tmp_path / "uploads"))
+        service = StorageService(str(tmp_path / "data"))
+        service.add_session("a", {"title": "A", "documentation": "# A"})
+        service.add_session("b", {"title": "B", "status": "failed"})
+        
+        batch = service.get_session_details_batch(["a", "b", "missing"])
+        
+        assert set(batch) == {"a", "b"}
+        assert batch["a"] == service.get_session_details("a")
+        assert batch["a"]["status"] == "completed"
+        assert batch["b"]["status"] == "failed"
+        assert service.get_session_details("missing") is None
+
+    def test_upload_path_follows_settings(self, tmp_path, monkeypatch):
+        """Test the upload root is created once per directory and follows settings"""
+        from app.core.config import settings
+        from app.services.storage_service import StorageService
+        
+        monkeypatch.setattr(settings, "upload_dir", str(tmp_path / "first"))
+        service = StorageService(str(tmp_path / "data"))
+        assert service._upload_path == tmp_path / "first"
+        assert service._upload_path is service._upload_path
+        
+        monkeypatch.setattr(settings, "upload_dir", str(tmp_path / "second"))
+        assert service._upload_path == tmp_path / "second"
+        assert (tmp_path / "second").is_dir()
+
+    async def test_async_details_match_sync(self, tmp_path, monkeypatch):
+        """Test the concurrent read path builds the same payload"""
+        from app.core.config import settings
+        from app.services.storage_service import StorageService
+        
+        monkeypatch.setattr(settings, "upload_dir", str(tmp_path / "uploads"))
+        service = StorageService(str(tmp_path / "data"))
+        service.add_session("a", {
+            "title": "A",
+            "documentation": "# A",
+        })
+        frames_dir = tmp_path / "uploads" / "a" / "frames"
+        frames_dir.mkdir(parents=True)
+        (frames_dir / "frame_0001_t5.0s.jpg").write_bytes(b"")
+        (tmp_path / "uploads" / "a" / "segments.json").write_text(
+            '[{"start": 0.0, "end": 1.0, "text": "hi"}]', encoding="utf-8"
+        )
+        
+        details = await service.get_session_details_async("a")
+        
+        assert details == service.get_session_details("a")
+        assert details["doc_markdown"] == "# A"
+        assert details["segments"] == [{"start_sec": 0.0, "end_sec": 1.0, "text": "hi"}]
+        assert len(details["key_frames"]) == 1
+        assert await service.get_session_details_async("missing") is None
+
+    def test_has_doc_flag_survives_status_updates(self, tmp_path, monkeypatch):
+        """Test the has_doc flag skips disk lookups and sticks once set"""
+        from unittest.mock import patch
+        from app.core.config import settings
+        from app.services.storage_service import StorageService
+        
+        monkeypatch.setattr(settings, "upload_dir", str(tmp_path / "uploads"))
+        service = StorageService(str(tmp_path / "data"))
+        service.add_session("nodoc", {"title": "N", "status": "failed"})
+        service.add_session("doc", {"title": "D", "documentation": "# D"})
+        service.add_session("doc", {"title": "D", "status": "completed"})
+        
+        assert service.get_session_entry("doc")["has_doc"] is True
+        assert service.get_session_result("doc")["documentation"] == "# D"
+        with patch("builtins.open", side_effect=AssertionError("disk read")):
+            assert service.get_session_result("nodoc") is None
@@ -124,3 +124,77 @@ class TestTechVocab:
         assert len(prompt) > 0
         # Should contain some tech terms
         assert any(term in prompt for term in ["API", "deploy", "docker", "React"])
+
+
+class TestHebrishModelLoading:
+    """Test CTranslate2 model options"""
+
+    @pytest.mark.parametrize("device,compute_type", [("cuda", "int8_float16"), ("cpu", "int8")])
+    def test_compute_type_per_device(self, device, compute_type):
+        """Test int8 weights are used on both GPU and CPU"""
+        import sys
+        from app.services.stt_hebrish_service import HebrishSTTService
+        from app.services._whisper_registry import clear_models
+
+        clear_models()
+        faster_whisper = MagicMock()
+        with patch.dict(sys.modules, {"torch": MagicMock(), "faster_whisper": faster_whisper}):
+            HebrishSTTService(device=device)
+
+        kwargs = faster_whisper.WhisperModel.call_args.kwargs
+        assert kwargs["device"] == device
+        assert kwargs["compute_type"] == compute_type
+        assert kwargs["cpu_threads"] >= 1
+
+        clear_models()
+
+    def test_model_shared_between_instances(self):
+        """Test services with the same model settings share one loaded model"""
+        import sys
+        from app.services.stt_hebrish_service import HebrishSTTService
+        from app.services._whisper_registry import clear_models
+
+        clear_models()
+        faster_whisper = MagicMock()
+        with patch.dict(sys.modules, {"torch": MagicMock(), "faster_whisper": faster_whisper}):
+            first = HebrishSTTService(device="cpu")
+            second = HebrishSTTService(device="cpu")
+
+        assert first.model is second.model
+        assert faster_whisper.WhisperModel.call_count == 1
+        clear_models()
+
+    def test_transcribe_slots_shared_between_instances(self):
+        """Test services sharing a model also share its concurrency bound"""
+        import sys
+        from app.services.stt_hebrish_service import HebrishSTTService
+        from app.services._whisper_registry import WHISPER_NUM_WORKERS, clear_models, get_transcribe_slots
+
+        clear_models()
+        with patch.dict(sys.modules, {"torch": MagicMock(), "faster_whisper": MagicMock()}):
+            HebrishSTTService(device="cpu")
+
+        slots = get_transcribe_slots("ivrit-ai/faster-whisper-v2-d4", "cpu", "int8")
+        assert slots is get_transcribe_slots("ivrit-ai/faster-whisper-v2-d4", "cpu", "int8")
+        assert all(slots.acquire(blocking=False) for _ in range(WHISPER_NUM_WORKERS))
+        assert not slots.acquire(blocking=False)
+        for _ in range(WHISPER_NUM_WORKERS):
+            slots.release()
+        clear_models()
+
+    def test_transcribe_async_works_across_event_loops(self):
+        """Test the shared slots are not bound to the first event loop that uses them"""
+        import asyncio
+        import sys
+        from app.services.stt_hebrish_service import HebrishSTTService
+        from app.services._whisper_registry import clear_models
+
+        clear_models()
+        with patch.dict(sys.modules, {"torch": MagicMock(), "faster_whisper": MagicMock()}):
+            service = HebrishSTTService(device="cpu")
+
+        with patch.object(service, "transcribe", return_value="result") as transcribe:
+            assert asyncio.run(service.transcribe_async("a.wav")) == "result"
+            assert asyncio.run(service.transcribe_async("b.wav")) == "result"
+        assert transcribe.call_count == 2
+        clear_models()
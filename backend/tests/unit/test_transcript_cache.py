@@ -0,0 +1,198 @@
+"""Unit tests for Transcript Cache"""
+import pytest
+from unittest.mock import patch, MagicMock
+
+
+class TestTranscriptCache:
+    """Test content-addressed transcript caching"""
+
+    def test_key_depends_on_content_and_params(self, tmp_path):
+        """Test key changes with audio bytes, model and language"""
+        from app.services.transcript_cache import TranscriptCache
+
+        a = tmp_path / "a.wav"
+        b = tmp_path / "b.wav"
+        a.write_bytes(b"audio-1")
+        b.write_bytes(b"audio-1")
+
+        key_a = TranscriptCache.make_key(str(a), model="small")
+        assert key_a == TranscriptCache.make_key(str(b), model="small")
+        assert key_a != TranscriptCache.make_key(str(a), model="medium")
+        assert key_a != TranscriptCache.make_key(str(a), model="small", language="he")
+
+        b.write_bytes(b"audio-2")
+        assert key_a != TranscriptCache.make_key(str(b), model="small")
+
+    def test_key_depends_on_decode_options(self, tmp_path):
+        """Test a changed prompt or beam size is a cache miss"""
+        from app.services.transcript_cache import TranscriptCache
+
+        audio = tmp_path / "a.wav"
+        audio.write_bytes(b"audio-1")
+        options = {"initial_prompt": "deploy kubernetes", "beam_size": 5}
+
+        key = TranscriptCache.make_key(str(audio), model="small", options=options)
+        assert key == TranscriptCache.make_key(str(audio), model="small", options=dict(options))
+        assert key != TranscriptCache.make_key(str(audio), model="small")
+        assert key != TranscriptCache.make_key(
+            str(audio), model="small", options={**options, "initial_prompt": "deploy docker"}
+        )
+        assert key != TranscriptCache.make_key(str(audio), model="small", options={**options, "beam_size": 1})
+
+    def test_rewritten_file_is_rehashed(self, tmp_path):
+        """Test the per-process digest memo notices a changed file"""
+        import os
+        from app.services.transcript_cache import TranscriptCache
+
+        audio = tmp_path / "a.wav"
+        audio.write_bytes(b"audio-1")
+        os.utime(audio, (1_000_000, 1_000_000))
+        before = TranscriptCache.make_key(str(audio), model="small")
+        assert TranscriptCache.make_key(str(audio), model="small") == before
+
+        audio.write_bytes(b"audio-2")
+        os.utime(audio, (1_000_001, 1_000_001))
+
+        assert TranscriptCache.make_key(str(audio), model="small") != before
+
+    def test_missing_file_has_no_key(self):
+        """Test unreadable audio disables caching instead of raising"""
+        from app.services.transcript_cache import TranscriptCache
+
+        assert TranscriptCache.make_key("/fake/path.wav", model="small") is None
+
+    def test_set_and_get_roundtrip(self, tmp_path):
+        """Test cached segments survive a new cache instance"""
+        from app.services.transcript_cache import TranscriptCache
+
+        segments = [{"start": 0.0, "end": 1.5, "text": "שלום deploy"}]
+        TranscriptCache(str(tmp_path / "cache")).set("abc123", segments)
+
+        assert TranscriptCache(str(tmp_path / "cache")).get("abc123") == segments
+        assert TranscriptCache(str(tmp_path / "cache")).get("missing") is None
+        assert TranscriptCache(str(tmp_path / "cache")).get(None) is None
+
+    def test_set_leaves_no_temp_files(self, tmp_path):
+        """Test entries are published whole via rename"""
+        from app.services.transcript_cache import TranscriptCache
+
+        cache = TranscriptCache(str(tmp_path / "cache"))
+        cache.set("abc123", [{"start": 0.0, "end": 1.0, "text": "hi"}])
+
+        assert [p.name for p in (tmp_path / "cache").iterdir()] == ["abc123.json"]
+
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        """Test the cache stays within max_entries, keeping recently read entries"""
+        import os
+        from app.services.transcript_cache import TranscriptCache
+
+        cache = TranscriptCache(str(tmp_path / "cache"), max_entries=2)
+        cache.set("old", [])
+        cache.set("used", [])
+        os.utime(tmp_path / "cache" / "old.json", (1_000_000, 1_000_000))
+        os.utime(tmp_path / "cache" / "used.json", (1_000_001, 1_000_001))
+        assert cache.get("old") == []
+
+        cache.set("new", [])
+
+        assert cache.get("used") is None
+        assert cache.get("old") == []
+        assert cache.get("new") == []
+
+
+    def test_singleton_created_once_under_concurrency(self, tmp_path):
+        """Test concurrent first calls share one TranscriptCache instance"""
+        import threading
+        import app.services.transcript_cache as cache_mod
+        from app.core.config import settings
+
+        instances = []
+        with patch.object(settings, "transcript_cache_dir", str(tmp_path / "cache")), \
+                patch.object(cache_mod, "_transcript_cache", None):
+            threads = [
+                threading.Thread(target=lambda: instances.append(cache_mod.get_transcript_cache()))
+                for _ in range(8)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        assert len(instances) == 8
+        assert all(inst is instances[0] for inst in instances)
+
+
+    def test_get_cache_entry_respects_setting(self, tmp_path):
+        """Test the shared lookup returns a key only when caching is enabled"""
+        from app.core.config import settings
+        from app.services.transcript_cache import TranscriptCache, get_cache_entry
+
+        audio = tmp_path / "meeting.wav"
+        audio.write_bytes(b"fake-audio")
+        cache = TranscriptCache(str(tmp_path / "cache"))
+
+        with patch("app.services.transcript_cache.get_transcript_cache", return_value=cache):
+            with patch.object(settings, "transcript_cache_enabled", True):
+                found, key = get_cache_entry(str(audio), model="small", options={"beam_size": 1})
+                assert found is cache
+                assert key == cache.make_key(str(audio), model="small", options={"beam_size": 1})
+                assert get_cache_entry(str(tmp_path / "missing.wav"), model="small") == (None, None)
+            with patch.object(settings, "transcript_cache_enabled", False):
+                assert get_cache_entry(str(audio), model="small") == (None, None)
+
+
+class TestHebrishTranscriptCaching:
+    """Test HebrishSTTService reuses cached transcripts"""
+
+    @patch("app.services.stt_hebrish_service.HebrishSTTService._load_model")
+    def test_second_transcribe_hits_cache(self, mock_load, tmp_path):
+        """Test identical audio is only transcribed once"""
+        from app.services.stt_hebrish_service import HebrishSTTService
+        from app.services.transcript_cache import TranscriptCache
+
+        audio = tmp_path / "meeting.wav"
+        audio.write_bytes(b"fake-audio")
+
+        segment = MagicMock(start=0.0, end=2.0, text=" hello ", avg_logprob=-0.1)
+        service = HebrishSTTService()
+        service.model = MagicMock()
+        service.model.transcribe.return_value = ([segment], MagicMock(duration=2.0))
+
+        cache = TranscriptCache(str(tmp_path / "cache"))
+        with patch("app.services.transcript_cache.get_transcript_cache", return_value=cache):
+            first = service.transcribe(str(audio))
+            second = service.transcribe(str(audio))
+
+        assert service.model.transcribe.call_count == 1
+        assert second.segments == first.segments == [
+            {"start": 0.0, "end": 2.0, "text": "hello", "confidence": -0.1}
+        ]
+
+
+class TestFastSttTranscriptCaching:
+    """Test FastSttService reuses cached transcripts"""
+
+    @patch("app.services.stt_fast_service.FastSttService._load_model")
+    def test_second_transcribe_hits_cache(self, mock_load, tmp_path):
+        """Test identical audio is only transcribed once per model size"""
+        from app.services.stt_fast_service import FastSttService
+        from app.services.transcript_cache import TranscriptCache
+
+        audio = tmp_path / "meeting.wav"
+        audio.write_bytes(b"fake-audio")
+
+        segment = MagicMock(start=0.0, end=2.0, text=" hello ", avg_logprob=-0.1)
+        service = FastSttService(enabled=True)
+        service.model = MagicMock()
+        service.model.transcribe.return_value = ([segment], MagicMock(duration=2.0))
+
+        cache = TranscriptCache(str(tmp_path / "cache"))
+        with patch("app.services.transcript_cache.get_transcript_cache", return_value=cache):
+            first = service.transcribe_video(str(audio))
+            second = service.transcribe_video(str(audio))
+            service.model_size = "medium"
+            service.transcribe_video(str(audio))
+
+        assert service.model.transcribe.call_count == 2
+        assert second.model_used == first.model_used == "faster_whisper_small"
+        assert second.segments == first.segments
@@ -0,0 +1,157 @@
+"""Unit tests for Turn Log Service"""
+import pytest
+from datetime import datetime, timezone
+
+
+class TestSessionTurnSerialization:
+    """Test JSONL (de)serialization of turns"""
+
+    def test_json_line_round_trip(self):
+        """Test a turn survives to_json_line/from_json_line unchanged"""
+        from app.services.turn_log_service import SessionTurn, TurnType
+
+        turn = SessionTurn(
+            session_id="s1",
+            type=TurnType.VIDEO_SEGMENT,
+            start=0.0,
+            end=1.5,
+            text="שלום deploy",
+            timestamp_utc=datetime(2024, 1, 2, 3, 4, 5, 678, tzinfo=timezone.utc),
+        )
+
+        line = turn.to_json_line()
+
+        assert "\n" not in line
+        assert "שלום" in line
+        assert '"timestamp_utc":"2024-01-02T03:04:05.000678+00:00"' in line
+        assert SessionTurn.from_json_line(line) == turn
+
+
+class TestTurnLogService:
+    """Test reading and writing session turn logs"""
+
+    def test_append_turns_matches_single_appends(self, tmp_path):
+        """Test a batch append writes the same lines as appending one by one"""
+        from app.services.turn_log_service import TurnLogService, SessionTurn, TurnType
+
+        turns = [
+            SessionTurn(session_id="s1", type=TurnType.VIDEO_SEGMENT, segment_id=f"seg_{i}", text=f"t{i}")
+            for i in range(3)
+        ]
+        batched = TurnLogService(str(tmp_path / "batched"))
+        single = TurnLogService(str(tmp_path / "single"))
+
+        batched.append_turns("s1", turns)
+        batched.append_turns("s1", [])
+        for turn in turns:
+            single.append_turn(turn)
+
+        assert batched.list_turns("s1") == single.list_turns("s1") == turns
+
+    def test_buffered_turns_visible_to_readers(self, tmp_path):
+        """Test buffered appends are flushed before reads and on close"""
+        from app.services.turn_log_service import TurnLogService, SessionTurn, TurnType
+
+        service = TurnLogService(str(tmp_path))
+        turn = SessionTurn(session_id="s1", type=TurnType.AGENT_NOTE, text="note")
+        service.append_turn(turn)
+
+        assert service.list_turns("s1") == [turn]
+
+        service.append_turn(turn)
+        service.close_session("s1")
+        assert len((tmp_path / "s1.jsonl").read_bytes().splitlines()) == 2
+
+        service.append_turn(turn)
+        service.close()
+        assert len(TurnLogService(str(tmp_path)).list_turns("s1")) == 3
+
+    def test_open_handles_are_capped(self, tmp_path):
+        """Test least recently written logs are closed beyond the cap"""
+        from app.services.turn_log_service import TurnLogService, SessionTurn, TurnType, _MAX_OPEN_LOGS
+
+        service = TurnLogService(str(tmp_path))
+        for i in range(_MAX_OPEN_LOGS + 3):
+            service.append_turn(SessionTurn(session_id=f"s{i}", type=TurnType.AGENT_NOTE))
+
+        assert len(service._handles) == _MAX_OPEN_LOGS
+        assert "s0" not in service._handles
+        assert len(service.list_turns("s0")) == 1
+        service.close()
+
+    def test_raw_turns_skip_validation(self, tmp_path):
+        """Test the raw listing returns plain dicts matching the typed turns"""
+        from app.services.turn_log_service import TurnLogService, SessionTurn, TurnType
+
+        service = TurnLogService(str(tmp_path))
+        turn = SessionTurn(session_id="s1", type=TurnType.DOC_SECTION, markdown="# Doc")
+        service.append_turn(turn)
+
+        raw = service.list_turns_raw("s1")
+
+        assert len(raw) == 1
+        assert raw[0]["markdown"] == "# Doc"
+        assert raw[0]["type"] == "DOC_SECTION"
+        assert isinstance(raw[0]["timestamp_utc"], str)
+        assert service.list_turns("s1") == [turn]
+        assert service.list_turns_raw("missing") == []
+        service.close()
+
+    def test_log_path_is_absolute(self, tmp_path, monkeypatch):
+        """Test the log path resolves to <base_dir>/<session_id>.jsonl"""
+        from app.services.turn_log_service import TurnLogService
+
+        monkeypatch.chdir(tmp_path)
+        service = TurnLogService("logs")
+
+        assert service.get_log_path("s1") == str((tmp_path / "logs" / "s1.jsonl").resolve())
+
+    def test_fast_turns_read_back_as_session_turns(self, tmp_path):
+        """Test the dataclass turn writes the same JSONL shape as SessionTurn"""
+        from app.services.turn_log_service import TurnLogService, SessionTurn, SessionTurnFast, TurnType
+
+        fast = SessionTurnFast(session_id="s1", type=TurnType.VIDEO_SEGMENT, start=0.0, end=2.0, text="שלום")
+        service = TurnLogService(str(tmp_path))
+        service.append_turns("s1", [fast])
+
+        [turn] = service.list_turns("s1")
+
+        assert not hasattr(fast, "__dict__")
+        assert turn == SessionTurn(
+            session_id="s1", turn_id=fast.turn_id, type=TurnType.VIDEO_SEGMENT,
+            start=0.0, end=2.0, text="שלום", timestamp_utc=fast.timestamp_utc,
+        )
+        service.close()
+
+
+class TestTurnLogSingleton:
+    """Test the get_turn_log_service singleton"""
+
+    def test_concurrent_first_calls_share_instance(self, monkeypatch):
+        """Test racing first callers construct the service only once"""
+        import threading
+        import time
+        from app.services import turn_log_service
+
+        created = []
+
+        class SlowTurnLogService:
+            def __init__(self):
+                time.sleep(0.05)
+                created.append(self)
+
+        monkeypatch.setattr(turn_log_service, "_turn_log_service", None)
+        monkeypatch.setattr(turn_log_service, "TurnLogService", SlowTurnLogService)
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(turn_log_service.get_turn_log_service()))
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(created) == 1
+        assert all(r is created[0] for r in results)
@@ -60,6 +60,13 @@ def reset_singletons():
     except (ImportError, AttributeError):
         pass
     
+    # Stop session_manager background threads and reset the singleton
+    try:
+        from app.services.session_manager import reset_session_manager
+        reset_session_manager()
+    except ImportError:
+        pass
+    
     # Reset calendar_watcher singleton
     try:
         import app.services.calendar_service as cal_mod
@@ -26,6 +26,8 @@ class TestDocumentationGenerator:
         with patch('app.services.ai_generator.settings') as mock:
             mock.gemini_api_key = "test_api_key"
             mock.groq_api_key = ""
+            mock.gemini_rate_limit_rpm = 0
+            mock.gemini_max_concurrency = 4
             yield mock
 
     def test_generator_init(self, mock_genai, mock_settings):
@@ -45,6 +47,7 @@ class TestDocumentationGenerator:
                 DocumentationGenerator()
             
             assert "Failed to initialize" in str(exc_info.value)
+            assert str(exc_info.value.__cause__) == "API Error"
 
     def test_analyze_video_relevance(self, mock_genai, mock_settings):
         """Test video relevance analysis (multimodal)"""
@@ -68,6 +71,134 @@ class TestDocumentationGenerator:
         
         assert isinstance(segments, list)
 
+    def test_multimodal_analysis_requests_trimmed_schema(self, mock_genai, mock_settings):
+        """Test multimodal analysis asks only for the fields the pipeline uses"""
+        from app.services.ai_generator import _RELEVANCE_RESPONSE_SCHEMA
+        
+        generator = DocumentationGenerator()
+        generator._analyze_multimodal_fast(MagicMock(), ["api"])
+        
+        schema_configs = [
+            c[1] for c in mock_genai.GenerationConfig.call_args_list
+            if "response_schema" in c[1]
+        ]
+        assert len(schema_configs) == 1
+        assert schema_configs[0]["response_schema"] is _RELEVANCE_RESPONSE_SCHEMA
+        assert generator.model_flash.generate_content.call_args[1]["generation_config"] is generator._cfg_analyze_video
+        segment_fields = _RELEVANCE_RESPONSE_SCHEMA["properties"]["relevant_segments"]["items"]["properties"]
+        assert set(segment_fields) == {"start", "end", "key_timestamps"}
+        
+        prompt = generator.model_flash.generate_content.call_args[0][0][1]
+        assert "reason" not in prompt
+        assert "technical_percentage" not in prompt
+
+    def test_analyze_video_typed_parse_preserves_segment_shape(self, mock_genai, mock_settings):
+        """Test typed parsing keeps missing key_timestamps absent for the pipeline fallback"""
+        mock_response = MagicMock()
+        mock_response.text = (
+            '{"relevant_segments": ['
+            '{"start": 1, "end": 4, "key_timestamps": [2]},'
+            '{"start": 10, "end": 20, "reason": "bug repro"}]}'
+        )
+        mock_genai.upload_file.return_value = MagicMock()
+        
+        generator = DocumentationGenerator()
+        generator._analyze_multimodal_fast = MagicMock(return_value=mock_response)
+        
+        segments = generator.analyze_video_relevance("test.mp4", [])
+        
+        assert segments == [
+            {"start": 1.0, "end": 4.0, "key_timestamps": [2.0]},
+            {"start": 10.0, "end": 20.0, "reason": "bug repro"},
+        ]
+    
+    def test_analyze_video_rejects_malformed_segments(self, mock_genai, mock_settings):
+        """Test segments missing required fields are rejected"""
+        mock_response = MagicMock()
+        mock_response.text = '{"relevant_segments": [{"start": "soon"}]}'
+        mock_genai.upload_file.return_value = MagicMock()
+        
+        generator = DocumentationGenerator()
+        generator._analyze_multimodal_fast = MagicMock(return_value=mock_response)
+        
+        with pytest.raises(AIGenerationError):
+            generator.analyze_video_relevance("test.mp4", [])
+
+    def test_analyze_video_invalid_json(self, mock_genai, mock_settings):
+        """Test malformed JSON from Gemini surfaces as AIGenerationError"""
+        mock_response = MagicMock()
+        mock_response.text = '{"relevant_segments": [oops'
+        mock_genai.upload_file.return_value = MagicMock()
+        
+        generator = DocumentationGenerator()
+        generator._analyze_multimodal_fast = MagicMock(return_value=mock_response)
+        
+        with pytest.raises(AIGenerationError) as exc_info:
+            generator.analyze_video_relevance("test.mp4", [])
+        
+        assert "Invalid JSON" in str(exc_info.value)
+
+    def test_analyze_video_polls_with_backoff(self, mock_genai, mock_settings):
+        """Test PROCESSING state is polled with growing, capped delays"""
+        processing = MagicMock()
+        processing.state.name = "PROCESSING"
+        active = MagicMock()
+        active.state.name = "ACTIVE"
+        mock_genai.upload_file.return_value = processing
+        mock_genai.get_file.side_effect = [processing] * 7 + [active]
+        
+        mock_response = MagicMock()
+        mock_response.text = '{"relevant_segments": []}'
+        generator = DocumentationGenerator()
+        generator._analyze_multimodal_fast = MagicMock(return_value=mock_response)
+        
+        with patch('app.services.ai_generator.time.sleep') as mock_sleep:
+            assert generator.analyze_video_relevance("test.mp4", []) == []
+        
+        delays = [call[0][0] for call in mock_sleep.call_args_list]
+        assert delays[0] == 0.25
+        assert all(b >= a for a, b in zip(delays, delays[1:]))
+        assert max(delays) == 4.0
+        generator._analyze_multimodal_fast.assert_called_once_with(active, [])
+    
+    def test_analyze_video_processing_timeout(self, mock_genai, mock_settings):
+        """Test a file stuck in PROCESSING fails instead of hanging"""
+        processing = MagicMock()
+        processing.state.name = "PROCESSING"
+        mock_genai.upload_file.return_value = processing
+        mock_genai.get_file.return_value = processing
+        generator = DocumentationGenerator()
+        
+        clock = iter(range(0, 10000, 100))
+        with patch('app.services.ai_generator.time.sleep'), \
+             patch('app.services.ai_generator.time.monotonic', side_effect=lambda: next(clock)):
+            with pytest.raises(AIGenerationError) as exc_info:
+                generator.analyze_video_relevance("test.mp4", [])
+        
+        assert "Timed out" in str(exc_info.value)
+
+    def test_analyze_text_relevance(self, mock_genai, mock_settings):
+        """Test transcript-based relevance parsing, including invalid JSON"""
+        from app.services.stt_fast_service import SttResult
+        
+        stt_result = SttResult(segments=[{"start": 0.0, "end": 4.0, "text": "let's deploy"}])
+        generator = DocumentationGenerator()
+        response = generator.model_flash.generate_content.return_value
+        
+        response.text = '{"relevant_segments": [{"start": 0, "end": 4, "reason": "deploy"}]}'
+        segments = generator._analyze_text_relevance(stt_result, ["deploy"])
+        assert segments == [{"start": 0, "end": 4, "reason": "deploy"}]
+        
+        prompt = generator.model_flash.generate_content.call_args[0][0]
+        assert "discussion about: deploy" in prompt
+        assert "let's deploy" in prompt
+        assert '"relevant_segments": [' in prompt
+        
+        response.text = "not json"
+        with pytest.raises(AIGenerationError) as exc_info:
+            generator._analyze_text_relevance(stt_result, ["deploy"])
+        assert "Invalid JSON" in str(exc_info.value)
+
     def test_analyze_video_empty_response(self, mock_genai, mock_settings):
         """Test handling of empty video analysis response"""
         mock_response = MagicMock()
@@ -139,6 +270,306 @@ class TestDocumentationGenerator:
         
         assert "Failed to upload any frames" in str(exc_info.value)
 
+    def test_prepare_frame_parts_preserves_order(self, mock_genai, mock_settings):
+        """Test concurrent frame preparation keeps frame order and skips failures"""
+        import time
+        
+        def fake_upload(path):
+            # Finish out of order to exercise result re-ordering
+            time.sleep(0.02 if path.endswith("0.jpg") else 0)
+            if "bad" in path:
+                raise Exception("Upload failed")
+            return f"handle:{path}"
+        
+        mock_genai.upload_file.side_effect = fake_upload
+        generator = DocumentationGenerator()
+        
+        uploaded = generator._prepare_frame_parts(["f0.jpg", "bad.jpg", "f2.jpg", "f3.jpg"])
+        
+        assert uploaded == ["handle:f0.jpg", "handle:f2.jpg", "handle:f3.jpg"]
+        assert mock_genai.upload_file.call_count == 4
+
+    def test_prepare_frame_parts_thumbnails_context_frames(self, mock_genai, mock_settings):
+        """Test only first, middle and last frames are prepared at full resolution"""
+        generator = DocumentationGenerator()
+        
+        with patch("app.services.ai_generator.prepare_frame_for_upload", side_effect=lambda p, max_dim=None: f"{p}@{max_dim}") as prepare:
+            generator._prepare_frame_parts([f"f{i}.jpg" for i in range(5)], thumbnail_dim=512)
+        
+        # The upload fallback reuses the prepared path instead of converting again
+        assert prepare.call_count == 5
+        
+        uploaded = sorted(c[0][0] for c in mock_genai.upload_file.call_args_list)
+        assert uploaded == ["f0.jpg@None", "f1.jpg@512", "f2.jpg@None", "f3.jpg@512", "f4.jpg@None"]
+
+    def test_small_frames_sent_inline_within_budget(self, mock_genai, mock_settings, tmp_path):
+        """Test frames go inline with the request until the byte budget, then upload"""
+        frames = []
+        for i in range(3):
+            frame = tmp_path / f"frame_000{i}.jpg"
+            frame.write_bytes(bytes([i]) * 10)
+            frames.append(str(frame))
+        mock_genai.upload_file.return_value = "handle"
+        generator = DocumentationGenerator()
+        
+        with patch("app.services.ai_generator._INLINE_REQUEST_MAX_BYTES", 25):
+            parts = generator._prepare_frame_parts(frames)
+        
+        assert parts[:2] == [
+            {"mime_type": "image/jpeg", "data": b"\x00" * 10},
+            {"mime_type": "image/jpeg", "data": b"\x01" * 10},
+        ]
+        assert parts[2] == "handle"
+        mock_genai.upload_file.assert_called_once_with(frames[2])
+
+    def test_inline_mime_type_follows_extension(self, mock_genai, mock_settings, tmp_path):
+        """Test inline parts are typed by file extension and unknown types are uploaded"""
+        webp = tmp_path / "frame_0000.webp"
+        webp.write_bytes(b"RIFF")
+        bmp = tmp_path / "frame_0001.bmp"
+        bmp.write_bytes(b"BM")
+        mock_genai.upload_file.return_value = "handle"
+        generator = DocumentationGenerator()
+        
+        assert generator._frame_part(str(webp)) == (str(webp), {"mime_type": "image/webp", "data": b"RIFF"})
+        assert generator._frame_part(str(bmp)) == (str(bmp), "handle")
+        mock_genai.upload_file.assert_called_once_with(str(bmp))
+
+    def test_upload_frame_reuses_cached_handle(self, mock_genai, mock_settings, tmp_path):
+        """Test unchanged frames are uploaded once and re-uploaded after modification"""
+        import os
+        
+        frame = tmp_path / "frame_0000_t1.0s.jpg"
+        frame.write_bytes(b"jpeg")
+        
+        handle = MagicMock()
+        handle.state.name = "ACTIVE"
+        mock_genai.upload_file.return_value = handle
+        generator = DocumentationGenerator()
+        
+        assert generator._upload_frame(str(frame)) is handle
+        assert generator._upload_frame(str(frame)) is handle
+        assert mock_genai.upload_file.call_count == 1
+        
+        frame.write_bytes(b"new jpeg bytes")
+        os.utime(frame, ns=(0, 10**9))
+        generator._upload_frame(str(frame))
+        assert mock_genai.upload_file.call_count == 2
+    
+    def test_upload_frame_evicts_failed_handle(self, mock_genai, mock_settings, tmp_path):
+        """Test a cached handle in FAILED state triggers a fresh upload"""
+        frame = tmp_path / "frame.jpg"
+        frame.write_bytes(b"jpeg")
+        
+        failed = MagicMock()
+        failed.state.name = "FAILED"
+        fresh = MagicMock()
+        fresh.state.name = "ACTIVE"
+        mock_genai.upload_file.side_effect = [failed, fresh]
+        generator = DocumentationGenerator()
+        
+        generator._upload_frame(str(frame))
+        assert generator._upload_frame(str(frame)) is fresh
+
+    def test_generate_documentation_embeds_frame_urls(self, mock_genai, mock_settings, tmp_path):
+        """Test [Frame X] references are replaced with upload URLs"""
+        from app.services.prompt_loader import PromptConfig
+        
+        mock_settings.get_upload_roots.return_value = (tmp_path, tmp_path.resolve())
+        frame = tmp_path / "sess1" / "frames" / "frame_0000_t1.0s.jpg"
+        
+        mock_response = MagicMock()
+        mock_response.text = "See [Frame 1] and again [Frame 1]. Missing [Frame 9]."
+        mock_model = MagicMock()
+        mock_model.generate_content.return_value = mock_response
+        mock_genai.GenerativeModel.return_value = mock_model
+        mock_genai.upload_file.return_value = MagicMock()
+        
+        generator = DocumentationGenerator()
+        prompt_config = PromptConfig(
+            id="test",
+            name="Test",
+            description="Test",
+            system_instruction="Test",
+            output_format="markdown"
+        )
+        
+        result = generator.generate_documentation(
+            frame_paths=[str(frame)],
+            prompt_config=prompt_config
+        )
+        
+        url = "/uploads/sess1/frames/frame_0000_t1.0s.jpg"
+        assert result.count(f"![Frame 1]({url})") == 2
+        assert "[Frame 9]" in result
+
+    def test_get_web_url(self, tmp_path):
+        """Test frame paths map to /uploads URLs with a filename fallback"""
+        root = tmp_path / "uploads"
+        frame = root / "sess1" / "frames" / "frame_0001.jpg"
+        
+        assert DocumentationGenerator._get_web_url(str(frame), root.resolve(), root) == "/uploads/sess1/frames/frame_0001.jpg"
+        assert DocumentationGenerator._get_web_url(str(frame), tmp_path / "elsewhere", root) == "/uploads/sess1/frames/frame_0001.jpg"
+        assert DocumentationGenerator._get_web_url("/other/frame_0002.jpg", root.resolve(), root) == "/uploads/frame_0002.jpg"
+
+    def test_upload_roots_computed_once_per_dir(self, tmp_path):
+        """Test the upload root is created and resolved once per configured directory"""
+        from app.core.config import settings
+        
+        with patch.object(settings, "upload_dir", str(tmp_path / "uploads")), \
+                patch("app.core.config.Path.resolve", autospec=True, side_effect=lambda p: p) as resolve:
+            first = settings.get_upload_roots()
+            assert settings.get_upload_roots() is first
+        
+        assert first == (tmp_path / "uploads", tmp_path / "uploads")
+        assert resolve.call_count == 1
+        assert (tmp_path / "uploads").is_dir()
+
+    def test_turn_logging_runs_on_background_writer(self, mock_genai, mock_settings):
+        """Test AGENT_NOTE / DOC_SECTION turns are written off the calling thread"""
+        import threading
+        from app.services.ai_generator import _LOG_QUEUE
+        from app.services.turn_log_service import TurnType
+        
+        writer_threads = []
+        turn_log = MagicMock()
+        turn_log.append_turn.side_effect = lambda turn: writer_threads.append(threading.current_thread())
+        generator = DocumentationGenerator()
+        
+        with patch("app.services.ai_generator.get_turn_log_service", return_value=turn_log):
+            generator._log_agent_notes("sess1", [{"start": 0, "end": 5}], "api")
+            generator._log_doc_section("sess1", "# Doc", "Full Documentation")
+            _LOG_QUEUE.join()
+        
+        logged = [c[0][0] for c in turn_log.append_turn.call_args_list]
+        assert [t.type for t in logged] == [TurnType.AGENT_NOTE, TurnType.DOC_SECTION]
+        assert threading.current_thread() not in writer_threads
+
+    def test_merge_segments(self, mock_genai, mock_settings):
+        """Test segments are ordered, headed and stripped of their own titles"""
+        generator = DocumentationGenerator()
+        
+        merged = generator.merge_segments([
+            {"index": 1, "start": 30, "end": 60, "doc": "Second part body"},
+            {"index": 0, "start": 0, "end": 30, "doc": "  # Segment 1\nFirst line\nSecond line  "},
+            {"index": 2, "start": 60, "end": 75, "doc": "# Only a title"},
+        ], project_name="Demo")
+        
+        assert merged == (
+            "# Demo Documentation\n\n"
+            "*Generated from 3 video segments*\n\n"
+            "---\n\n"
+            "## Part 1 (0s - 30s)\n\nFirst line\nSecond line\n\n---\n\n"
+            "## Part 2 (30s - 60s)\n\nSecond part body\n\n---\n\n"
+            "## Part 3 (60s - 75s)\n\n\n\n---\n\n"
+        )
+    
+    def test_merge_segments_empty(self, mock_genai, mock_settings):
+        """Test merging no segments returns a placeholder document"""
+        generator = DocumentationGenerator()
+        
+        assert "No content generated" in generator.merge_segments([])
+
+    @pytest.mark.parametrize("raw, expected", [
+        ("  # Doc\n\nBody  ", "# Doc\n\nBody"),
+        ("```markdown\n# Doc\n\nBody\n```", "# Doc\n\nBody"),
+        ("\n```md\n# Doc\n```\n", "# Doc"),
+        ("\n```\n{\"a\": 1}\n```\n", '```\n{"a": 1}\n```'),
+        ("```python\nprint(1)\n```", "```python\nprint(1)\n```"),
+        ("```python\nprint(1)\n```\n\nExplanation after the code", "```python\nprint(1)\n```\n\nExplanation after the code"),
+        ("``````", "``````"),
+        ("```js\na()\n```\nthen\n```js\nb()\n```", "```js\na()\n```\nthen\n```js\nb()\n```"),
+    ])
+    def test_strip_markdown_fences(self, raw, expected):
+        """Test only a whole-response markdown fence is unwrapped; code blocks are kept"""
+        assert DocumentationGenerator.strip_markdown_fences(raw) == expected
+
+
+class TestGeminiRetryAndRateLimit:
+    """Test retry/backoff and client-side rate limiting helpers"""
+    
+    def test_retry_on_rate_limit_then_succeed(self):
+        """Test 429 errors are retried until the call succeeds"""
+        from google.api_core import exceptions as google_exceptions
+        from app.services.ai_generator import _call_with_retry
+        
+        func = MagicMock(side_effect=[
+            google_exceptions.ResourceExhausted("quota"),
+            google_exceptions.ServiceUnavailable("busy"),
+            "ok"
+        ])
+        
+        with patch('app.services.ai_generator.time.sleep') as mock_sleep:
+            assert _call_with_retry(func, "arg", key="value") == "ok"
+        
+        assert func.call_count == 3
+        assert mock_sleep.call_count == 2
+        func.assert_called_with("arg", key="value")
+    
+    def test_every_attempt_takes_a_rate_limit_token(self):
+        """Test retries after a 429 acquire the limiter again"""
+        from google.api_core import exceptions as google_exceptions
+        from app.services.ai_generator import _call_with_retry
+        
+        limiter = MagicMock()
+        func = MagicMock(side_effect=[google_exceptions.ResourceExhausted("quota"), "ok"])
+        
+        with patch('app.services.ai_generator.time.sleep'):
+            assert _call_with_retry(func, "arg", rate_limiter=limiter) == "ok"
+        
+        assert limiter.acquire.call_count == 2
+        func.assert_called_with("arg")
+    
+    def test_retry_gives_up_after_max_attempts(self):
+        """Test persistent rate limiting eventually raises"""
+        from google.api_core import exceptions as google_exceptions
+        from app.services.ai_generator import _call_with_retry, _MAX_ATTEMPTS
+        
+        func = MagicMock(side_effect=google_exceptions.ResourceExhausted("quota"))
+        
+        with patch('app.services.ai_generator.time.sleep'):
+            with pytest.raises(google_exceptions.ResourceExhausted):
+                _call_with_retry(func)
+        
+        assert func.call_count == _MAX_ATTEMPTS
+    
+    def test_non_transient_errors_not_retried(self):
+        """Test client errors propagate immediately"""
+        from app.services.ai_generator import _call_with_retry
+        
+        func = MagicMock(side_effect=ValueError("bad request"))
+        
+        with pytest.raises(ValueError):
+            _call_with_retry(func)
+        
+        assert func.call_count == 1
+    
+    def test_rate_limiter_allows_burst_then_waits(self):
+        """Test token bucket lets rpm calls through, then throttles"""
+        from app.services.ai_generator import _RateLimiter
+        
+        limiter = _RateLimiter(rpm=2)
+        
+        with patch('app.services.ai_generator.time.sleep') as mock_sleep:
+            limiter.acquire()
+            limiter.acquire()
+            mock_sleep.assert_not_called()
+            
+            limiter.acquire()
+            mock_sleep.assert_called_once()
+            assert mock_sleep.call_args[0][0] == pytest.approx(30.0, abs=0.5)
+    
+    def test_rate_limiter_disabled(self):
+        """Test rpm=0 disables limiting"""
+        from app.services.ai_generator import _RateLimiter
+        
+        limiter = _RateLimiter(rpm=0)
+        
+        with patch('app.services.ai_generator.time.sleep') as mock_sleep:
+            for _ in range(100):
+                limiter.acquire()
+            mock_sleep.assert_not_called()
+
 
 class TestGeneratorSingleton:
     """Test singleton pattern for generator"""
@@ -160,3 +591,27 @@ class TestGeneratorSingleton:
                 gen2 = get_generator()
                 
                 assert gen1 is gen2
+
+    def test_get_generator_concurrent_init(self):
+        """Test concurrent callers share a single generator instance"""
+        import threading
+        import app.services.ai_generator as ai_mod
+        
+        with patch('app.services.ai_generator.genai') as mock_genai:
+            with patch('app.services.ai_generator.settings') as mock_settings:
+                mock_settings.gemini_api_key = "test"
+                mock_genai.GenerativeModel.return_value = MagicMock()
+                ai_mod._generator = None
+                
+                results = []
+                threads = [
+                    threading.Thread(target=lambda: results.append(get_generator()))
+                    for _ in range(8)
+                ]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                
+                assert len({id(g) for g in results}) == 1
+                mock_genai.configure.assert_called_once()
@@ -102,6 +102,25 @@ class TestCalendarWatcher:
         # Mock events start at 2 hours ahead, so 1 hour window returns none
         assert len(meetings) == 0
 
+    def test_check_upcoming_meetings_fresh_times(self, calendar_watcher):
+        """Test each call gets its own event copies with current times"""
+        before = datetime.now()
+        first = calendar_watcher.check_upcoming_meetings(hours_ahead=24)
+        second = calendar_watcher.check_upcoming_meetings(hours_ahead=24)
+        
+        assert [m.id for m in first] == ["evt_1", "evt_2"]
+        assert first[0] is not second[0]
+        assert first[0].start_time >= before + timedelta(hours=2)
+        assert first[0].end_time - first[0].start_time == timedelta(hours=1)
+
+    def test_calendar_events_are_frozen(self, calendar_watcher):
+        """Test shared mock events cannot be mutated by callers"""
+        from pydantic import ValidationError
+        
+        event = calendar_watcher.check_upcoming_meetings(hours_ahead=24)[0]
+        with pytest.raises(ValidationError):
+            event.title = "changed"
+
     def test_create_draft_session(self, calendar_watcher):
         """Test creating draft session from event"""
         now = datetime.now()
@@ -137,6 +156,13 @@ class TestCalendarWatcher:
         mode = calendar_watcher._suggest_mode(["api", "docs"])
         assert mode == "general_doc"
 
+    def test_suggest_mode_priority_and_whole_keywords(self, calendar_watcher):
+        """Test bug keywords outrank feature keywords and only whole keywords match"""
+        assert calendar_watcher._suggest_mode(["Design", "docs", "triage"]) == "bug_report"
+        assert calendar_watcher._suggest_mode(["auth", "login", "500 error"]) == "general_doc"
+        assert calendar_watcher._suggest_mode(["API", "new feature spec"]) == "general_doc"
+        assert calendar_watcher._suggest_mode(["debugging"]) == "general_doc"
+
     def test_suggest_mode_default(self, calendar_watcher):
         """Test default mode suggestion"""
         mode = calendar_watcher._suggest_mode(["random", "words"])
@@ -244,3 +270,125 @@ class TestCalendarWatcher:
         
         # Should still have same number
         assert len(calendar_watcher.draft_sessions) == initial_count
+
+
+class TestCalendarWatcherSingleton:
+    """Test the calendar watcher singleton"""
+
+    def test_concurrent_first_calls_sync_once(self):
+        """Test concurrent callers share one watcher and sync the calendar once"""
+        import threading
+        
+        with patch.object(CalendarWatcher, "sync_calendar") as mock_sync:
+            results = []
+            threads = [
+                threading.Thread(target=lambda: results.append(get_calendar_watcher()))
+                for _ in range(8)
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        
+        assert len({id(w) for w in results}) == 1
+        mock_sync.assert_called_once()
+
+
+class TestDraftSessionEventTimes:
+    """Test typed event times on draft sessions"""
+
+    def test_create_draft_session_keeps_typed_times(self):
+        """Test event times are copied without an ISO round-trip"""
+        watcher = CalendarWatcher()
+        start = datetime.now() + timedelta(hours=1)
+        event = CalendarEvent(
+            id="evt_typed",
+            title="Typed",
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+            attendees=[],
+            context_keywords=[]
+        )
+        
+        session = watcher.create_draft_session(event)
+        
+        assert session.event_start == start
+        assert session.event_end == start + timedelta(hours=1)
+        assert session.metadata["event_start"] == start.isoformat()
+
+    def test_metadata_only_session_parsed_once(self):
+        """Test sessions without typed times fall back to the ISO metadata"""
+        now = datetime.now()
+        session = DraftSession(
+            session_id="legacy",
+            event_id="evt_legacy",
+            title="Legacy",
+            attendees=[],
+            context_keywords=[],
+            created_at=now,
+            metadata={"event_start": now.isoformat(), "event_end": "not-a-date"}
+        )
+        
+        assert CalendarWatcher._event_bounds_ts(session) is None
+        
+        session.metadata["event_end"] = (now + timedelta(hours=1)).isoformat()
+        assert CalendarWatcher._event_bounds_ts(session) == (
+            now.timestamp(), (now + timedelta(hours=1)).timestamp()
+        )
+        assert session.event_start == now
+
+
+class TestDraftSessionListing:
+    """Test the ordered/status-indexed draft session listing"""
+
+    def _session(self, session_id, created_at, status="waiting_for_upload"):
+        return DraftSession(
+            session_id=session_id,
+            event_id=f"evt_{session_id}",
+            title=session_id,
+            attendees=[],
+            context_keywords=[],
+            status=status,
+            created_at=created_at
+        )
+
+    def test_listing_order_and_status_index(self):
+        """Test newest-first order survives inserts, replacement and status updates"""
+        watcher = CalendarWatcher()
+        watcher.draft_sessions.clear()
+        now = datetime.now()
+        
+        watcher.draft_sessions["old"] = self._session("old", now - timedelta(hours=2))
+        watcher.draft_sessions["new"] = self._session("new", now)
+        watcher.draft_sessions["mid"] = self._session("mid", now - timedelta(hours=1), status="completed")
+        
+        assert [s.session_id for s in watcher.get_draft_sessions()] == ["new", "mid", "old"]
+        assert [s.session_id for s in watcher.get_draft_sessions("completed")] == ["mid"]
+        
+        watcher.update_session_status("old", "completed")
+        watcher.draft_sessions["new"] = self._session("new", now - timedelta(hours=3))
+        del watcher.draft_sessions["mid"]
+        
+        assert [s.session_id for s in watcher.get_draft_sessions()] == ["old", "new"]
+        assert [s.session_id for s in watcher.get_draft_sessions("completed")] == ["old"]
+        assert [s.session_id for s in watcher.get_draft_sessions("waiting_for_upload")] == ["new"]
+
+    def test_event_index_tracks_inserts_and_deletes(self):
+        """Test sync skips drafted events and re-drafts them once removed"""
+        watcher = CalendarWatcher()
+        now = datetime.now()
+        
+        watcher.draft_sessions["a"] = self._session("a", now)
+        assert watcher.draft_sessions.has_event("evt_a")
+        watcher.draft_sessions.pop("a")
+        assert not watcher.draft_sessions.has_event("evt_a")
+        
+        # No dict mutators that would bypass the indexes
+        assert not any(hasattr(watcher.draft_sessions, name) for name in ("setdefault", "popitem", "update"))
+        
+        assert len(watcher.sync_calendar()) == 2
+        assert watcher.sync_calendar() == []
+        
+        drafted = next(s for s in watcher.draft_sessions.values() if s.event_id == "evt_1")
+        del watcher.draft_sessions[drafted.session_id]
+        assert [s.event_id for s in watcher.sync_calendar()] == ["evt_1"]
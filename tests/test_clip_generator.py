@@ -0,0 +1,124 @@
+"""Tests for Clip Generator"""
+
+import pytest
+from pathlib import Path
+from app.services.clip_generator import ClipGenerator
+
+
+class TestClipCommand:
+    """Test suite for ffmpeg command construction"""
+    
+    def test_horizontal_clip_uses_stream_copy(self):
+        """Test uncropped clips are remuxed instead of re-encoded"""
+        command = ClipGenerator._build_command("in.mp4", 10.0, 5.0, "horizontal", Path("out.mp4"))
+        
+        assert command[command.index('-c') + 1] == 'copy'
+        assert '-vf' not in command
+        assert 'libx264' not in command
+        assert command[-1] == "out.mp4"
+    
+    @pytest.mark.parametrize("output_format,crop", [
+        ("vertical", "crop=ih*(9/16):ih:(iw-ow)/2:0"),
+        ("square", "crop=ih:ih:(iw-ow)/2:0"),
+    ])
+    def test_cropped_clip_is_reencoded(self, output_format, crop):
+        """Test cropped clips re-encode with a fast preset"""
+        command = ClipGenerator._build_command("in.mp4", 10.0, 5.0, output_format, Path("out.mp4"))
+        
+        assert command[command.index('-vf') + 1] == crop
+        assert command[command.index('-c:v') + 1] == 'libx264'
+        assert command[command.index('-preset') + 1] == 'veryfast'
+        assert '-c' not in command
+    
+    def test_reencode_preset_is_configurable(self):
+        """Test the x264 preset can be overridden per command"""
+        command = ClipGenerator._build_command("in.mp4", 10.0, 5.0, "square", Path("out.mp4"), preset="medium")
+        
+        assert command[command.index('-preset') + 1] == 'medium'
+    
+    def test_unknown_format_is_rejected(self):
+        """Test formats outside the filter table fail instead of silently remuxing"""
+        with pytest.raises(ValueError, match="Unknown clip format"):
+            ClipGenerator._build_command("in.mp4", 10.0, 5.0, "story", Path("out.mp4"))
+
+
+class TestCreateClip:
+    """Test suite for async clip creation"""
+    
+    def _fake_process(self, returncode=0, stderr=b""):
+        from unittest.mock import AsyncMock, MagicMock
+        
+        proc = MagicMock()
+        proc.returncode = returncode
+        proc.communicate = AsyncMock(return_value=(b"", stderr))
+        return proc
+    
+    async def test_create_clip_runs_ffmpeg_async(self, tmp_path):
+        """Test ffmpeg runs as an asyncio subprocess and the clip path is returned"""
+        from unittest.mock import patch, AsyncMock
+        
+        video = tmp_path / "episode.mp4"
+        video.write_bytes(b"video")
+        generator = ClipGenerator(output_dir=str(tmp_path / "clips"))
+        
+        with patch("asyncio.create_subprocess_exec", AsyncMock(return_value=self._fake_process())) as exec_mock:
+            clip_path = await generator.create_clip(str(video), 1.0, 4.0, "horizontal")
+        
+        args = exec_mock.call_args[0]
+        assert args[0] == "ffmpeg"
+        assert args[-1] == clip_path
+        assert Path(clip_path).parent == tmp_path / "clips"
+    
+    async def test_create_clip_raises_on_ffmpeg_failure(self, tmp_path):
+        """Test a non-zero ffmpeg exit surfaces stderr"""
+        from unittest.mock import patch, AsyncMock
+        
+        video = tmp_path / "episode.mp4"
+        video.write_bytes(b"video")
+        generator = ClipGenerator(output_dir=str(tmp_path / "clips"))
+        fake = self._fake_process(returncode=1, stderr=b"Invalid data found")
+        
+        with patch("asyncio.create_subprocess_exec", AsyncMock(return_value=fake)):
+            with pytest.raises(RuntimeError, match="Invalid data found"):
+                await generator.create_clip(str(video), 1.0, 4.0)
+    
+    async def test_create_clip_rejects_bad_range(self, tmp_path):
+        """Test inverted time ranges fail before ffmpeg is started"""
+        video = tmp_path / "episode.mp4"
+        video.write_bytes(b"video")
+        generator = ClipGenerator(output_dir=str(tmp_path / "clips"))
+        
+        with pytest.raises(ValueError):
+            await generator.create_clip(str(video), 5.0, 1.0)
+    
+    async def test_cancelled_clip_kills_ffmpeg_and_removes_output(self, tmp_path):
+        """Test cancelling a clip stops ffmpeg and deletes the partial output"""
+        import asyncio
+        from unittest.mock import patch, AsyncMock
+        
+        video = tmp_path / "episode.mp4"
+        video.write_bytes(b"video")
+        generator = ClipGenerator(output_dir=str(tmp_path / "clips"))
+        fake = self._fake_process()
+        started = asyncio.Event()
+        
+        async def hang():
+            # ffmpeg has started writing when the task is cancelled
+            output = Path(exec_mock.call_args[0][-1])
+            output.write_bytes(b"partial")
+            started.set()
+            await asyncio.Event().wait()
+        
+        fake.communicate = hang
+        fake.wait = AsyncMock(return_value=-9)
+        with patch("asyncio.create_subprocess_exec", AsyncMock(return_value=fake)) as exec_mock:
+            task = asyncio.create_task(generator.create_clip(str(video), 1.0, 4.0))
+            await started.wait()
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        
+        fake.kill.assert_called_once()
+        fake.wait.assert_awaited_once()
+        assert list((tmp_path / "clips").iterdir()) == []
+
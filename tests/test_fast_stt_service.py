@@ -42,6 +42,13 @@ class TestSttResult:
         assert result.total_duration == 10.0
         assert result.processing_time_ms == 150.0
     
+    def test_total_duration_computed_once(self):
+        """Test the duration scan runs once per result"""
+        result = SttResult(segments=[{"start": 0.0, "end": 5.0, "text": "Hi"}])
+        
+        assert result.total_duration == 5.0
+        assert result.__dict__["total_duration"] == 5.0
+    
     def test_get_text_summary(self):
         """Test summary generation"""
         result = SttResult(
@@ -159,6 +166,17 @@ class TestFastSttServiceWithMockedModel:
         assert result.segment_count == 1
         assert result.segments[0]["text"] == "Hello world"
         assert result.processing_time_ms >= 0  # Can be 0 for mocked fast execution
+    
+    @patch("app.services.stt_fast_service.FastSttService._load_model")
+    def test_warmup_runs_model_once(self, mock_load):
+        """Test warmup decodes a short silent clip"""
+        service = FastSttService(enabled=True)
+        service.model = MagicMock()
+        service.model.transcribe.return_value = (iter([]), MagicMock())
+        
+        assert service.warmup() is True
+        assert len(service.model.transcribe.call_args[0][0]) == 16000
+        assert FastSttService(enabled=False).warmup() is False
 
 
 # =============================================================================
@@ -61,6 +61,23 @@ class TestNotificationService:
         assert "Feature Demo" in captured.out
         assert "/results/session_456" in captured.out
 
+    def test_send_batch_reports_per_item(self, capsys):
+        """Test batched sends keep order and flag unknown kinds as failed"""
+        from app.services.notification_service import Notification
+        
+        service = NotificationService()
+        notifications = [
+            Notification(kind="reminder", email=f"u{i}@example.com", meeting_title=f"M{i}")
+            for i in range(3)
+        ]
+        notifications.append(Notification(kind="sms", email="x@example.com", meeting_title="X"))
+        
+        results = service.send_batch(notifications)
+        
+        captured = capsys.readouterr()
+        assert results == [True, True, True, False]
+        assert captured.out.index("M0") < captured.out.index("M1") < captured.out.index("M2")
+
     def test_get_notification_service_singleton(self):
         """Test singleton pattern for NotificationService"""
         service1 = get_notification_service()
@@ -196,3 +213,143 @@ class TestNotificationScheduler:
         captured = capsys.readouterr()
         # Should NOT send any notifications
         assert "Completed Session" not in captured.out
+
+    def test_sessions_not_due_are_skipped_until_window(self, calendar_watcher, capsys):
+        """Test cached next-trigger time skips sessions until their window opens"""
+        now = datetime.now()
+        
+        session = DraftSession(
+            session_id="test_session_5",
+            event_id="evt_5",
+            title="Later Meeting",
+            attendees=["user@example.com"],
+            context_keywords=["test"],
+            status="waiting_for_upload",
+            created_at=now,
+            metadata={
+                "event_start": (now + timedelta(hours=2)).isoformat(),
+                "event_end": (now + timedelta(hours=3)).isoformat()
+            }
+        )
+        calendar_watcher.draft_sessions[session.session_id] = session
+        
+        calendar_watcher.check_notification_triggers()
+        
+        expected = (now + timedelta(hours=2, minutes=-15)).timestamp()
+        assert session._next_trigger_ts == pytest.approx(expected, abs=1)
+        
+        # Move the event into the reminder window; the update invalidates the cache
+        calendar_watcher.update_session_status(session.session_id, "waiting_for_upload", {
+            "event_start": (now + timedelta(minutes=10)).isoformat()
+        })
+        calendar_watcher.check_notification_triggers()
+        
+        captured = capsys.readouterr()
+        assert "Later Meeting" in captured.out
+        assert session.reminder_sent is True
+
+    def test_failed_batch_items_retry_next_tick(self, calendar_watcher):
+        """Test notifications are batched and only marked sent when delivered"""
+        now = datetime.now()
+        
+        for i in range(2):
+            calendar_watcher.draft_sessions[f"batch_{i}"] = DraftSession(
+                session_id=f"batch_{i}",
+                event_id=f"evt_batch_{i}",
+                title=f"Batch Meeting {i}",
+                attendees=["user@example.com"],
+                context_keywords=["test"],
+                status="waiting_for_upload",
+                created_at=now,
+                metadata={
+                    "event_start": (now + timedelta(minutes=10)).isoformat(),
+                    "event_end": (now + timedelta(minutes=70)).isoformat()
+                }
+            )
+        
+        notifier = MagicMock()
+        notifier.send_batch.return_value = [True, False]
+        with patch("app.services.notification_service.get_notification_service", return_value=notifier):
+            calendar_watcher.check_notification_triggers()
+            
+            sent = notifier.send_batch.call_args[0][0]
+            assert [n.meeting_title for n in sent] == ["Batch Meeting 0", "Batch Meeting 1"]
+            assert calendar_watcher.draft_sessions["batch_0"].reminder_sent is True
+            assert calendar_watcher.draft_sessions["batch_1"].reminder_sent is False
+            
+            # Simulate the retry backoff elapsing
+            calendar_watcher.draft_sessions["batch_1"]._next_trigger_ts = None
+            notifier.send_batch.return_value = [True]
+            calendar_watcher.check_notification_triggers()
+        
+        assert [n.meeting_title for n in notifier.send_batch.call_args[0][0]] == ["Batch Meeting 1"]
+        assert calendar_watcher.draft_sessions["batch_1"].reminder_sent is True
+
+    def test_failed_send_backs_off_before_retry(self, calendar_watcher):
+        """Test a failed notification does not make the scheduler retry every second"""
+        import time
+        
+        now = datetime.now()
+        calendar_watcher.draft_sessions.clear()
+        calendar_watcher.draft_sessions["flaky"] = DraftSession(
+            session_id="flaky",
+            event_id="evt_flaky",
+            title="Flaky Meeting",
+            attendees=["user@example.com"],
+            context_keywords=["test"],
+            status="waiting_for_upload",
+            created_at=now,
+            metadata={
+                "event_start": (now + timedelta(minutes=10)).isoformat(),
+                "event_end": (now + timedelta(minutes=70)).isoformat()
+            }
+        )
+        
+        notifier = MagicMock()
+        notifier.send_batch.return_value = [False]
+        with patch("app.services.notification_service.get_notification_service", return_value=notifier):
+            calendar_watcher.check_notification_triggers()
+            assert calendar_watcher.peek_next_trigger_ts() - time.time() > 50
+            
+            # Still backing off: the next tick does not resend
+            calendar_watcher.check_notification_triggers()
+        
+        assert notifier.send_batch.call_count == 1
+        assert calendar_watcher.draft_sessions["flaky"].reminder_sent is False
+
+    def test_peek_next_trigger_ts(self, calendar_watcher):
+        """Test next wakeup is now for unevaluated sessions, else the earliest window"""
+        import time
+        
+        assert calendar_watcher.peek_next_trigger_ts() <= time.time()
+        
+        calendar_watcher.check_notification_triggers()
+        
+        # mtg_2 starts in 2h, so its reminder window opens in 1h45m
+        expected = time.time() + 105 * 60
+        assert calendar_watcher.peek_next_trigger_ts() == pytest.approx(expected, abs=5)
+
+
+class TestNotificationSchedulerLoop:
+    """Test suite for the event-driven scheduler loop"""
+
+    async def test_scheduler_wakes_on_session_update(self):
+        """Test updates wake the scheduler instead of waiting out the sleep"""
+        import asyncio
+        from app.services.calendar_service import (
+            start_notification_scheduler,
+            stop_notification_scheduler
+        )
+        
+        watcher = get_calendar_watcher()
+        with patch.object(watcher, "check_notification_triggers", wraps=watcher.check_notification_triggers) as check:
+            task = asyncio.create_task(start_notification_scheduler())
+            await asyncio.sleep(0.05)
+            assert check.call_count == 1
+            
+            watcher.update_session_status("mtg_2", "waiting_for_upload")
+            await asyncio.sleep(0.05)
+            assert check.call_count == 2
+            
+            stop_notification_scheduler()
+            await asyncio.wait_for(task, timeout=1)
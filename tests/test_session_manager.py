@@ -8,18 +8,19 @@ from datetime import datetime, timedelta
 @pytest.fixture
 def session_manager():
     """Create a fresh SessionManager for each test"""
-    # Reset the singleton to get a fresh instance
-    from app.services import session_manager as sm_module
-    sm_module._session_manager = None
+    # Reset the singleton to get a fresh instance (stopping the old one's threads)
+    from app.services.session_manager import get_session_manager, reset_session_manager
+    reset_session_manager()
     
     with patch("app.services.session_manager.get_storage_service") as mock_storage:
         mock_storage.return_value.get_history.return_value = []
         mock_storage.return_value.get_session_result.return_value = None
+        mock_storage.return_value.get_session_entry.return_value = None
         
-        from app.services.session_manager import get_session_manager
         mgr = get_session_manager()
         mgr._storage = mock_storage.return_value
         yield mgr
+        reset_session_manager()
 
 
 class TestSessionCreate:
@@ -168,3 +169,247 @@ class TestActiveSession:
         
         result = session_manager.get_active_session()
         assert result is None
+
+
+class TestSessionPersistence:
+    """Tests for write-behind persistence"""
+    
+    def test_updates_are_coalesced_until_flush(self, session_manager):
+        with patch("app.services.session_manager.PERSIST_INTERVAL_SECONDS", 60):
+            session_manager.create_session("burst", {"title": "Burst"})
+            session_manager.start_processing("burst")
+            session_manager.start_processing("burst")
+            
+            session_manager._storage.add_sessions_batch.assert_not_called()
+            
+            session_manager.flush()
+        
+        batch = session_manager._storage.add_sessions_batch.call_args[0][0]
+        assert [session_id for session_id, _ in batch] == ["burst"]
+        assert batch[0][1]["status"] == "processing"
+    
+    def test_terminal_states_flush_immediately(self, session_manager):
+        with patch("app.services.session_manager.PERSIST_INTERVAL_SECONDS", 60):
+            session_manager.create_session("final", {"title": "Final"})
+            session_manager.start_processing("final")
+            session_manager.complete("final", "/path", "# Doc")
+        
+        session_manager._storage.add_sessions_batch.assert_called_once()
+        batch = session_manager._storage.add_sessions_batch.call_args[0][0]
+        assert batch[0][1]["status"] == "completed"
+        assert batch[0][1]["documentation"] == "# Doc"
+    
+    def test_completed_documentation_leaves_memory(self, session_manager):
+        session_manager.complete("big", "/path", "# Doc")
+        
+        batch = session_manager._storage.add_sessions_batch.call_args[0][0]
+        assert batch[-1][1]["documentation"] == "# Doc"
+        assert "documentation" not in session_manager.get_session("big").metadata
+    
+    def test_pending_persist_is_a_snapshot(self, session_manager):
+        session_manager._flush_loop = lambda: None  # keep the write pending
+        session_manager.create_session("snap", {"title": "Snap"})
+        session_manager.start_processing("snap")
+        
+        # Changes made after scheduling don't leak into the pending write
+        state = session_manager.get_session("snap")
+        state.title = "half-written"
+        state.status = state.status.FAILED
+        session_manager.flush()
+        
+        batch = session_manager._storage.add_sessions_batch.call_args[0][0]
+        assert batch == [("snap", {**batch[0][1], "title": "Snap", "status": "processing"})]
+    
+    def test_background_writer_flushes(self, session_manager):
+        import time
+        
+        with patch("app.services.session_manager.PERSIST_INTERVAL_SECONDS", 0.01):
+            session_manager.start_processing("bg")
+            deadline = time.time() + 2
+            while not session_manager._storage.add_sessions_batch.called and time.time() < deadline:
+                time.sleep(0.01)
+        
+        session_manager._storage.add_sessions_batch.assert_called()
+    
+    def test_close_stops_background_threads(self, session_manager):
+        assert session_manager._reaper is None
+        
+        session_manager.start_processing("closing")
+        session_manager.close()
+        
+        assert not session_manager._reaper.is_alive()
+        assert not session_manager._writer.is_alive()
+        batch = session_manager._storage.add_sessions_batch.call_args[0][0]
+        assert batch[-1][0] == "closing"
+
+
+class TestZombieDetection:
+    """Tests for stale session detection"""
+    
+    def test_in_memory_zombie_uses_monotonic_clock(self, session_manager):
+        from app.services.session_manager import STALE_TIMEOUT_SECONDS
+        
+        session_manager.start_processing("stale")
+        state = session_manager.get_session("stale")
+        state.last_updated_monotonic -= STALE_TIMEOUT_SECONDS + 1
+        
+        version = state.version
+        
+        assert session_manager.reap_zombies() == 1
+        assert state.version > version
+        assert session_manager.get_status("stale")["status"] == "failed"
+    
+    def test_status_polls_skip_zombie_check(self, session_manager):
+        from app.services.session_manager import STALE_TIMEOUT_SECONDS
+        
+        session_manager.start_processing("live")
+        session_manager.start_processing("stale")
+        session_manager.get_session("stale").last_updated_monotonic -= STALE_TIMEOUT_SECONDS + 1
+        
+        # Polls never mark zombies; only the reaper does
+        assert session_manager.get_status("stale")["status"] == "processing"
+        assert session_manager.get_status("stale")["status"] == "processing"
+        assert session_manager.reap_zombies() == 1
+        assert session_manager.get_status("stale")["status"] == "failed"
+        assert session_manager.get_status("live")["status"] == "processing"
+    
+    def test_concurrent_first_calls_create_one_manager(self):
+        import threading
+        from app.services.session_manager import get_session_manager, reset_session_manager
+        
+        reset_session_manager()
+        with patch("app.services.session_manager.get_storage_service") as mock_storage:
+            mock_storage.return_value.get_history.return_value = []
+            with patch("app.services.session_manager.SessionManager.__init__", return_value=None) as init:
+                barrier = threading.Barrier(8)
+                managers = []
+                
+                def call():
+                    barrier.wait()
+                    managers.append(get_session_manager())
+                
+                threads = [threading.Thread(target=call) for _ in range(8)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                
+                assert init.call_count == 1
+                assert all(m is managers[0] for m in managers)
+                
+                import app.services.session_manager as sm_mod
+                sm_mod._session_manager = None
+    
+    def test_persisted_zombies_use_epoch_or_legacy_iso(self, session_manager):
+        import time
+        from app.services.session_manager import STALE_TIMEOUT_SECONDS
+        
+        stale_epoch = time.time() - STALE_TIMEOUT_SECONDS - 1
+        session_manager._storage.get_history.return_value = [
+            {"id": "epoch", "status": "processing", "timestamp_epoch": stale_epoch},
+            {"id": "legacy", "status": "processing",
+             "timestamp": datetime.fromtimestamp(stale_epoch).isoformat()},
+            {"id": "live", "status": "processing", "timestamp_epoch": time.time()},
+        ]
+        
+        assert session_manager.get_active_session()["session_id"] == "live"
+        failed = [c[0][0] for c in session_manager._storage.add_session.call_args_list]
+        assert failed == ["epoch", "legacy"]
+
+
+class TestStatusCache:
+    """Tests for cached terminal status dicts"""
+    
+    def test_terminal_status_is_reused_until_updated(self, session_manager):
+        session_manager.create_session("done", {"title": "Done"})
+        session_manager.complete("done", "/path")
+        
+        with patch.object(session_manager, "_status_dict", wraps=session_manager._status_dict) as build:
+            first = session_manager.get_status("done")
+            assert session_manager.get_status("done") == first
+            assert build.call_count == 1
+            
+            session_manager.update_metadata("done", {"title": "Renamed"})
+            updated = session_manager.get_status("done")
+            assert build.call_count == 2
+        assert updated["title"] == "Renamed"
+    
+    def test_updates_within_one_clock_tick_invalidate_cache(self, session_manager):
+        session_manager.create_session("done", {"title": "Done"})
+        session_manager.complete("done", "/path")
+        
+        # Coarse monotonic clocks (e.g. ~15 ms on Windows) can return the same value twice
+        with patch("app.services.session_manager.time.monotonic", return_value=1000.0):
+            session_manager.update_metadata("done", {"title": "First"})
+            assert session_manager.get_status("done")["title"] == "First"
+            session_manager.update_metadata("done", {"title": "Second"})
+            assert session_manager.get_status("done")["title"] == "Second"
+    
+    def test_cached_status_is_not_shared_with_callers(self, session_manager):
+        session_manager.create_session("done", {"title": "Done"})
+        session_manager.complete("done", "/path")
+        
+        session_manager.get_status("done")["status"] = "tampered"
+        session_manager.get_status("done")["title"] = "tampered"
+        
+        status = session_manager.get_status("done")
+        assert status["status"] == "completed"
+        assert status["title"] == "Done"
+    
+    def test_active_status_is_not_cached(self, session_manager):
+        session_manager.start_processing("live")
+        first = session_manager.get_status("live")
+        session_manager.update_progress("live", "generating_docs", 80)
+        
+        assert session_manager.get_status("live")["progress"] == 80
+        assert first["progress"] == 0
+    
+    def test_dict_views_share_fields(self, session_manager):
+        created = session_manager.create_session("s", {"title": "T", "mode_name": "Bug"})
+        status = session_manager.get_status("s")
+        metadata = session_manager._persist_metadata(session_manager.get_session("s"))
+        
+        assert created == {"session_id": "s", **status, "result_path": None}
+        assert metadata["topic"] == "Bug"
+        assert metadata["last_updated"] == status["last_updated"]
+
+
+class TestSessionStateModel:
+    """Tests for the internal session state container"""
+    
+    def test_state_uses_slots(self):
+        from app.services.session_manager import SessionState
+        
+        now = datetime.now()
+        state = SessionState(session_id="s", created_at=now, last_updated=now)
+        
+        assert not hasattr(state, "__dict__")
+        assert state.metadata == {}
+        assert state.metadata is not SessionState(session_id="t", created_at=now, last_updated=now).metadata
+        with pytest.raises(AttributeError):
+            state.unknown_field = 1
+
+
+class TestSessionEviction:
+    """Tests for the bounded in-memory session cache"""
+    
+    def test_only_terminal_sessions_are_evicted(self, session_manager):
+        with patch("app.services.session_manager.MAX_CACHED_SESSIONS", 2):
+            session_manager.start_processing("active")
+            session_manager.create_session("done", {"title": "Done"})
+            session_manager.complete("done", "/path")
+            session_manager.create_session("new", {"title": "New"})
+        
+        assert session_manager.get_session("active") is not None
+        assert session_manager.get_session("done") is None
+        assert session_manager.get_session("new") is not None
+    
+    def test_evicted_session_status_falls_back_to_history(self, session_manager):
+        session_manager._storage.get_session_entry.return_value = {
+            "id": "gone", "status": "failed", "title": "Gone", "timestamp": "2024-01-01T00:00:00"
+        }
+        
+        status = session_manager.get_status("gone")
+        assert status["status"] == "failed"
+        assert status["title"] == "Gone"
+        assert status["stage"] == "loaded_from_disk"
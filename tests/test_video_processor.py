@@ -57,6 +57,66 @@ class TestVideoProcessor:
             get_video_duration("nonexistent_duration_12345.mp4")
 
 
+class TestPrepareFrameForUpload:
+    """Test frame down-conversion before Gemini upload"""
+    
+    def _write_noise_frame(self, path):
+        import cv2
+        import numpy as np
+        
+        rng = np.random.default_rng(0)
+        image = rng.integers(0, 255, (720, 1280, 3), dtype=np.uint8)
+        cv2.imwrite(str(path), image, [cv2.IMWRITE_JPEG_QUALITY, 100])
+    
+    def test_small_frame_returned_unchanged(self, tmp_path):
+        """Test frames under the size threshold skip conversion"""
+        from app.services.video_processor import prepare_frame_for_upload
+        
+        frame = tmp_path / "frame_0000_t1.0s.jpg"
+        self._write_noise_frame(frame)
+        
+        assert prepare_frame_for_upload(str(frame), max_bytes=10**9) == str(frame)
+        assert not (tmp_path / ".upload").exists()
+    
+    def test_large_frame_converted_to_webp_and_reused(self, tmp_path):
+        """Test large frames are re-encoded once and the copy is reused"""
+        from app.services.video_processor import prepare_frame_for_upload
+        from unittest.mock import patch
+        
+        frame = tmp_path / "frame_0000_t1.0s.jpg"
+        self._write_noise_frame(frame)
+        
+        converted = prepare_frame_for_upload(str(frame), max_bytes=1024)
+        
+        assert Path(converted) == tmp_path / ".upload" / "frame_0000_t1.0s.webp"
+        assert Path(converted).stat().st_size < frame.stat().st_size
+        # Written via temp file + rename; no partial files left behind
+        assert [p.name for p in (tmp_path / ".upload").iterdir()] == ["frame_0000_t1.0s.webp"]
+        
+        with patch("app.services.video_processor.cv2.imencode") as mock_encode:
+            assert prepare_frame_for_upload(str(frame), max_bytes=1024) == converted
+            mock_encode.assert_not_called()
+    
+    def test_missing_frame_falls_back_to_original(self):
+        """Test unreadable frames are passed through for upload"""
+        from app.services.video_processor import prepare_frame_for_upload
+        
+        assert prepare_frame_for_upload("missing_frame.jpg") == "missing_frame.jpg"
+    
+    def test_thumbnail_downscales_longest_side(self, tmp_path):
+        """Test max_dim always produces a bounded WebP thumbnail"""
+        import cv2
+        from app.services.video_processor import prepare_frame_for_upload
+        
+        frame = tmp_path / "frame_0001_t2.0s.jpg"
+        self._write_noise_frame(frame)
+        
+        thumb = prepare_frame_for_upload(str(frame), max_bytes=10**9, max_dim=512)
+        
+        assert Path(thumb) == tmp_path / ".upload" / "frame_0001_t2.0s_512.webp"
+        assert max(cv2.imread(thumb).shape[:2]) == 512
+
+
 class TestExtractFramesAtTimestamps:
     """Test suite for timestamp-based frame extraction"""
     